@@ -1,4 +1,4 @@
 """API package for LangFlow integration."""
 from .app import app
 from .langflow_handler import LangFlowHandler
-from .config import settings
\ No newline at end of file
+from .config import settings
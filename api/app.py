@@ -1,46 +1,683 @@
 # api/app.py
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+import uuid
+from contextlib import AsyncExitStack, asynccontextmanager
+import httpx
+from fastapi import FastAPI, HTTPException, Header, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
-import uvicorn
-from langflow_handler import LangFlowHandler
+from typing import Dict, Any, List, Literal, Optional, Union
+from langflow_handler import LangFlowHandler, extract_message_text, project_response
+from response_cache import create_response_cache, normalize_query
+from flow_catalog import FlowCatalog
+from session_store import SessionStore, create_session_store
+from lifecycle import InFlightTracker
+from prewarm import FlowWarmer
+from resilience import AdmissionController, CircuitBreakers, SingleFlight, UpstreamUnavailable
+from instrumentation import NULL_TIMER, MetricsMiddleware, MetricsRegistry, RequestTimer
 from config import settings
 
-app = FastAPI(title="LangFlow API", description="API for LangFlow integration")
-langflow_handler = LangFlowHandler(settings.LANGFLOW_API_URL)
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is used instead
+    orjson = None
+
+class ChatJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content)
+
+logger = logging.getLogger(__name__)
+
+# Per-worker resources, created in the lifespan so every worker process
+# opens its own connection pools after it has started
+langflow_handler: Optional[LangFlowHandler] = None
+flow_catalog: Optional[FlowCatalog] = None
+session_store: Optional[SessionStore] = None
+flow_warmer: Optional[FlowWarmer] = None
+response_cache = None
+inflight = InFlightTracker()
+circuit_breakers = CircuitBreakers(
+    settings.CIRCUIT_BREAKER_FAILURES,
+    settings.CIRCUIT_BREAKER_RESET_TIMEOUT,
+    max_breakers=settings.CIRCUIT_BREAKER_MAX_FLOWS,
+)
+admission = AdmissionController(
+    max_concurrency=settings.ADMISSION_MAX_CONCURRENCY,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    retry_after=settings.ADMISSION_RETRY_AFTER,
+)
+single_flight = SingleFlight()
+metrics_registry = MetricsRegistry() if settings.METRICS_ENABLED else None
+
+def _flow_label(flow_id: str) -> str:
+    """
+    The flow's ID as a metric label, or "unlisted" for IDs the flow catalog
+    does not list, so clients cannot grow the number of series by sending
+    made-up IDs
+    """
+    return flow_id if flow_catalog is not None and flow_catalog.is_known(flow_id) else "unlisted"
+
+def _invalidate_changed_flows(flow_ids):
+    # Cached answers and output paths of a flow that was edited in LangFlow are no longer valid
+    langflow_handler.forget_output_specs(flow_ids)
+    if response_cache is not None:
+        for flow_id in flow_ids:
+            _in_background(response_cache.ainvalidate(flow_id))
+
+async def _warm_up_run(flow_id: str):
+    """One warm-up run of a flow, outside the response cache and the session histories"""
+    # Warm-ups neither probe a tripped circuit nor count towards tripping it;
+    # the breaker reflects what users see
+    if circuit_breakers.state(flow_id) != "closed":
+        logger.info("Skipping warm-up of flow %s while its circuit is open", flow_id)
+        return
+    start = time.perf_counter()
+    async with inflight.track():
+        # A session of its own keeps the warm-up out of users' LangFlow chat memory
+        await langflow_handler.process_query(settings.FLOW_PREWARM_QUERY, flow_id, session_id=f"prewarm-{flow_id}")
+    if metrics_registry is not None:
+        metrics_registry.observe_run(_flow_label(flow_id), time.perf_counter() - start, "prewarm")
+
+async def _prewarm_startup_flows():
+    """Warm up the flows named by FLOW_PREWARM_STARTUP ("*" for all of them)"""
+    names = settings.FLOW_PREWARM_STARTUP.strip()
+    if names == "*":
+        try:
+            flows, _ = await flow_catalog.get_flows("summary")
+        except Exception as e:
+            logger.warning("Could not list flows to warm up: %s", e)
+            return
+        flow_ids = [flow["id"] for flow in flows]
+    else:
+        flow_ids = [name.strip() for name in names.split(",") if name.strip()]
+    for flow_id in flow_ids[:flow_warmer.max_flows]:
+        flow_warmer.prewarm(flow_id)
+
+_cleanup_tasks = set()
+
+def _in_background(coro):
+    task = asyncio.create_task(coro)
+    # Held until done, so the task is not garbage collected mid-flight
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_cleanup_tasks.discard)
+
+def _forget_langflow_session(session_id: str):
+    """Delete the chat memory LangFlow kept for a one-off run, in the background"""
+    _in_background(langflow_handler.delete_session_messages(session_id))
+
+async def _evict_sessions():
+    """Periodically drop sessions, and their histories, idle for longer than SESSION_TTL"""
+    while True:
+        await asyncio.sleep(settings.SESSION_EVICTION_INTERVAL)
+        try:
+            evicted = session_store.evict_expired(settings.SESSION_TTL)
+        except Exception:
+            logger.exception("Session eviction failed")
+            continue
+        if evicted:
+            logger.info("Evicted %d expired sessions", evicted)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global langflow_handler, flow_catalog, session_store, response_cache, flow_warmer
+    langflow_handler = LangFlowHandler.from_settings(settings)
+    response_cache = create_response_cache(settings)
+    session_store = create_session_store(settings)
+    flow_catalog = FlowCatalog(
+        langflow_handler,
+        ttl=settings.FLOW_CATALOG_TTL,
+        refresh_interval=settings.FLOW_CATALOG_REFRESH_INTERVAL,
+        on_change=_invalidate_changed_flows,
+    )
+    # Known before the first request, so listed flows get their own metric labels
+    try:
+        await asyncio.wait_for(flow_catalog.refresh(), settings.FLOW_CATALOG_STARTUP_TIMEOUT)
+    except Exception as e:
+        logger.warning("Could not list flows on startup: %s", e)
+    flow_catalog.start()
+    # The warmer also tells cold runs from warm ones when prewarming is disabled
+    flow_warmer = FlowWarmer(
+        _warm_up_run,
+        max_flows=settings.FLOW_PREWARM_MAX_FLOWS,
+        keepalive_interval=settings.FLOW_KEEPALIVE_INTERVAL,
+        warm_ttl=settings.FLOW_WARM_TTL,
+        keepalive_window=settings.FLOW_KEEPALIVE_WINDOW,
+    )
+    startup_prewarm = None
+    if settings.FLOW_PREWARM_ENABLED:
+        flow_warmer.start()
+        startup_prewarm = asyncio.create_task(_prewarm_startup_flows())
+    eviction = asyncio.create_task(_evict_sessions()) if settings.SESSION_TTL else None
+    yield
+    for task in (eviction, startup_prewarm):
+        if task is not None:
+            task.cancel()
+    await flow_warmer.stop()
+    # Let LangFlow calls that are still running finish before closing the pool
+    remaining = await inflight.drain(settings.SHUTDOWN_GRACE_PERIOD)
+    if remaining:
+        logger.warning("Shutting down with %d LangFlow calls still in flight", remaining)
+    await flow_catalog.stop()
+    await langflow_handler.aclose()
+    session_store.close()
+
+app = FastAPI(title="LangFlow API", description="API for LangFlow integration", lifespan=lifespan)
+if metrics_registry is not None:
+    app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
+def _add_compression(app: FastAPI):
+    """Compress responses clients accept compressed, per RESPONSE_COMPRESSION"""
+    encoding = settings.RESPONSE_COMPRESSION.lower()
+    if encoding in ("", "none"):
+        return
+    if encoding == "br":
+        try:
+            from brotli_asgi import BrotliMiddleware
+        except ImportError:
+            logger.warning("RESPONSE_COMPRESSION=br requires the brotli-asgi package; using gzip")
+        else:
+            # Falls back to gzip for clients that do not accept brotli
+            app.add_middleware(BrotliMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE)
+            return
+    elif encoding != "gzip":
+        raise ValueError(f"Unknown RESPONSE_COMPRESSION: {settings.RESPONSE_COMPRESSION}")
+    from fastapi.middleware.gzip import GZipMiddleware
+    app.add_middleware(GZipMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE, compresslevel=6)
+
+_add_compression(app)
 
 class QueryRequest(BaseModel):
     query: str
     flow_id: str
     session_id: Optional[str] = None
+    use_cache: bool = True
+    include_timings: bool = False
+    # Metadata to return: "minimal", "sources" (retrieval context) or "full" (raw LangFlow output)
+    projection: Optional[Literal["minimal", "sources", "full"]] = None
+    # Extract the documents the flow retrieved into the "documents" metadata
+    include_documents: bool = False
+    # False answers the query without a conversation: no session or history
+    # is kept, and the flow's LangFlow chat memory of the run is deleted
+    use_session: bool = True
+
+class BatchQuery(BaseModel):
+    query: str
+    flow_id: Optional[str] = None
+    session_id: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    # Plain strings or objects; queries without a flow_id use the batch's flow_id
+    queries: List[Union[str, BatchQuery]]
+    flow_id: Optional[str] = None
+    use_cache: bool = True
+    include_timings: bool = False
+    projection: Optional[Literal["minimal", "sources", "full"]] = None
+    include_documents: bool = False
+    max_concurrency: Optional[int] = None
+    use_session: bool = True
 
 class ResponseModel(BaseModel):
     message: str
 
 class QueryResponse(BaseModel):
     response: Dict[Any, Any] = {}
-    session_id: str
+    # The answer's message text
+    text: str = ""
+    # None for queries sent with use_session=False
+    session_id: Optional[str] = None
     metadata: Dict[Any, Any] = {}
 
+def _uses_cache(request: QueryRequest) -> bool:
+    # A question asked within an existing conversation may depend on the
+    # earlier turns, so only opening questions are stored in the cache
+    if response_cache is None or not request.use_cache:
+        return False
+    return not (request.session_id and session_store.get(request.session_id))
+
+def _answers_from_cache(request: QueryRequest) -> bool:
+    # LangFlow keeps the chat memory of a session, and a cached answer never
+    # reaches it, so follow-ups would miss the turn. Only queries without a
+    # session are answered from the cache.
+    return not request.use_session and _uses_cache(request)
+
+async def _lookup_cache(request: QueryRequest):
+    """Return (cached response or None, cache metadata) for a query"""
+    if not _answers_from_cache(request):
+        return None, {}
+    cached, cache_metadata = await response_cache.aget(request.flow_id, request.query)
+    if cached is None:
+        return None, cache_metadata
+    if request.include_documents and "documents" not in cached["metadata"]:
+        # Cached by a request that did not extract them
+        return None, {"cache_hit": False}
+    response = {
+        "response": cached["response"],
+        # Entries cached before the text was extracted only have the answer object
+        "text": cached.get("text") or extract_message_text(cached["response"]),
+        "session_id": request.session_id or str(uuid.uuid4()),
+        "metadata": {**cached["metadata"], **cache_metadata},
+    }
+    return response, cache_metadata
+
+async def _store_cache(request: QueryRequest, response: Dict[str, Any]):
+    if _uses_cache(request):
+        # Session IDs are per conversation, so only the answer is cached
+        await response_cache.aset(request.flow_id, request.query, {
+            "response": response["response"],
+            "text": response["text"],
+            "metadata": dict(response["metadata"]),
+        })
+
+def _check_session(request: QueryRequest):
+    if request.session_id and not request.use_session:
+        raise HTTPException(status_code=422, detail="session_id cannot be combined with use_session=false")
+
+def _record_turn(request: QueryRequest, response: Dict[str, Any]):
+    if not request.use_session:
+        response["session_id"] = None
+        return
+    session = session_store.record_turn(
+        response["session_id"], request.flow_id, request.query, response["text"]
+    )
+    # Position of the answer in the session history, so clients can page back from it
+    response["metadata"]["history_seq"] = session["messages"] - 1
+
+def _new_timer():
+    return RequestTimer() if metrics_registry is not None else NULL_TIMER
+
+def _start_timer(http_request: Request):
+    """Timer for a chat request, or a no-op timer when metrics are disabled"""
+    timer = _new_timer()
+    if not timer.enabled:
+        return timer
+    # Routing, body reading and validation all happen before the endpoint runs
+    request_start = http_request.scope.get("state", {}).get("request_start")
+    if request_start is not None:
+        timer.record("request_parse", time.perf_counter() - request_start)
+    return timer
+
+def _attach_timings(request: QueryRequest, response: Dict[str, Any], timer):
+    if timer.enabled and (request.include_timings or settings.RESPONSE_TIMINGS):
+        response["metadata"]["timings"] = timer.rounded()
+        if timer.flow_state is not None:
+            response["metadata"]["flow_state"] = timer.flow_state
+
+def _mark_flow_state(flow_id: str, timer):
+    """Note whether a request that runs its flow finds the flow warm"""
+    if timer.enabled:
+        timer.flow_state = "warm" if flow_warmer.is_warm(flow_id) else "cold"
+
+def _finish_timer(flow_id: str, timer):
+    if timer.enabled:
+        metrics_registry.observe_spans(_flow_label(flow_id), timer.spans, timer.flow_state)
+
+def _project(request: QueryRequest, response: Dict[str, Any]) -> Dict[str, Any]:
+    return project_response(response, request.projection or settings.RESPONSE_PROJECTION, request.include_documents)
+
+def _dumps_line(event: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(event).decode() + "\n"
+    return json.dumps(event) + "\n"
+
+def _respond(request: QueryRequest, response: Dict[str, Any], timer) -> JSONResponse:
+    """Project and serialize a chat response, timing the serialization"""
+    response = _project(request, response)
+    # The timings block is attached first, so it cannot include its own serialization
+    _attach_timings(request, response, timer)
+    with timer.span("serialization"):
+        # The handler builds the response itself, so it is encoded directly
+        # rather than validated again through QueryResponse
+        json_response = ChatJSONResponse(response)
+    _finish_timer(request.flow_id, timer)
+    return json_response
+
+def _check_accepting():
+    if not inflight.accepting:
+        raise HTTPException(status_code=503, detail="Server is shutting down", headers={"Retry-After": "1"})
+
+def _http_error(error: Exception) -> HTTPException:
+    """Map an error from a LangFlow call to the HTTP error returned to the client"""
+    if isinstance(error, HTTPException):
+        return error
+    if isinstance(error, UpstreamUnavailable):
+        retry_after = str(math.ceil(error.retry_after))
+        return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": retry_after})
+    if isinstance(error, httpx.TimeoutException):
+        return HTTPException(status_code=504, detail="LangFlow did not respond in time")
+    return HTTPException(status_code=500, detail=str(error))
+
+async def _run_query(request: QueryRequest, timer) -> Dict[str, Any]:
+    """Answer a query from the response cache or LangFlow; LangFlow errors propagate"""
+    _check_session(request)
+    with timer.span("cache_lookup"):
+        cached, cache_metadata = await _lookup_cache(request)
+    if cached is not None:
+        _record_turn(request, cached)
+        return cached
+    _check_accepting()
+    _mark_flow_state(request.flow_id, timer)
+
+    async def call():
+        async with circuit_breakers.guard(request.flow_id), admission.slot(), inflight.track():
+            response = await langflow_handler.process_query(
+                query=request.query,
+                flow_id=request.flow_id,
+                session_id=request.session_id,
+                timer=timer,
+                include_documents=request.include_documents
+            )
+        if not request.use_session:
+            _forget_langflow_session(response["session_id"])
+        return response
+
+    # A question that opens a session has to run under that session's ID, so
+    # LangFlow's chat memory holds the turn for the follow-ups
+    if settings.COALESCE_REQUESTS and (request.session_id or not request.use_session):
+        # Identical questions to a flow that arrive while one is already
+        # running share its LangFlow call instead of starting their own.
+        # Questions within a conversation are only shared inside that conversation.
+        key = (request.flow_id, request.session_id, normalize_query(request.query), request.include_documents)
+        response, shared = await single_flight.run(key, call)
+    else:
+        response, shared = await call(), False
+    flow_warmer.touch(request.flow_id)
+    if shared:
+        # The caller that ran the query already cached its response
+        response = {**response, "metadata": {**response["metadata"], "coalesced": True}}
+        response["session_id"] = request.session_id or str(uuid.uuid4())
+    else:
+        response = {**response, "metadata": dict(response["metadata"])}
+        await _store_cache(request, response)
+    _record_turn(request, response)
+    response["metadata"].update(cache_metadata)
+    return response
+
 @app.post("/chat", response_model=QueryResponse)
-async def chat(request: QueryRequest):
+async def chat(request: QueryRequest, http_request: Request):
+    timer = _start_timer(http_request)
     try:
-        response = langflow_handler.process_query(
-            query=request.query,
-            flow_id=request.flow_id,
-            session_id=request.session_id
-        )
-        return response
+        response = await _run_query(request, timer)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _http_error(e)
+    return _respond(request, response, timer)
+
+@app.post("/chat/batch")
+async def chat_batch(batch: BatchRequest):
+    """
+    Run many queries in one call and stream the results as newline-delimited JSON
+
+    Queries run concurrently, at most ``max_concurrency`` at a time (capped by
+    ``BATCH_MAX_CONCURRENCY``), over the shared LangFlow connection pool. Each
+    line is ``{"index": ..., "response": ..., "session_id": ..., "metadata": ...}``,
+    or ``{"index": ..., "flow_id": ..., "error": ..., "status": ...}`` for a failed query, in the
+    order the queries finish. ``index`` is the query's position in the request.
+    """
+    if len(batch.queries) > settings.BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=422, detail=f"At most {settings.BATCH_MAX_QUERIES} queries per batch")
+    requests = []
+    for index, item in enumerate(batch.queries):
+        if isinstance(item, str):
+            item = BatchQuery(query=item)
+        flow_id = item.flow_id or batch.flow_id
+        if not flow_id:
+            raise HTTPException(status_code=422, detail=f"Query {index} has no flow_id")
+        requests.append(QueryRequest(
+            query=item.query,
+            flow_id=flow_id,
+            session_id=item.session_id,
+            use_cache=batch.use_cache,
+            include_timings=batch.include_timings,
+            projection=batch.projection,
+            include_documents=batch.include_documents,
+            use_session=batch.use_session,
+        ))
+    _check_accepting()
+    concurrency = min(batch.max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index: int, request: QueryRequest) -> Dict[str, Any]:
+        async with semaphore:
+            timer = _new_timer()
+            try:
+                response = await _run_query(request, timer)
+            except Exception as e:
+                error = _http_error(e)
+                return {"index": index, "flow_id": request.flow_id, "error": error.detail, "status": error.status_code}
+        response = _project(request, response)
+        _attach_timings(request, response, timer)
+        _finish_timer(request.flow_id, timer)
+        return {"index": index, **response}
+
+    async def relay():
+        tasks = [asyncio.create_task(run(index, request)) for index, request in enumerate(requests)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield _dumps_line(await next_done)
+        finally:
+            # Stop the remaining queries if the client went away
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(relay(), media_type="application/x-ndjson")
+
+@app.post("/chat/stream")
+async def chat_stream(request: QueryRequest, http_request: Request):
+    """Stream the flow output as newline-delimited JSON events while LangFlow generates it"""
+    _check_session(request)
+    timer = _start_timer(http_request)
+    with timer.span("cache_lookup"):
+        cached, cache_metadata = await _lookup_cache(request)
+    if cached is not None:
+        _record_turn(request, cached)
+        cached = _project(request, cached)
+        _attach_timings(request, cached, timer)
+        _finish_timer(request.flow_id, timer)
+        async def replay():
+            yield _dumps_line({"event": "end", **cached})
+        return StreamingResponse(replay(), media_type="application/x-ndjson")
+
+    _check_accepting()
+    _mark_flow_state(request.flow_id, timer)
+    events = langflow_handler.stream_query(
+        query=request.query,
+        flow_id=request.flow_id,
+        session_id=request.session_id,
+        timer=timer,
+        include_documents=request.include_documents
+    )
+    # Streams hold their circuit breaker, admission slot and in-flight count
+    # until the relay below finishes. Wait for the first event so connection
+    # and upstream HTTP errors still surface as a regular error response.
+    upstream = AsyncExitStack()
+    try:
+        await upstream.enter_async_context(circuit_breakers.guard(request.flow_id))
+        await upstream.enter_async_context(admission.slot())
+        await upstream.enter_async_context(inflight.track())
+        first_event = await events.__anext__()
+    except StopAsyncIteration:
+        first_event = None
+    except Exception as e:
+        await upstream.__aexit__(type(e), e, e.__traceback__)
+        await events.aclose()
+        raise _http_error(e)
+
+    async def finalize(event: Dict[str, Any]) -> str:
+        if event["event"] != "end":
+            return _dumps_line(event)
+        flow_warmer.touch(request.flow_id)
+        if not request.use_session:
+            _forget_langflow_session(event["session_id"])
+        await _store_cache(request, event)
+        _record_turn(request, event)
+        event["metadata"].update(cache_metadata)
+        event = _project(request, event)
+        _attach_timings(request, event, timer)
+        with timer.span("serialization"):
+            line = _dumps_line(event)
+        _finish_timer(request.flow_id, timer)
+        return line
+
+    async def relay():
+        error = None
+        try:
+            if first_event is None:
+                return
+            yield await finalize(first_event)
+            async for event in events:
+                yield await finalize(event)
+        except Exception as e:
+            error = e
+            yield _dumps_line({"event": "error", "detail": str(e)})
+        finally:
+            await events.aclose()
+            # Failures mid-stream count against the flow's circuit breaker too
+            if error is None:
+                await upstream.aclose()
+            else:
+                await upstream.__aexit__(type(error), error, error.__traceback__)
+
+    return StreamingResponse(relay(), media_type="application/x-ndjson")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **await response_cache.astats()}
+
+@app.delete("/cache")
+async def clear_cache():
+    removed = await response_cache.ainvalidate() if response_cache is not None else 0
+    return {"removed": removed}
+
+@app.delete("/cache/{flow_id}")
+async def invalidate_flow_cache(flow_id: str):
+    removed = await response_cache.ainvalidate(flow_id) if response_cache is not None else 0
+    return {"flow_id": flow_id, "removed": removed}
 
 @app.get("/flows")
-async def get_flows():
+async def get_flows(
+    view: str = Query("full", pattern="^(full|summary)$"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    List the flows available in LangFlow
+
+    ``view=summary`` returns only id, name, description and updated_at of each
+    flow. Responses carry an ETag; clients sending it back in If-None-Match get
+    a 304 while the flow list is unchanged.
+    """
+    try:
+        flows, etag = await flow_catalog.get_flows(view)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse({"flows": flows}, headers=headers)
+
+@app.post("/flows/{flow_id}/prewarm", status_code=202)
+async def prewarm_flow(flow_id: str):
+    """
+    Warm a flow up in LangFlow in the background, e.g. when a user selects it
+
+    ``started`` is false when the flow is already warm or warming up.
+    """
+    if not settings.FLOW_PREWARM_ENABLED:
+        raise HTTPException(status_code=404, detail="Flow prewarming is disabled")
+    _check_accepting()
+    # Each warm-up is a full flow run, so only flows LangFlow lists are warmed
     try:
-        flows = langflow_handler.get_flows()
-        return {"flows": flows}
+        await flow_catalog.get_flows("summary")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if not flow_catalog.is_known(flow_id):
+        raise HTTPException(status_code=404, detail="Flow not found")
+    started = flow_warmer.prewarm(flow_id)
+    return {"flow_id": flow_id, "started": started, "warm": flow_warmer.is_warm(flow_id)}
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+@app.get("/sessions/{session_id}/history")
+async def get_session_history(
+    session_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[int] = Query(None, description="Only messages with a lower seq, to page backwards"),
+):
+    """
+    One page of a session's messages, oldest first
+
+    Without ``before`` this is the latest ``limit`` messages. Pass the returned
+    ``next_before`` to get the page before it; it is null once the oldest kept
+    message was returned. Messages that fell out of the history window are only
+    available as the session's ``summary``.
+    """
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    messages = session_store.get_history(session_id, limit=limit, before=before)
+    has_more = bool(messages) and bool(session_store.get_history(session_id, limit=1, before=messages[0]["seq"]))
+    return {
+        "session_id": session_id,
+        "messages": messages,
+        "summary": session.get("summary", ""),
+        "total_messages": session.get("messages", 0),
+        "next_before": messages[0]["seq"] if has_more else None,
+    }
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    return {"session_id": session_id, "deleted": session_store.delete(session_id)}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Latency histograms in the Prometheus text exposition format"""
+    if metrics_registry is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok" if inflight.accepting else "draining",
+        "pid": os.getpid(),
+        "in_flight": inflight.in_flight,
+        "admission": admission.stats(),
+        "circuits": circuit_breakers.states(),
+        "warm_flows": flow_warmer.status(),
+    }
+
+def serve():
+    """Run the API with the worker count and shutdown grace period from the settings"""
+    import uvicorn
+
+    workers = max(1, settings.API_WORKERS)
+    if workers > 1 and settings.SESSION_BACKEND == "memory":
+        logger.warning("SESSION_BACKEND=memory keeps sessions per worker; use sqlite with API_WORKERS > 1")
+    uvicorn.run(
+        "app:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=workers,
+        # Auto-reload only makes sense for a single development worker
+        reload=settings.DEBUG and workers == 1,
+        timeout_graceful_shutdown=settings.SHUTDOWN_GRACE_PERIOD,
+    )
 
 if __name__ == "__main__":
-    uvicorn.run("api.app:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    serve()
@@ -3,10 +3,77 @@ from typing import Optional
 
 class Settings(BaseSettings):
     LANGFLOW_API_URL: str = "http://localhost:7860"
+    API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     DEBUG: bool = True
 
+    # Serving
+    API_WORKERS: int = 1
+    SHUTDOWN_GRACE_PERIOD: float = 30.0  # seconds to let in-flight LangFlow calls finish
+
+    # Latency instrumentation
+    METRICS_ENABLED: bool = True  # per-request timing spans and the /metrics endpoint
+    RESPONSE_TIMINGS: bool = False  # add a timings block to every chat response's metadata
+
+    # Response payloads
+    RESPONSE_PROJECTION: str = "minimal"  # "minimal", "sources" or "full" (includes the raw LangFlow output)
+    RESPONSE_COMPRESSION: str = "none"  # "none", "gzip" or "br" (requires the optional "brotli-asgi" package)
+    RESPONSE_COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller responses are sent uncompressed
+
+    # Batch queries
+    BATCH_MAX_QUERIES: int = 1000
+    BATCH_MAX_CONCURRENCY: int = 16  # LangFlow runs in flight per batch
+
+    # Session state shared by the workers
+    SESSION_BACKEND: str = "memory"  # "memory" (single worker) or "sqlite"
+    SESSION_DB_PATH: str = "data/sessions.db"
+    SESSION_TTL: float = 24 * 3600  # seconds of inactivity before a session is evicted, 0 = never
+    SESSION_EVICTION_INTERVAL: float = 300.0
+    HISTORY_MAX_MESSAGES: int = 200  # messages kept per session; older ones are folded into a summary
+    HISTORY_SUMMARY_MAX_CHARS: int = 2000
+
+    # LangFlow HTTP client
+    LANGFLOW_TIMEOUT: float = 120.0  # read timeout; slower runs fail with 504
+    LANGFLOW_CONNECT_TIMEOUT: float = 5.0
+    LANGFLOW_MAX_CONNECTIONS: int = 100
+    LANGFLOW_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LANGFLOW_KEEPALIVE_EXPIRY: float = 30.0
+    LANGFLOW_HTTP2: bool = False  # requires the optional "h2" package
+
+    # Upstream resilience, per worker
+    CIRCUIT_BREAKER_FAILURES: int = 5  # consecutive failures that open a flow's circuit, 0 = disabled
+    CIRCUIT_BREAKER_RESET_TIMEOUT: float = 30.0  # seconds before a probe call is let through
+    CIRCUIT_BREAKER_MAX_FLOWS: int = 1000  # breakers kept, least recently used dropped first
+    COALESCE_REQUESTS: bool = True  # share one LangFlow call between identical concurrent questions
+    ADMISSION_MAX_CONCURRENCY: int = 100  # LangFlow calls at once, 0 = unlimited
+    ADMISSION_MAX_QUEUE: int = 200  # calls waiting for a slot before new ones get a 503
+    ADMISSION_QUEUE_TIMEOUT: float = 10.0  # seconds a call waits for a slot
+    ADMISSION_RETRY_AFTER: float = 1.0  # Retry-After seconds sent with load-shedding 503s
+
+    # Response cache in front of flow runs
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_BACKEND: str = "memory"  # "memory" or "sqlite"
+    RESPONSE_CACHE_PATH: str = "data/response_cache.db"
+    RESPONSE_CACHE_TTL: float = 3600.0  # seconds, 0 = never expire
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = 0.0  # 0 disables the similarity tier
+
+    # Flow catalog
+    FLOW_CATALOG_TTL: float = 60.0  # seconds before the cached flow list is refreshed
+    FLOW_CATALOG_REFRESH_INTERVAL: float = 0.0  # background refresh period, 0 = refresh on demand
+    FLOW_CATALOG_STARTUP_TIMEOUT: float = 10.0  # seconds to wait for the flow list before serving
+
+    # Flow prewarming, per worker
+    FLOW_PREWARM_ENABLED: bool = True
+    FLOW_PREWARM_STARTUP: str = ""  # flows to warm up on startup: comma-separated IDs, "*" (all, up to the max) or "" (none)
+    FLOW_PREWARM_QUERY: str = "Hello"  # sent as the warm-up run; it runs the whole flow, LLM included
+    FLOW_PREWARM_MAX_FLOWS: int = 4  # flows most recently used by users kept warm
+    FLOW_KEEPALIVE_INTERVAL: float = 240.0  # seconds of idleness before a kept flow is pinged again, 0 = no pings
+    FLOW_KEEPALIVE_WINDOW: float = 1800.0  # seconds without user traffic after which a flow is no longer pinged
+    FLOW_WARM_TTL: float = 300.0  # seconds after a run during which a flow counts as warm
+
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,128 @@
+# api/flow_catalog.py
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = ("id", "name", "description", "updated_at")
+
+def summarize_flow(flow: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a LangFlow flow record down to what flow pickers need"""
+    return {key: flow.get(key) for key in SUMMARY_FIELDS}
+
+def compute_etag(payload: Any) -> str:
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha1(body.encode("utf-8")).hexdigest() + '"'
+
+class FlowCatalog:
+    """
+    Cached view of the LangFlow flow list
+
+    The list is fetched at most once per ``ttl`` seconds. Once it is stale the
+    cached copy keeps being served while a single background refresh runs, and
+    with ``refresh_interval`` set a background task keeps it warm so requests
+    never wait on LangFlow. ``on_change`` is called with the IDs of flows that
+    were added, removed or updated by a refresh.
+    """
+
+    def __init__(
+        self,
+        langflow_handler,
+        ttl: float = 60.0,
+        refresh_interval: float = 0.0,
+        on_change: Optional[Callable[[List[str]], None]] = None,
+    ):
+        self.langflow_handler = langflow_handler
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.on_change = on_change
+        self._views: Dict[str, Tuple[List[Dict[str, Any]], str]] = {}
+        self._versions: Dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._fetched_at > self.ttl
+
+    async def refresh(self):
+        """Fetch the flow list from LangFlow and rebuild the cached views"""
+        async with self._lock:
+            flows = await self.langflow_handler.get_flows()
+            summary = [summarize_flow(flow) for flow in flows]
+            self._views = {
+                "full": (flows, compute_etag(flows)),
+                "summary": (summary, compute_etag(summary)),
+            }
+            versions = {flow.get("id"): flow.get("updated_at") for flow in flows}
+            changed = [
+                flow_id for flow_id in set(versions) | set(self._versions)
+                if versions.get(flow_id) != self._versions.get(flow_id)
+            ]
+            had_flows = bool(self._versions)
+            self._versions = versions
+            self._fetched_at = time.monotonic()
+        if changed and had_flows and self.on_change is not None:
+            self.on_change(changed)
+
+    def _refresh_in_background(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._safe_refresh())
+
+    async def _safe_refresh(self):
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Flow catalog refresh failed")
+
+    async def get_flows(self, view: str = "full") -> Tuple[List[Dict[str, Any]], str]:
+        """Return the flows in the requested view ("full" or "summary") and their ETag"""
+        if view not in ("full", "summary"):
+            raise ValueError(f"Unknown flow view: {view}")
+        if not self._views:
+            await self.refresh()
+        elif self.is_stale:
+            self._refresh_in_background()
+        return self._views[view]
+
+    def is_known(self, flow_id: str) -> bool:
+        """
+        Whether the flow is in the cached list, without waiting on LangFlow
+
+        A missing or stale list is refreshed in the background, so a flow
+        created since the last refresh is known shortly after.
+        """
+        if not self._views or self.is_stale:
+            self._refresh_in_background()
+        return flow_id in self._versions
+
+    def get_version(self, flow_id: str) -> Optional[Any]:
+        """Last known ``updated_at`` of a flow"""
+        return self._versions.get(flow_id)
+
+    async def _refresh_loop(self):
+        while True:
+            await self._safe_refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        """Start the periodic background refresh if an interval is configured"""
+        if self.refresh_interval > 0 and self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        for task in (self._loop_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = None
+        self._refresh_task = None
@@ -0,0 +1,179 @@
+# api/instrumentation.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds in seconds, spanning sub-millisecond parsing to multi-minute LLM runs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Histogram:
+    """Prometheus-style cumulative histogram with one series per label set"""
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[Tuple[str, str], ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple((name, str(labels.get(name, ""))) for name in self.label_names)
+        with self._lock:
+            # Per series: one count per bucket, then +Inf count and sum
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _format_labels(key, 'le="%g"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative:g}")
+            cumulative += series[len(self.buckets)]
+            bucket_labels = _format_labels(key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative:g}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.request_seconds = Histogram(
+            "api_request_duration_seconds",
+            "Time spent serving API requests",
+            ("endpoint", "method", "status"),
+        )
+        self.span_seconds = Histogram(
+            "langflow_request_span_seconds",
+            "Time spent in each stage of a chat request",
+            ("flow_id", "span"),
+        )
+        self.upstream_seconds = Histogram(
+            "langflow_run_duration_seconds",
+            "LangFlow run time by whether the flow was warm, cold or being prewarmed",
+            ("flow_id", "state"),
+        )
+
+    def observe_spans(self, flow_id: str, spans: Dict[str, float], flow_state: Optional[str] = None):
+        for span, seconds in spans.items():
+            self.span_seconds.observe(seconds, flow_id=flow_id, span=span)
+        if flow_state is not None and "upstream_total" in spans:
+            self.observe_run(flow_id, spans["upstream_total"], flow_state)
+
+    def observe_run(self, flow_id: str, seconds: float, state: str):
+        self.upstream_seconds.observe(seconds, flow_id=flow_id, state=state)
+
+    def render(self) -> str:
+        lines = self.request_seconds.render() + self.span_seconds.render() + self.upstream_seconds.render()
+        return "\n".join(lines) + "\n"
+
+class RequestTimer:
+    """Collects named timing spans of one request"""
+
+    enabled = True
+
+    def __init__(self):
+        self.spans: Dict[str, float] = {}
+        # "cold" or "warm" once the request ran its flow in LangFlow
+        self.flow_state: Optional[str] = None
+        self._connect_started: Optional[float] = None
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    async def trace(self, event_name: str, info: dict):
+        """httpx trace hook timing new TCP/TLS connections to LangFlow"""
+        if event_name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+            self._connect_started = time.perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            if self._connect_started is not None:
+                self.record("upstream_connect", time.perf_counter() - self._connect_started)
+                self._connect_started = None
+
+    def rounded(self) -> Dict[str, float]:
+        """Spans in milliseconds, for the response metadata"""
+        return {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()}
+
+class NullTimer:
+    """Stand-in used when metrics are disabled; every operation is a no-op"""
+
+    enabled = False
+    spans: Dict[str, float] = {}
+    flow_state = None
+
+    def span(self, name: str):
+        return _NULL_CONTEXT
+
+    def record(self, name: str, seconds: float):
+        pass
+
+    trace = None
+
+    def rounded(self) -> Dict[str, float]:
+        return {}
+
+_NULL_CONTEXT = nullcontext()
+NULL_TIMER = NullTimer()
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request
+
+    Stores the start time in the request scope so endpoints can derive how long
+    routing, body reading and validation took before they ran.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        scope.setdefault("state", {})["request_start"] = start
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.registry.request_seconds.observe(
+                time.perf_counter() - start,
+                endpoint=getattr(route, "path", "unmatched"),
+                method=scope.get("method", ""),
+                status=str(status["code"]),
+            )
@@ -1,47 +1,217 @@
 # api/langflow_handler.py
 import json
-import requests
+import logging
+import httpx
+import time
 import uuid
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, TypedDict
+from instrumentation import NULL_TIMER
+from output_extraction import OutputSpec, find_document_lists
+from resilience import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+def extract_message_text(response: Any) -> str:
+    """Get the plain message text out of an extracted LangFlow response"""
+    if isinstance(response, str):
+        return response
+    if isinstance(response, dict):
+        message = response.get("message", response)
+        if isinstance(message, dict):
+            return str(message.get("message") or message.get("text") or "")
+        return str(message)
+    return str(response)
+
+# Metadata fields each response projection keeps in addition to the flow ID,
+# cache and timing information
+PROJECTIONS = {
+    "minimal": (),
+    "sources": ("context", "sources"),
+    "full": ("context", "sources", "raw_output"),
+}
+
+def extract_sources(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the retrieval context a flow returned alongside its answer, if any"""
+    sources = {}
+    if "context" in result:
+        sources["context"] = result["context"]
+    if "sources" in result:
+        sources["sources"] = result["sources"]
+    return sources
+
+class RetrievedDocument(TypedDict):
+    """A document a flow retrieved, as returned in the ``documents`` metadata"""
+    text: str
+    id: Optional[str]
+    score: Optional[float]
+    # Display name of the component that returned it, e.g. "Chroma DB"
+    component: Optional[str]
+    metadata: Dict[str, Any]
+
+# Keys under which LangFlow components and LangChain retrievers return documents
+DOCUMENT_LIST_KEYS = ("search_results", "documents", "source_documents", "retrieved_documents", "context_documents")
+DOCUMENT_ID_KEYS = ("id", "_id", "doc_id", "document_id", "chunk_id")
+DOCUMENT_SCORE_KEYS = ("score", "similarity_score", "relevance_score")
+
+def _as_document(node: Any, component: Optional[str], list_key: Any = None) -> Optional[RetrievedDocument]:
+    """
+    A RetrievedDocument if ``node`` is a serialized document, otherwise None
+
+    Plain strings count as documents only in a list under a key such as
+    ``search_results`` (``list_key``).
+    """
+    if isinstance(node, str):
+        if list_key not in DOCUMENT_LIST_KEYS:
+            return None
+        return {"text": node, "id": None, "score": None, "component": component, "metadata": {}}
+    if not isinstance(node, dict):
+        return None
+    if isinstance(node.get("page_content"), str):
+        # LangChain Document
+        text, metadata = node["page_content"], dict(node.get("metadata") or {})
+    elif isinstance(node.get("data"), dict) and "text_key" in node:
+        # LangFlow Data; chat Messages are Data too, but carry a sender
+        if "sender" in node["data"]:
+            return None
+        metadata = dict(node["data"])
+        text = metadata.pop(node["text_key"], None)
+        if not isinstance(text, str):
+            return None
+    else:
+        return None
+    doc_id = next((metadata[key] for key in DOCUMENT_ID_KEYS if metadata.get(key) is not None), node.get("id"))
+    score = next((metadata[key] for key in DOCUMENT_SCORE_KEYS if isinstance(metadata.get(key), (int, float))), None)
+    return {
+        "text": text,
+        "id": None if doc_id is None else str(doc_id),
+        "score": None if score is None else float(score),
+        "component": component,
+        "metadata": metadata,
+    }
+
+def extract_documents(result: Dict[str, Any]) -> List[RetrievedDocument]:
+    """
+    Get the documents retrieved by a flow run from the LangFlow output tree
+
+    Every component output in the run result is searched for lists of
+    serialized LangChain Documents and LangFlow Data objects, and for lists
+    of strings under a key such as ``search_results``. A document that
+    appears in several places of the tree (a component's results and
+    artifacts, say) is returned once, in the order first found.
+    """
+    spec = OutputSpec(None, None, None, find_document_lists(result, _as_document))
+    return spec.extract_documents(result, _as_document)
+
+def project_response(response: Dict[str, Any], projection: str, include_documents: bool = False) -> Dict[str, Any]:
+    """
+    Copy of a chat response without the metadata the projection leaves out
+
+    Retrieved ``documents`` are only kept when asked for with ``include_documents``.
+    """
+    keep = PROJECTIONS[projection]
+    dropped = {field for fields in PROJECTIONS.values() for field in fields} - set(keep)
+    if not include_documents:
+        dropped.add("documents")
+    metadata = {key: value for key, value in response["metadata"].items() if key not in dropped}
+    return {**response, "metadata": metadata}
 
 class LangFlowHandler:
-    def __init__(self, langflow_url: str):
+    def __init__(
+        self,
+        langflow_url: str,
+        timeout: float = 120.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+    ):
         self.langflow_url = langflow_url
-        self.session = requests.Session()
-    
-    def get_flows(self):
+        # One pooled client per handler so keep-alive connections are reused
+        # across requests instead of reconnecting to LangFlow every time
+        self.client = httpx.AsyncClient(
+            base_url=langflow_url,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+        )
+        # Where each flow's run results keep their answer, found on its first result
+        self.output_specs: Dict[str, OutputSpec] = {}
+
+    @classmethod
+    def from_settings(cls, settings) -> "LangFlowHandler":
+        """Build a handler from the API settings"""
+        return cls(
+            settings.LANGFLOW_API_URL,
+            timeout=settings.LANGFLOW_TIMEOUT,
+            connect_timeout=settings.LANGFLOW_CONNECT_TIMEOUT,
+            max_connections=settings.LANGFLOW_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LANGFLOW_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LANGFLOW_KEEPALIVE_EXPIRY,
+            http2=settings.LANGFLOW_HTTP2,
+        )
+
+    def forget_output_specs(self, flow_ids):
+        """Search the next results of these flows again, e.g. after they were edited"""
+        for flow_id in flow_ids:
+            self.output_specs.pop(flow_id, None)
+
+    async def aclose(self):
+        """Close the underlying connection pool"""
+        await self.client.aclose()
+
+    async def get_flows(self):
         """Get all flows from LangFlow"""
-        response = self.session.get(f"{self.langflow_url}/api/v1/flows/")
+        response = await self.client.get("/api/v1/flows/")
         response.raise_for_status()
         return response.json()
-    
-    def process_query(self, query: str, flow_id: str, session_id: Optional[str] = None) -> Dict[str, Any]:
-        """Process a query using the specified LangFlow flow"""
-        if not session_id:
-            session_id = str(uuid.uuid4())
+
+    async def delete_session_messages(self, session_id: str):
+        """Delete LangFlow's stored chat messages of a session; failures are logged, not raised"""
+        try:
+            response = await self.client.delete(f"/api/v1/monitor/messages/session/{session_id}")
+            response.raise_for_status()
+        except Exception as e:
+            logger.debug("Could not delete LangFlow messages of session %s: %s", session_id, e)
+
+    def _build_payload(self, query: str, session_id: str) -> Dict[str, Any]:
         output_type = "chat"
         input_type = "chat"
-        # API endpoint for the specific flow
-        endpoint = f"{self.langflow_url}/api/v1/run/{flow_id}"
-        
-        # payload = {
-        #     "input": {"input": query},
-        #     "session_id": session_id,
-        #     "tweaks": {}
-        # }
+        # LangFlow keys its chat memory on the session ID, so follow-up
+        # questions see the earlier turns of the conversation
         payload = {
         "input_value": query,
         "output_type": output_type,
         "input_type": input_type,
+        "session_id": session_id,
         }
-        headers = None
-        response = self.session.post(endpoint, json=payload,headers=headers)
-        response.raise_for_status()
-        result = response.json()
-        
-        # Extract the response from the LangFlow output
-        output = json.loads((json.dumps(result, indent=2)))
-        output=output["outputs"]
+        return payload
+
+    def _output_spec(self, flow_id: str, result: Dict[str, Any]):
+        """The flow's output spec and what it extracts from ``result``, or None if it has no message"""
+        spec = self.output_specs.get(flow_id)
+        if spec is not None and spec.message is not None:
+            try:
+                return spec, spec.extract(result)
+            except LookupError:
+                # The flow changed since its spec was found
+                pass
+        # A spec without a message is searched again, since a later result of
+        # the flow may carry one, e.g. after an error run or an edit
+        spec = OutputSpec.discover(result, _as_document)
+        self.output_specs[flow_id] = spec
+        if spec.message is not None:
+            return spec, spec.extract(result)
+        return spec, None
+
+    @staticmethod
+    def _fallback_response(result: Dict[str, Any]) -> Any:
+        """The answer of a run result in which no message text was found"""
+        output=result["outputs"]
         output=output[0]["outputs"][0]
         # The structure of the output depends on how the flow is configured
         # Typically it would be under a key like 'output' or the name of the final node
@@ -52,8 +222,6 @@ class LangFlowHandler:
                 response_text = output["outputs"]
             elif "results" in output:
                 response_text = output["results"]
-            elif "text" in output["outputs"]:
-                response_text = output["outputs"]["message"]
             else:
                 # If we can't find a standard key, just use the first string value
                 for key, value in output.items():
@@ -67,12 +235,123 @@ class LangFlowHandler:
             response_text = output
         else:
             response_text = str(output)
-        
+        return response_text
+
+    def _build_response(self, result: Dict[str, Any], flow_id: str, session_id: str, include_documents: bool = False) -> Dict[str, Any]:
+        """
+        Extract the chat response from a LangFlow run result
+
+        The answer, its message text and token usage are read along the
+        flow's output spec. With ``include_documents`` the documents the flow
+        retrieved are extracted into the ``documents`` metadata as well.
+        """
+        spec, extracted = self._output_spec(flow_id, result)
+        if extracted is not None:
+            response, text, usage = extracted
+        else:
+            response, usage = self._fallback_response(result), None
+            text = extract_message_text(response)
+
+        metadata = {
+            "flow_id": flow_id,
+            **extract_sources(result),
+            "raw_output": result
+        }
+        if usage is not None:
+            metadata["usage"] = usage
+        if include_documents:
+            if not spec.documents:
+                # The flow's first result retrieved nothing; requests for
+                # documents search its results until one does
+                spec.documents = find_document_lists(result, _as_document)
+            metadata["documents"] = spec.extract_documents(result, _as_document)
         return {
-            "response": response_text,
+            "response": response,
+            "text": text,
             "session_id": session_id,
-            "metadata": {
-                "flow_id": flow_id,
-                "raw_output": result
-            }
-        }
\ No newline at end of file
+            "metadata": metadata
+        }
+
+    async def process_query(
+        self,
+        query: str,
+        flow_id: str,
+        session_id: Optional[str] = None,
+        timer=NULL_TIMER,
+        include_documents: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Process a query using the specified LangFlow flow
+
+        ``timer`` receives the upstream_connect, upstream_ttfb, upstream_total
+        and response_extraction spans. ``include_documents`` adds the
+        retrieved documents to the response metadata.
+        """
+        if not session_id:
+            session_id = str(uuid.uuid4())
+        # API endpoint for the specific flow
+        endpoint = f"/api/v1/run/{flow_id}"
+        payload = self._build_payload(query, session_id)
+        headers = None
+        extensions = {"trace": timer.trace} if timer.enabled else None
+        start = time.perf_counter()
+        async with self.client.stream("POST", endpoint, json=payload, headers=headers, extensions=extensions) as response:
+            timer.record("upstream_ttfb", time.perf_counter() - start)
+            response.raise_for_status()
+            body = await response.aread()
+        timer.record("upstream_total", time.perf_counter() - start)
+        result = json.loads(body)
+
+        # Extract the response from the LangFlow output
+        with timer.span("response_extraction"):
+            return self._build_response(result, flow_id, session_id, include_documents)
+
+    async def stream_query(
+        self,
+        query: str,
+        flow_id: str,
+        session_id: Optional[str] = None,
+        timer=NULL_TIMER,
+        include_documents: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run a query with LangFlow streaming enabled and relay events as they arrive
+
+        Yields ``{"event": "token", "chunk": ...}`` for every generated chunk and
+        finishes with ``{"event": "end", ...}`` carrying the same fields as
+        ``process_query``. LangFlow errors are re-raised as ``UpstreamError``.
+        """
+        if not session_id:
+            session_id = str(uuid.uuid4())
+        endpoint = f"/api/v1/run/{flow_id}"
+        payload = self._build_payload(query, session_id)
+
+        extensions = {"trace": timer.trace} if timer.enabled else None
+        start = time.perf_counter()
+        first_token = True
+        async with self.client.stream("POST", endpoint, params={"stream": "true"}, json=payload, extensions=extensions) as response:
+            timer.record("upstream_ttfb", time.perf_counter() - start)
+            response.raise_for_status()
+            # LangFlow sends one JSON event per line, separated by blank lines
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                event_type = event.get("event")
+                data = event.get("data") or {}
+
+                if event_type == "token":
+                    chunk = data.get("chunk", "")
+                    if chunk:
+                        if first_token:
+                            timer.record("upstream_first_token", time.perf_counter() - start)
+                            first_token = False
+                        yield {"event": "token", "chunk": chunk}
+                elif event_type == "error":
+                    raise UpstreamError(data.get("error") or data.get("text") or "LangFlow stream error")
+                elif event_type == "end":
+                    timer.record("upstream_total", time.perf_counter() - start)
+                    with timer.span("response_extraction"):
+                        end_event = {"event": "end", **self._build_response(data.get("result", {}), flow_id, session_id, include_documents)}
+                    yield end_event
+                    return
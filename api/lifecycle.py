@@ -0,0 +1,41 @@
+# api/lifecycle.py
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+class InFlightTracker:
+    """Count upstream LangFlow calls in progress so shutdown can wait for them"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.accepting = True
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def begin(self):
+        self.in_flight += 1
+        self._idle.clear()
+
+    def end(self):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    @asynccontextmanager
+    async def track(self):
+        self.begin()
+        try:
+            yield
+        finally:
+            self.end()
+
+    async def drain(self, timeout: float) -> int:
+        """Stop accepting work and wait up to ``timeout`` seconds; returns calls still running"""
+        self.accepting = False
+        deadline = time.monotonic() + timeout
+        while self.in_flight and time.monotonic() < deadline:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                break
+        return self.in_flight
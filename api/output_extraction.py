@@ -0,0 +1,170 @@
+# api/output_extraction.py
+"""
+Extraction of chat responses from LangFlow run results along per-flow paths
+
+The first run result of a flow is searched once for where its answer, its
+message text, its token usage and its retrieved documents are. These paths
+are kept per flow as an ``OutputSpec``, and later results of the flow are
+read by indexing along them, without walking or stringifying the rest of
+the output. When a result no longer fits its flow's spec, for example
+because the flow was edited, it is searched again.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+Path = Tuple[Union[str, int], ...]
+
+# Where a component output keeps its message text, most specific first
+MESSAGE_PATHS: Tuple[Path, ...] = (
+    ("outputs", "message", "message"),
+    ("outputs", "message", "text"),
+    ("results", "message", "text"),
+    ("outputs", "message"),
+    ("artifacts", "message"),
+)
+USAGE_KEYS = ("usage", "token_usage", "usage_metadata")
+
+def follow(node: Any, path: Path) -> Any:
+    """The value at ``path``; raises LookupError or TypeError if it is not there"""
+    for key in path:
+        node = node[key]
+    return node
+
+def _component_outputs(result: Dict[str, Any]) -> List[Path]:
+    """Paths of the component outputs of a run result, in order"""
+    paths = []
+    for i, run_output in enumerate(result.get("outputs") or []):
+        for j, _ in enumerate(run_output.get("outputs") or []):
+            paths.append(("outputs", i, "outputs", j))
+    return paths
+
+def _find_message(result: Dict[str, Any]) -> Optional[Tuple[Path, Path]]:
+    """(component output path, message text path) of the first component output with a message"""
+    for component_path in _component_outputs(result):
+        component = follow(result, component_path)
+        if not isinstance(component, dict):
+            continue
+        for relative_path in MESSAGE_PATHS:
+            try:
+                text = follow(component, relative_path)
+            except (LookupError, TypeError):
+                continue
+            if isinstance(text, str):
+                return component_path, component_path + relative_path
+    return None
+
+def _find_usage(node: Any, path: Path = ()) -> Optional[Path]:
+    """Path of the first token usage dict in the result"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in USAGE_KEYS and isinstance(value, dict) and value:
+                return path + (key,)
+            found = _find_usage(value, path + (key,))
+            if found is not None:
+                return found
+    elif isinstance(node, list):
+        for index, item in enumerate(node):
+            found = _find_usage(item, path + (index,))
+            if found is not None:
+                return found
+    return None
+
+def find_document_lists(result: Dict[str, Any], as_document) -> List[Tuple[Path, Optional[str]]]:
+    """
+    Paths of the lists in the result that hold retrieved documents, with the
+    display name of the component they belong to
+
+    ``as_document(node, component)`` returns a document for a node that is
+    one. A list whose documents all appeared in an earlier list (a
+    component's artifacts repeat its results) is left out.
+    """
+    lists = []
+    seen = set()
+
+    def walk(node: Any, path: Path, component: Optional[str]):
+        if isinstance(node, dict):
+            component = node.get("component_display_name") or component
+            for key, value in node.items():
+                walk(value, path + (key,), component)
+        elif isinstance(node, list):
+            documents = [as_document(item, component, path[-1] if path else None) for item in node]
+            documents = [document for document in documents if document is not None]
+            if documents:
+                keys = {(document["id"], document["text"]) for document in documents}
+                if not keys <= seen:
+                    lists.append((path, component))
+                seen.update(keys)
+                return
+            for index, item in enumerate(node):
+                walk(item, path + (index,), component)
+
+    walk(result.get("outputs", []), ("outputs",), None)
+    return lists
+
+class OutputSpec:
+    """Where a flow's run results keep their answer, message text, token usage and documents"""
+
+    def __init__(
+        self,
+        response: Optional[Path],
+        message: Optional[Path],
+        usage: Optional[Path],
+        documents: List[Tuple[Path, Optional[str]]],
+    ):
+        self.response = response
+        self.message = message
+        self.usage = usage
+        self.documents = documents
+
+    @classmethod
+    def discover(cls, result: Dict[str, Any], as_document) -> "OutputSpec":
+        """Search a run result for the paths, once per flow"""
+        found = _find_message(result)
+        component_path, message_path = found if found else (None, None)
+        response_path = None
+        if component_path is not None:
+            component = follow(result, component_path)
+            # The answer object clients receive is the component's outputs
+            response_path = component_path + (("outputs",) if "outputs" in component else ("results",))
+        return cls(response_path, message_path, _find_usage(result), find_document_lists(result, as_document))
+
+    def extract(self, result: Dict[str, Any]) -> Tuple[Any, str, Optional[Dict[str, Any]]]:
+        """
+        (answer, message text, token usage) of a run result
+
+        Raises LookupError when the result does not fit the spec.
+        """
+        if self.message is None:
+            raise LookupError("No message path")
+        try:
+            text = follow(result, self.message)
+            response = follow(result, self.response)
+        except TypeError as e:
+            raise LookupError(str(e)) from e
+        if not isinstance(text, str):
+            raise LookupError("Message is not text")
+        usage = None
+        if self.usage is not None:
+            try:
+                usage = follow(result, self.usage)
+            except (LookupError, TypeError):
+                pass
+        return response, text, usage
+
+    def extract_documents(self, result: Dict[str, Any], as_document) -> List[Dict[str, Any]]:
+        """The documents in the lists recorded for the flow, each once"""
+        documents = []
+        seen = set()
+        for path, component in self.documents:
+            try:
+                items = follow(result, path)
+            except (LookupError, TypeError):
+                continue
+            for item in items if isinstance(items, list) else ():
+                document = as_document(item, component, path[-1])
+                if document is None:
+                    continue
+                key = (document["id"], document["text"])
+                if key not in seen:
+                    seen.add(key)
+                    documents.append(document)
+        return documents
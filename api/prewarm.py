@@ -0,0 +1,134 @@
+# api/prewarm.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class FlowWarmer:
+    """
+    Keeps flows with recent user traffic warm in LangFlow
+
+    The first run of a flow after LangFlow started, or after the flow sat
+    idle, pays for building the graph, connecting vector stores and loading
+    models. ``prewarm`` sends a warm-up run in the background so that cost is
+    not paid inside a user's request. A flow counts as warm when it ran,
+    for a user or as a warm-up, within the last ``warm_ttl`` seconds.
+
+    Only user traffic (``touch``) puts a flow in the LRU of the
+    ``max_flows`` flows kept warm. Each warm-up is a full flow run, LLM
+    included, so a kept flow idle for ``keepalive_interval`` seconds gets
+    another one only while it had user traffic in the last
+    ``keepalive_window`` seconds; after that it leaves the LRU.
+
+    ``run_flow`` performs one warm-up run of a flow.
+    """
+
+    def __init__(
+        self,
+        run_flow: Callable[[str], Awaitable[None]],
+        max_flows: int = 4,
+        keepalive_interval: float = 240.0,
+        warm_ttl: float = 300.0,
+        keepalive_window: float = 1800.0,
+    ):
+        self.run_flow = run_flow
+        self.max_flows = max_flows
+        self.keepalive_interval = keepalive_interval
+        self.warm_ttl = warm_ttl
+        self.keepalive_window = keepalive_window
+        # Flow ID -> monotonic time of its last user request, least recently used first
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        # Flow ID -> monotonic time of its last run of any kind, for flows run within warm_ttl
+        self._last_run: Dict[str, float] = {}
+        self._warming: Dict[str, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def is_warm(self, flow_id: str) -> bool:
+        last_run = self._last_run.get(flow_id)
+        return last_run is not None and time.monotonic() - last_run < self.warm_ttl
+
+    def _record_run(self, flow_id: str):
+        now = time.monotonic()
+        self._last_run[flow_id] = now
+        for other, last_run in list(self._last_run.items()):
+            if now - last_run >= self.warm_ttl:
+                del self._last_run[other]
+
+    def touch(self, flow_id: str):
+        """Record a user's run of the flow, keeping it in the LRU of flows kept warm"""
+        self._record_run(flow_id)
+        self._last_used[flow_id] = time.monotonic()
+        self._last_used.move_to_end(flow_id)
+        while len(self._last_used) > self.max_flows:
+            self._last_used.popitem(last=False)
+
+    def prewarm(self, flow_id: str) -> bool:
+        """Start a warm-up run unless the flow is warm or already warming; returns whether one started"""
+        if self.is_warm(flow_id) or flow_id in self._warming:
+            return False
+        self._warming[flow_id] = asyncio.create_task(self._warm(flow_id))
+        return True
+
+    async def _warm(self, flow_id: str):
+        try:
+            await self.run_flow(flow_id)
+            # A warm-up makes the flow warm but is not traffic that keeps it in the LRU
+            self._record_run(flow_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Warm-up run of flow %s failed: %s", flow_id, e)
+        finally:
+            self._warming.pop(flow_id, None)
+
+    async def _keepalive_loop(self):
+        while True:
+            # Checked several times per interval, so a flow is pinged soon after it has been idle that long
+            await asyncio.sleep(self.keepalive_interval / 8)
+            now = time.monotonic()
+            for flow_id, last_used in list(self._last_used.items()):
+                if now - last_used >= self.keepalive_window:
+                    # No user asked this flow for a while; stop paying for its warm-ups
+                    del self._last_used[flow_id]
+                    continue
+                last_run = self._last_run.get(flow_id, last_used)
+                if now - last_run >= self.keepalive_interval and flow_id not in self._warming:
+                    self._warming[flow_id] = asyncio.create_task(self._warm(flow_id))
+
+    def start(self):
+        """Start the keep-alive pings if an interval is configured"""
+        if self.keepalive_interval > 0 and self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._keepalive_loop())
+
+    async def stop(self):
+        tasks = [self._loop_task, *self._warming.values()]
+        for task in tasks:
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = None
+        self._warming.clear()
+
+    def status(self) -> List[Dict[str, object]]:
+        """Flows kept warm, most recently used first, and flows warmed up without traffic"""
+        now = time.monotonic()
+        kept = [
+            {
+                "flow_id": flow_id,
+                "idle": round(now - last_used, 1),
+                "warm": self.is_warm(flow_id),
+                "kept": True,
+            }
+            for flow_id, last_used in reversed(self._last_used.items())
+        ]
+        others = {flow_id for flow_id in self._last_run if self.is_warm(flow_id)} | set(self._warming)
+        return kept + [
+            {"flow_id": flow_id, "idle": None, "warm": self.is_warm(flow_id), "kept": False}
+            for flow_id in sorted(others - set(self._last_used))
+        ]
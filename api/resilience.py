@@ -0,0 +1,221 @@
+# api/resilience.py
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+import httpx
+
+class UpstreamUnavailable(Exception):
+    """A LangFlow call was refused before it was made; retry after ``retry_after`` seconds"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class UpstreamError(RuntimeError):
+    """LangFlow reported that a run failed"""
+
+def is_upstream_failure(error: Exception) -> bool:
+    """Whether an error says LangFlow is unhealthy, as opposed to a bad request or a bug of ours"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, (httpx.TransportError, UpstreamError))
+
+class CircuitBreaker:
+    """
+    Stop calling a failing flow for a while
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are refused for ``reset_timeout`` seconds. Then a single probe call
+    is let through: it closes the circuit if it succeeds and re-opens it if it
+    fails. A threshold of 0 disables the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        """Raise ``UpstreamUnavailable`` if the call may not be made now"""
+        if self.opened_at is None:
+            return
+        remaining = self.opened_at + self.reset_timeout - time.monotonic()
+        if remaining > 0 or self._probing:
+            raise UpstreamUnavailable("Flow is failing, circuit open", retry_after=max(remaining, 1.0))
+        self._probing = True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or (self.failure_threshold and self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self):
+        """End a call that neither succeeded nor failed, e.g. a rejected request"""
+        self._probing = False
+
+class CircuitBreakers:
+    """
+    One circuit breaker per flow, for at most ``max_breakers`` flows
+
+    Breakers are kept in LRU order. Beyond the limit, the least recently
+    used breakers that hold no failures are dropped first, then closed
+    ones, so made-up flow IDs cannot grow the set without bound or reset
+    the circuit of a failing flow.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, max_breakers: int = 1000):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_breakers = max_breakers
+        self._breakers: "OrderedDict[str, CircuitBreaker]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    def get(self, flow_id: str) -> CircuitBreaker:
+        breaker = self._breakers.get(flow_id)
+        if breaker is None:
+            breaker = self._breakers[flow_id] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self._evict()
+        else:
+            self._breakers.move_to_end(flow_id)
+        return breaker
+
+    def _evict(self):
+        excess = len(self._breakers) - self.max_breakers
+        if excess <= 0:
+            return
+        for keep in (lambda b: b.failures > 0, lambda b: b.state != "closed", lambda b: False):
+            for flow_id, breaker in list(self._breakers.items())[:-1]:
+                if excess <= 0:
+                    return
+                if not keep(breaker):
+                    del self._breakers[flow_id]
+                    excess -= 1
+
+    def state(self, flow_id: str) -> str:
+        """State of the flow's circuit, without creating a breaker for it"""
+        breaker = self._breakers.get(flow_id)
+        return breaker.state if breaker is not None and self.enabled else "closed"
+
+    @asynccontextmanager
+    async def guard(self, flow_id: str):
+        """Refuse the call while the flow's circuit is open and record its outcome"""
+        if not self.enabled:
+            yield
+            return
+        breaker = self.get(flow_id)
+        breaker.before_call()
+        try:
+            yield
+        except Exception as e:
+            if is_upstream_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success()
+
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            flow_id: {"state": breaker.state, "failures": breaker.failures}
+            for flow_id, breaker in self._breakers.items()
+        }
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers asking for the same key"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``; ``shared`` is True for callers that joined another's call"""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            # The call runs as its own task, so the caller that started it
+            # going away does not cancel it for the others
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), shared
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the error retrieved in case every caller went away
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+class AdmissionController:
+    """
+    Bound concurrent LangFlow calls per worker and shed load beyond a queue
+
+    Up to ``max_concurrency`` calls run at once; up to ``max_queue`` more wait
+    at most ``queue_timeout`` seconds for a slot. Anything beyond that is
+    rejected immediately with ``UpstreamUnavailable``. ``max_concurrency`` of
+    0 disables admission control.
+    """
+
+    def __init__(self, max_concurrency: int = 100, max_queue: int = 200, queue_timeout: float = 10.0, retry_after: float = 1.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.running = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore is None:
+            yield
+            return
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise UpstreamUnavailable("Too many requests in flight", retry_after=self.retry_after)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise UpstreamUnavailable("Timed out waiting for a free slot", retry_after=self.retry_after)
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {"running": self.running, "waiting": self.waiting, "rejected": self.rejected}
@@ -0,0 +1,372 @@
+# api/response_cache.py
+import asyncio
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\W_]+|[\W_]+$")
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and strip surrounding punctuation"""
+    query = _WHITESPACE.sub(" ", query.lower()).strip()
+    return _EDGE_PUNCTUATION.sub("", query)
+
+def ngram_vector(text: str, n: int = 3, dimensions: int = 1024) -> Dict[int, float]:
+    """Hash character n-grams of a normalized query into a sparse, L2-normalized vector"""
+    padded = f" {text} "
+    counts: Dict[int, float] = {}
+    for i in range(max(1, len(padded) - n + 1)):
+        bucket = zlib.crc32(padded[i:i + n].encode("utf-8")) % dimensions
+        counts[bucket] = counts.get(bucket, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    return {k: v / norm for k, v in counts.items()}
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+@dataclass
+class CacheEntry:
+    flow_id: str
+    key: str
+    value: Dict[str, Any]
+    vector: Dict[int, float] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    size: int = 0
+
+class CacheBackend(ABC):
+    """Storage for cache entries; eviction policy lives in the backend"""
+
+    evictions: int = 0
+    # Whether calls do I/O, so async callers should run them in a thread
+    blocking: bool = False
+
+    @abstractmethod
+    def get(self, flow_id: str, key: str) -> Optional[CacheEntry]:
+        ...
+
+    @abstractmethod
+    def set(self, entry: CacheEntry):
+        ...
+
+    @abstractmethod
+    def delete(self, flow_id: str, key: str):
+        ...
+
+    @abstractmethod
+    def vectors(self, flow_id: str, created_after: float = 0.0) -> Iterable[Tuple[str, Dict[int, float]]]:
+        """(key, vector) of the flow's entries created after a time, used by the similarity tier"""
+
+    @abstractmethod
+    def invalidate(self, flow_id: Optional[str] = None) -> int:
+        """Drop every entry of a flow (or all flows) and return how many were removed"""
+
+    @abstractmethod
+    def usage(self) -> Tuple[int, int]:
+        """Return (entry count, total bytes)"""
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU cache bounded by entry count and total size"""
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, flow_id: str, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get((flow_id, key))
+            if entry is not None:
+                self._entries.move_to_end((flow_id, key))
+            return entry
+
+    def set(self, entry: CacheEntry):
+        with self._lock:
+            old = self._entries.pop((entry.flow_id, entry.key), None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[(entry.flow_id, entry.key)] = entry
+            self._bytes += entry.size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def delete(self, flow_id: str, key: str):
+        with self._lock:
+            entry = self._entries.pop((flow_id, key), None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def vectors(self, flow_id: str, created_after: float = 0.0) -> List[Tuple[str, Dict[int, float]]]:
+        with self._lock:
+            return [
+                (key, e.vector) for (f, key), e in self._entries.items()
+                if f == flow_id and e.created_at > created_after
+            ]
+
+    def invalidate(self, flow_id: Optional[str] = None) -> int:
+        with self._lock:
+            keys = [k for k in self._entries if flow_id is None or k[0] == flow_id]
+            for k in keys:
+                self._bytes -= self._entries.pop(k).size
+            return len(keys)
+
+    def usage(self) -> Tuple[int, int]:
+        return len(self._entries), self._bytes
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    On-disk cache shared by every process pointing at the same file
+
+    Query vectors are kept decoded in memory for the similarity tier, loaded
+    once and updated as this process stores and evicts entries. Entries
+    stored by other processes only reach the similarity tier after a restart.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str = "data/response_cache.db", max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS response_cache (
+                flow_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                vector TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (flow_id, key)
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS response_cache_lru ON response_cache (last_access)")
+        # Flow ID -> key -> (query vector, created_at)
+        self._vectors: Dict[str, Dict[str, Tuple[Dict[int, float], float]]] = {}
+        for flow_id, key, vector, created_at in self._conn.execute(
+            "SELECT flow_id, key, vector, created_at FROM response_cache"
+        ):
+            self._remember(flow_id, key, json.loads(vector), created_at)
+
+    def _remember(self, flow_id: str, key: str, vector: Dict[Any, float], created_at: float):
+        if vector:
+            self._vectors.setdefault(flow_id, {})[key] = ({int(k): v for k, v in vector.items()}, created_at)
+
+    def _forget(self, flow_id: str, key: str):
+        vectors = self._vectors.get(flow_id)
+        if vectors is not None:
+            vectors.pop(key, None)
+
+    @staticmethod
+    def _to_entry(row) -> CacheEntry:
+        flow_id, key, value, vector, created_at, size = row
+        return CacheEntry(
+            flow_id=flow_id,
+            key=key,
+            value=json.loads(value),
+            vector={int(k): v for k, v in json.loads(vector).items()},
+            created_at=created_at,
+            size=size,
+        )
+
+    def get(self, flow_id: str, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT flow_id, key, value, vector, created_at, size FROM response_cache WHERE flow_id = ? AND key = ?",
+                (flow_id, key),
+            ).fetchone()
+            if row is None:
+                # Possibly evicted by another process
+                self._forget(flow_id, key)
+                return None
+            self._conn.execute(
+                "UPDATE response_cache SET last_access = ? WHERE flow_id = ? AND key = ?",
+                (time.time(), flow_id, key),
+            )
+            return self._to_entry(row)
+
+    def set(self, entry: CacheEntry):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entry.flow_id, entry.key, json.dumps(entry.value), json.dumps(entry.vector),
+                 entry.created_at, time.time(), entry.size),
+            )
+            self._remember(entry.flow_id, entry.key, entry.vector, entry.created_at)
+            self._evict()
+
+    def _evict(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT flow_id, key, size FROM response_cache ORDER BY last_access").fetchall()
+        for flow_id, key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM response_cache WHERE flow_id = ? AND key = ?", (flow_id, key))
+            self._forget(flow_id, key)
+            count -= 1
+            total -= size
+            self.evictions += 1
+
+    def delete(self, flow_id: str, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE flow_id = ? AND key = ?", (flow_id, key))
+            self._forget(flow_id, key)
+
+    def vectors(self, flow_id: str, created_after: float = 0.0) -> List[Tuple[str, Dict[int, float]]]:
+        # Served from memory; values are only read for the best match, through get
+        with self._lock:
+            return [
+                (key, vector) for key, (vector, created_at) in self._vectors.get(flow_id, {}).items()
+                if created_at > created_after
+            ]
+
+    def invalidate(self, flow_id: Optional[str] = None) -> int:
+        with self._lock:
+            if flow_id is None:
+                cursor = self._conn.execute("DELETE FROM response_cache")
+                self._vectors.clear()
+            else:
+                cursor = self._conn.execute("DELETE FROM response_cache WHERE flow_id = ?", (flow_id,))
+                self._vectors.pop(flow_id, None)
+            return cursor.rowcount
+
+    def usage(self) -> Tuple[int, int]:
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache").fetchone()
+        return count, total
+
+class ResponseCache:
+    """
+    Cache of flow responses keyed on (flow_id, normalized query)
+
+    Exact matches are looked up by key. When ``similarity_threshold`` is above
+    zero, a miss falls back to comparing hashed character n-gram vectors of the
+    cached queries of the same flow and returns the closest one at or above the
+    threshold.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 3600.0, similarity_threshold: float = 0.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _expired(self, entry: CacheEntry) -> bool:
+        return bool(self.ttl) and time.time() - entry.created_at > self.ttl
+
+    def get(self, flow_id: str, query: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Return the cached response (or None) and metadata describing the match"""
+        key = normalize_query(query)
+        entry = self.backend.get(flow_id, key)
+        if entry is not None and self._expired(entry):
+            self.backend.delete(flow_id, key)
+            entry = None
+        if entry is not None:
+            self.hits += 1
+            return entry.value, {"cache_hit": True, "cache_match": "exact"}
+
+        if self.similarity_threshold > 0:
+            vector = ngram_vector(key)
+            best, best_score = None, self.similarity_threshold
+            created_after = time.time() - self.ttl if self.ttl else 0.0
+            for candidate_key, candidate_vector in self.backend.vectors(flow_id, created_after):
+                score = cosine(vector, candidate_vector)
+                if score >= best_score:
+                    best, best_score = candidate_key, score
+            # The entry may have been evicted since its vector was read
+            entry = self.backend.get(flow_id, best) if best is not None else None
+            if entry is not None:
+                self.hits += 1
+                self.similar_hits += 1
+                return entry.value, {"cache_hit": True, "cache_match": "similar", "cache_similarity": round(best_score, 4)}
+
+        self.misses += 1
+        return None, {"cache_hit": False}
+
+    async def _run(self, method, *args):
+        # Blocking backends run in a thread, off the event loop
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def aget(self, flow_id: str, query: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        return await self._run(self.get, flow_id, query)
+
+    async def aset(self, flow_id: str, query: str, value: Dict[str, Any]):
+        await self._run(self.set, flow_id, query, value)
+
+    async def ainvalidate(self, flow_id: Optional[str] = None) -> int:
+        return await self._run(self.invalidate, flow_id)
+
+    async def astats(self) -> Dict[str, Any]:
+        return await self._run(self.stats)
+
+    def set(self, flow_id: str, query: str, value: Dict[str, Any]):
+        key = normalize_query(query)
+        vector = ngram_vector(key) if self.similarity_threshold > 0 else {}
+        size = len(json.dumps(value, default=str))
+        self.backend.set(CacheEntry(flow_id=flow_id, key=key, value=value, vector=vector, size=size))
+
+    def invalidate(self, flow_id: Optional[str] = None) -> int:
+        return self.backend.invalidate(flow_id)
+
+    def stats(self) -> Dict[str, Any]:
+        entries, size = self.backend.usage()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.backend.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+def create_response_cache(settings) -> Optional[ResponseCache]:
+    """Build the response cache configured in the API settings, or None if disabled"""
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    if settings.RESPONSE_CACHE_BACKEND == "sqlite":
+        backend = SQLiteCacheBackend(
+            settings.RESPONSE_CACHE_PATH,
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+        )
+    elif settings.RESPONSE_CACHE_BACKEND == "memory":
+        backend = InMemoryCacheBackend(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+        )
+    else:
+        raise ValueError(f"Unknown response cache backend: {settings.RESPONSE_CACHE_BACKEND}")
+    return ResponseCache(
+        backend,
+        ttl=settings.RESPONSE_CACHE_TTL,
+        similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+    )
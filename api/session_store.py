@@ -0,0 +1,276 @@
+# api/session_store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+def _first_sentence(text: str, max_chars: int = 160) -> str:
+    text = " ".join(text.split())
+    end = text.find(". ")
+    if 0 < end < max_chars:
+        return text[:end + 1]
+    return text[:max_chars]
+
+def fold_into_summary(summary: str, messages: List[Dict[str, Any]], max_chars: int) -> str:
+    """
+    Extend a session's summary with messages that fell out of the history window
+
+    This is a cheap extractive summary (the first sentence of each message),
+    capped at the last ``max_chars`` characters; 0 keeps no summary.
+    """
+    if not max_chars:
+        return ""
+    lines = [summary] if summary else []
+    lines += [f"{message['role']}: {_first_sentence(message['content'])}" for message in messages]
+    return "\n".join(lines)[-max_chars:]
+
+def _new_session(session_id: str, flow_id: str, now: float) -> Dict[str, Any]:
+    return {
+        "session_id": session_id,
+        "flow_id": flow_id,
+        "created_at": now,
+        "turns": 0,
+        "messages": 0,
+        "summary": "",
+    }
+
+class SessionStore(ABC):
+    """
+    Conversation session state shared by every API worker
+
+    Records are plain JSON-serializable dicts keyed by session ID. Each
+    session also has an append-only message history numbered by ``seq``; only
+    the last ``max_messages`` messages are kept, and older ones are folded
+    into the session's ``summary`` (up to ``summary_max_chars``).
+    """
+
+    def __init__(self, max_messages: int = 200, summary_max_chars: int = 2000):
+        self.max_messages = max_messages
+        self.summary_max_chars = summary_max_chars
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def put(self, session_id: str, data: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Delete a session and its history"""
+        ...
+
+    @abstractmethod
+    def record_turn(self, session_id: str, flow_id: str, question: str, answer: str) -> Dict[str, Any]:
+        """Count one more turn on the session, creating it on first use, and append both messages"""
+        ...
+
+    @abstractmethod
+    def get_history(self, session_id: str, limit: int = 50, before: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Up to ``limit`` messages with ``seq`` below ``before`` (default: the latest), oldest first"""
+        ...
+
+    @abstractmethod
+    def evict_expired(self, ttl: float) -> int:
+        """Delete sessions not seen for ``ttl`` seconds; returns how many were deleted"""
+        ...
+
+    def close(self):
+        pass
+
+class InMemorySessionStore(SessionStore):
+    """Sessions held in this process only; use with a single worker"""
+
+    def __init__(self, max_messages: int = 200, summary_max_chars: int = 2000):
+        super().__init__(max_messages, summary_max_chars)
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._history: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return dict(session) if session is not None else None
+
+    def put(self, session_id: str, data: Dict[str, Any]):
+        with self._lock:
+            self._sessions[session_id] = dict(data)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            self._history.pop(session_id, None)
+            return self._sessions.pop(session_id, None) is not None
+
+    def record_turn(self, session_id: str, flow_id: str, question: str, answer: str) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id) or _new_session(session_id, flow_id, now)
+            history = self._history.setdefault(session_id, deque())
+            for role, content in (("user", question), ("assistant", answer)):
+                history.append({"seq": session["messages"], "role": role, "content": content, "created_at": now})
+                session["messages"] += 1
+            dropped = []
+            while self.max_messages and len(history) > self.max_messages:
+                dropped.append(history.popleft())
+            if dropped:
+                session["summary"] = fold_into_summary(session["summary"], dropped, self.summary_max_chars)
+            session["flow_id"] = flow_id
+            session["last_seen"] = now
+            session["turns"] += 1
+            self._sessions[session_id] = session
+            return dict(session)
+
+    def get_history(self, session_id: str, limit: int = 50, before: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            history = list(self._history.get(session_id, ()))
+        if before is not None:
+            history = [message for message in history if message["seq"] < before]
+        return history[-limit:] if limit else []
+
+    def evict_expired(self, ttl: float) -> int:
+        cutoff = time.time() - ttl
+        with self._lock:
+            expired = [sid for sid, session in self._sessions.items() if session.get("last_seen", 0) < cutoff]
+            for session_id in expired:
+                del self._sessions[session_id]
+                self._history.pop(session_id, None)
+        return len(expired)
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a local SQLite file that every worker on the host can open"""
+
+    def __init__(self, path: str = "data/sessions.db", max_messages: int = 200, summary_max_chars: int = 2000):
+        super().__init__(max_messages, summary_max_chars)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at)")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            )"""
+        )
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, session_id: str, data: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                (session_id, json.dumps(data, default=str), time.time()),
+            )
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def record_turn(self, session_id: str, flow_id: str, question: str, answer: str) -> Dict[str, Any]:
+        # Read-modify-write in one transaction so concurrent workers don't lose turns
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+                now = time.time()
+                session = json.loads(row[0]) if row else _new_session(session_id, flow_id, now)
+                # Sessions created before histories were kept lack these fields
+                session.setdefault("messages", 0)
+                session.setdefault("summary", "")
+                for role, content in (("user", question), ("assistant", answer)):
+                    self._conn.execute(
+                        "INSERT INTO messages VALUES (?, ?, ?, ?, ?)",
+                        (session_id, session["messages"], role, content, now),
+                    )
+                    session["messages"] += 1
+                if self.max_messages:
+                    # Messages that fell out of the window go into the summary
+                    cutoff = session["messages"] - self.max_messages
+                    dropped = self._conn.execute(
+                        "SELECT role, content FROM messages WHERE session_id = ? AND seq < ? ORDER BY seq",
+                        (session_id, cutoff),
+                    ).fetchall()
+                    if dropped:
+                        session["summary"] = fold_into_summary(
+                            session["summary"],
+                            [{"role": role, "content": content} for role, content in dropped],
+                            self.summary_max_chars,
+                        )
+                        self._conn.execute("DELETE FROM messages WHERE session_id = ? AND seq < ?", (session_id, cutoff))
+                session["flow_id"] = flow_id
+                session["last_seen"] = now
+                session["turns"] += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                    (session_id, json.dumps(session, default=str), now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return session
+
+    def get_history(self, session_id: str, limit: int = 50, before: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT seq, role, content, created_at FROM messages
+                   WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?""",
+                (session_id, before if before is not None else 2 ** 62, limit),
+            ).fetchall()
+        return [
+            {"seq": seq, "role": role, "content": content, "created_at": created_at}
+            for seq, role, content, created_at in reversed(rows)
+        ]
+
+    def evict_expired(self, ttl: float) -> int:
+        cutoff = time.time() - ttl
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM messages WHERE session_id IN (SELECT session_id FROM sessions WHERE updated_at < ?)",
+                    (cutoff,),
+                )
+                cursor = self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+    def close(self):
+        self._conn.close()
+
+def create_session_store(settings) -> SessionStore:
+    """Build the session store configured in the API settings"""
+    limits = {
+        "max_messages": settings.HISTORY_MAX_MESSAGES,
+        "summary_max_chars": settings.HISTORY_SUMMARY_MAX_CHARS,
+    }
+    if settings.SESSION_BACKEND == "sqlite":
+        return SQLiteSessionStore(settings.SESSION_DB_PATH, **limits)
+    if settings.SESSION_BACKEND == "memory":
+        return InMemorySessionStore(**limits)
+    raise ValueError(f"Unknown session backend: {settings.SESSION_BACKEND}")
@@ -0,0 +1,96 @@
+# benchmarks/bench_async_handler.py
+"""Concurrent /chat throughput: blocking requests-based handler vs. the async handler.
+
+Starts a stub LangFlow with a fixed per-run latency, then serves two API apps
+against it: a replica of the previous endpoint (``async def`` calling a
+synchronous ``requests.Session``) and the current ``api/app.py``. Both are
+driven with the same number of concurrent clients.
+
+    python benchmarks/bench_async_handler.py --latency 0.2 --concurrency 32 --requests 128
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import requests
+from fastapi import FastAPI
+
+from common import add_api_to_path, percentile, print_table, serve_in_thread
+from stub_langflow import create_app as create_stub_app
+
+def create_legacy_app(langflow_url: str) -> FastAPI:
+    """The /chat endpoint as it was before the async handler"""
+    app = FastAPI()
+    session = requests.Session()
+
+    @app.post("/chat")
+    async def chat(request: dict):
+        response = session.post(
+            f"{langflow_url}/api/v1/run/{request['flow_id']}",
+            json={"input_value": request["query"], "output_type": "chat", "input_type": "chat"},
+        )
+        response.raise_for_status()
+        return {"response": response.json()["outputs"][0]["outputs"][0]["outputs"], "session_id": "x"}
+
+    return app
+
+async def drive(url: str, concurrency: int, total: int) -> dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(f"{url}/chat", json={"query": f"question {i}", "flow_id": "flow-0"})
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "errors": errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub LangFlow run latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--port", type=int, default=18000, help="First of three consecutive ports to use")
+    args = parser.parse_args()
+
+    stub_url = f"http://127.0.0.1:{args.port}"
+    serve_in_thread(create_stub_app(latency=args.latency), args.port)
+
+    os.environ["LANGFLOW_API_URL"] = stub_url
+    add_api_to_path()
+    from app import app as async_app
+
+    serve_in_thread(create_legacy_app(stub_url), args.port + 1)
+    serve_in_thread(async_app, args.port + 2)
+
+    rows = []
+    for name, port in (("blocking (requests)", args.port + 1), ("async (httpx pool)", args.port + 2)):
+        result = asyncio.run(drive(f"http://127.0.0.1:{port}", args.concurrency, args.requests))
+        rows.append({"handler": name, **result})
+
+    print(f"stub latency={args.latency}s concurrency={args.concurrency} requests={args.requests}")
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_chat_render.py
+"""Per-rerun render time of the chatbot transcript vs. conversation length.
+
+Runs ``ChatInterface.display_chat_history`` in Streamlit's ``AppTest``
+harness with conversations of increasing length, and compares it with
+rendering every message as a chat bubble (the previous behaviour). The
+tail view should stay flat as the conversation grows.
+
+    python benchmarks/bench_chat_render.py --messages 100 1000 5000
+"""
+import argparse
+import statistics
+
+from streamlit.testing.v1 import AppTest
+
+from common import CHATBOT_DIR, print_table
+
+SCRIPT = """
+import sys
+import time
+import streamlit as st
+sys.path.insert(0, {chatbot_dir!r})
+from components.chat_interface import ChatInterface
+
+if "conversation" not in st.session_state:
+    words = " and some **markdown** text" * {words}
+    st.session_state.conversation = [
+        {{"role": "user" if i % 2 == 0 else "assistant", "content": f"Message {{i}}{{words}}", "seq": i}}
+        for i in range({messages})
+    ]
+    st.session_state.messages = st.session_state.conversation[-ChatInterface.VISIBLE_MESSAGES:]
+    st.session_state.older_pages = []
+    st.session_state.session_id = "bench-session"
+
+if {render_all}:
+    start = time.perf_counter()
+    for message in st.session_state.conversation:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+    st.session_state.render_ms = (time.perf_counter() - start) * 1000
+else:
+    ChatInterface().display_chat_history()
+"""
+
+def measure(messages: int, render_all: bool, reruns: int, words: int) -> float:
+    """Median render time in milliseconds over ``reruns`` reruns after the first"""
+    script = SCRIPT.format(chatbot_dir=CHATBOT_DIR, messages=messages, render_all=render_all, words=words)
+    app = AppTest.from_string(script, default_timeout=120)
+    app.run()
+    timings = []
+    for _ in range(reruns):
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+        timings.append(app.session_state.render_ms)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--words", type=int, default=20, help="Repetitions of filler text per message")
+    args = parser.parse_args()
+
+    rows = []
+    for messages in args.messages:
+        all_ms = measure(messages, True, args.reruns, args.words)
+        tail_ms = measure(messages, False, args.reruns, args.words)
+        rows.append({
+            "messages": messages,
+            "render_all_ms": round(all_ms, 1),
+            "tail_ms": round(tail_ms, 1),
+            "speedup": f"{all_ms / tail_ms:.1f}x" if tail_ms else "-",
+        })
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
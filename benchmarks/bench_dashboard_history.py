@@ -0,0 +1,100 @@
+# benchmarks/bench_dashboard_history.py
+"""Time to load a flow's evaluation history for the dashboard.
+
+Fills a temporary results store and aggregate store with ``--runs`` synthetic
+runs of ``--questions`` questions each (one run a day, so 1095 runs are three
+years). It then compares building the history DataFrame row by row from the
+run summaries, as the dashboard did before, with reading the precomputed
+Parquet aggregates, with and without column projection. The cost of writing
+one run's aggregates is reported as well.
+
+    python benchmarks/bench_dashboard_history.py --runs 1095 --questions 100
+"""
+import argparse
+import datetime
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import add_root_to_path, print_table
+
+add_root_to_path()
+from evaluation.aggregates import AggregateStore, compute_aggregates
+from evaluation.results_store import ResultsStore
+
+METRICS = ["faithfulness", "answer_relevancy", "context_relevancy", "context_recall", "harmfulness"]
+
+def seed(results_store: ResultsStore, aggregates: AggregateStore, runs: int, questions: int) -> float:
+    """Store synthetic runs; returns the mean time to write one run's aggregates in ms"""
+    rng = np.random.default_rng(0)
+    start_date = datetime.datetime(2020, 1, 1)
+    write_times = []
+    for i in range(runs):
+        scores = pd.DataFrame(rng.beta(5, 2, size=(questions, len(METRICS))), columns=METRICS)
+        scores.insert(0, "question", [f"Question {q}" for q in range(questions)])
+        result = {
+            "flow_id": "bench-flow",
+            "flow_version": "1",
+            "timestamp": (start_date + datetime.timedelta(days=i)).strftime("%Y%m%d_%H%M%S"),
+            "metrics": scores[METRICS].mean().to_dict(),
+            "aggregates": compute_aggregates(scores[METRICS]),
+            "detailed_results": scores.to_dict(),
+            "sample_size": questions,
+        }
+        run_id = results_store.add_result(result)
+        start = time.perf_counter()
+        aggregates.add_run(run_id, result, scores)
+        write_times.append(time.perf_counter() - start)
+    return statistics.mean(write_times) * 1000
+
+def load_row_by_row(results_store: ResultsStore) -> pd.DataFrame:
+    """The dashboard's previous approach"""
+    historical_data = []
+    for result in results_store.list_results("bench-flow"):
+        historical_data.append({
+            "timestamp": result.get("timestamp", "Unknown"),
+            "faithfulness": result['metrics']['faithfulness'],
+            "answer_relevancy": result['metrics']['answer_relevancy'],
+            "context_relevancy": result['metrics']['context_relevancy'],
+            "context_recall": result['metrics']['context_recall'],
+            "safety": 1 - result['metrics']['harmfulness']
+        })
+    return pd.DataFrame(historical_data)
+
+def timed(load, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=1095)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results_store = ResultsStore(f"{tmp_dir}/results.db")
+        aggregates = AggregateStore(f"{tmp_dir}/aggregates")
+        write_ms = seed(results_store, aggregates, args.runs, args.questions)
+        dashboard_columns = [f"{metric}_mean" for metric in METRICS] + ["faithfulness_median", "faithfulness_p10", "faithfulness_p90"]
+
+        rows = [
+            {"load": "summaries row by row", "ms": timed(lambda: load_row_by_row(results_store), args.repeat)},
+            {"load": "parquet, all columns", "ms": timed(lambda: aggregates.load_runs("bench-flow"), args.repeat)},
+            {"load": "parquet, dashboard columns", "ms": timed(lambda: aggregates.load_runs("bench-flow", dashboard_columns), args.repeat)},
+            {"load": "parquet, latest run scores", "ms": timed(lambda: aggregates.load_scores("bench-flow", args.runs), args.repeat)},
+        ]
+        for row in rows:
+            row["ms"] = round(row["ms"], 2)
+        print(f"{args.runs} runs x {args.questions} questions; writing one run's aggregates took {write_ms:.1f} ms on average")
+        print_table(rows)
+
+if __name__ == "__main__":
+    main()
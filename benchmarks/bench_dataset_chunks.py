@@ -0,0 +1,102 @@
+# benchmarks/bench_dataset_chunks.py
+"""Peak memory and wall time of evaluating a large question set whole or in chunks.
+
+Writes ``--questions`` synthetic questions to a JSON Lines file and evaluates
+them with the local metrics tier against an in-process client that answers
+instantly: once loaded whole through ``RagasEvaluator.evaluate_flow`` and once
+streamed through ``RagasEvaluator.evaluate_dataset`` at each ``--chunk-size``.
+Every run uses fresh checkpoint and result stores. Peak memory is the Python
+heap as traced by tracemalloc.
+
+    python benchmarks/bench_dataset_chunks.py --questions 20000 --chunk-size 500 2000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from common import add_root_to_path, print_table
+
+add_root_to_path()
+from evaluation.dataset import EvaluationDataset
+from evaluation.ragas_evaluator import RagasEvaluator
+
+class InstantClient:
+    """Answers every question at once with a fixed-length answer and context"""
+
+    def __init__(self, answer_words: int, context_words: int):
+        rng = random.Random(0)
+        vocabulary = [f"word{i}" for i in range(5000)]
+        self.answer = " ".join(rng.choices(vocabulary, k=answer_words))
+        self.context = " ".join(rng.choices(vocabulary, k=context_words))
+
+    def send_query(self, query, flow_id, use_cache=True, projection=None, include_documents=False, use_session=True):
+        return {"response": f"{query} {self.answer}", "metadata": {"context": self.context}}
+
+def write_questions(path: str, count: int):
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(json.dumps({
+                "question": f"Evaluation question {i}",
+                "ground_truth": f"Ground truth answer {i} for question {i}",
+                "category": f"category-{i % 5}",
+            }) + "\n")
+
+def measure(directory: str, run):
+    evaluator = RagasEvaluator(
+        results_dir=os.path.join(directory, "results"),
+        checkpoint_path=os.path.join(directory, "checkpoints.db"),
+        results_db_path=os.path.join(directory, "results.db"),
+        aggregates_dir=os.path.join(directory, "aggregates"),
+        score_cache_path=os.path.join(directory, "score_cache.db"),
+        use_batch=False,
+        metric_tier="local",
+    )
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = run(evaluator)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--answer-words", type=int, default=80)
+    parser.add_argument("--context-words", type=int, default=300)
+    args = parser.parse_args()
+
+    client = InstantClient(args.answer_words, args.context_words)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "questions.jsonl")
+        write_questions(path, args.questions)
+
+        runs = [("whole", None)] + [("chunked", size) for size in args.chunk_size]
+        for index, (mode, chunk_size) in enumerate(runs):
+            run_directory = os.path.join(directory, f"run-{index}")
+            if chunk_size is None:
+                run = lambda evaluator: evaluator.evaluate_flow(
+                    "flow-0", client, flow_version="v1", eval_data=list(EvaluationDataset(path))
+                )
+            else:
+                run = lambda evaluator: evaluator.evaluate_dataset(
+                    "flow-0", client, EvaluationDataset(path), chunk_size=chunk_size, flow_version="v1"
+                )
+            result, elapsed, peak = measure(run_directory, run)
+            rows.append({
+                "mode": mode,
+                "chunk_size": chunk_size or args.questions,
+                "elapsed_s": round(elapsed, 2),
+                "peak_mb": round(peak / 2 ** 20, 1),
+                "rouge_1": round(result["metrics"]["rouge_1"], 4),
+            })
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
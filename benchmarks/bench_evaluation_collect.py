@@ -0,0 +1,75 @@
+# benchmarks/bench_evaluation_collect.py
+"""Wall time of the evaluation collection stage at different concurrency levels.
+
+Runs the API against a stub LangFlow with ``--latency`` seconds per flow run
+and sends ``--questions`` questions with the same ``ResponseCollector`` that
+``RagasEvaluator.evaluate_flow`` uses. They are sent once one by one through
+``APIClient.send_query`` and once as a single ``/chat/batch`` request through
+``APIClient.send_batch``. Concurrency 1 is equivalent to the previous
+sequential loop.
+
+    python benchmarks/bench_evaluation_collect.py --latency 0.5 --questions 100 --concurrency 1 8 32
+"""
+import argparse
+import os
+import time
+
+from common import add_api_to_path, add_chatbot_to_path, add_root_to_path, print_table, serve_in_thread
+from stub_langflow import create_app as create_stub_app
+
+def summarize(path, concurrency, questions, results, elapsed):
+    ordered = all(r.question == q for r, q in zip(results, questions))
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "questions_per_s": round(len(questions) / elapsed, 1),
+        "errors": sum(r.error is not None for r in results),
+        "ordered": ordered,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub LangFlow run latency in seconds")
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Max requests per second, 0 = unlimited")
+    parser.add_argument("--port", type=int, default=18200, help="First of two consecutive ports to use")
+    args = parser.parse_args()
+
+    serve_in_thread(create_stub_app(latency=args.latency), args.port)
+    os.environ["LANGFLOW_API_URL"] = f"http://127.0.0.1:{args.port}"
+    add_api_to_path()
+    from app import app
+    serve_in_thread(app, args.port + 1)
+
+    add_chatbot_to_path()
+    add_root_to_path()
+    from utils.api_client import APIClient
+    from evaluation.collector import ResponseCollector
+
+    client = APIClient(f"http://127.0.0.1:{args.port + 1}", pool_maxsize=max(args.concurrency))
+    questions = [f"Evaluation question {i}" for i in range(args.questions)]
+
+    send = lambda q: client.send_query(query=q, flow_id="flow-0", use_cache=False)
+    rows = []
+    for concurrency in args.concurrency:
+        for path in ("/chat", "/chat/batch"):
+            collector = ResponseCollector(max_concurrency=concurrency, rate_limit=args.rate_limit)
+            start = time.perf_counter()
+            if path == "/chat":
+                results = collector.collect(questions, send)
+            else:
+                results = collector.collect_batch(
+                    questions,
+                    lambda batch: client.send_batch(batch, flow_id="flow-0", use_cache=False, max_concurrency=concurrency),
+                    send,
+                )
+            elapsed = time.perf_counter() - start
+            rows.append(summarize(path, concurrency, questions, results, elapsed))
+
+    print(f"stub latency={args.latency}s questions={args.questions} rate_limit={args.rate_limit or 'none'}")
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
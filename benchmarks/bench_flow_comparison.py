@@ -0,0 +1,58 @@
+# benchmarks/bench_flow_comparison.py
+"""Wall time of the paired bootstrap comparison of candidate flows.
+
+Builds synthetic per-question scores for a baseline and ``--candidates``
+candidate flows and runs ``compare_scores`` on them with different numbers of
+worker processes. ``--workers 1`` runs every bootstrap in this process.
+
+    python benchmarks/bench_flow_comparison.py --candidates 4 --questions 500 --resamples 10000 --workers 1 2 4
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import add_root_to_path, print_table
+
+add_root_to_path()
+from evaluation.comparison import compare_scores
+
+METRICS = ["faithfulness", "answer_relevancy", "context_relevancy", "context_recall", "harmfulness"]
+
+def synthetic_scores(rng: np.random.Generator, questions: int, shift: float) -> pd.DataFrame:
+    scores = pd.DataFrame(np.clip(rng.beta(5, 2, size=(questions, len(METRICS))) + shift, 0, 1), columns=METRICS)
+    scores.insert(0, "question_hash", [f"q{i}" for i in range(questions)])
+    return scores
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=4)
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--resamples", type=int, default=10000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    baseline = synthetic_scores(rng, args.questions, 0.0)
+    candidates = {f"flow-{i}": synthetic_scores(rng, args.questions, 0.01 * i) for i in range(1, args.candidates + 1)}
+
+    rows = []
+    reference = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        comparison = compare_scores(baseline, candidates, METRICS, n_resamples=args.resamples, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = comparison
+        rows.append({
+            "workers": workers,
+            "comparisons": len(comparison),
+            "elapsed_s": round(elapsed, 2),
+            "same_result": comparison.equals(reference),
+            "significant": int(comparison["significant"].sum()),
+        })
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
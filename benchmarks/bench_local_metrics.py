@@ -0,0 +1,58 @@
+# benchmarks/bench_local_metrics.py
+"""Time to score a question set with the local (no LLM) metrics tier.
+
+Generates ``--questions`` synthetic evaluation rows with answers, ground truths
+and retrieved contexts of realistic lengths and scores them with every local
+metric in one batch.
+
+    python benchmarks/bench_local_metrics.py --questions 100 1000 10000
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from common import add_root_to_path, print_table
+
+add_root_to_path()
+from evaluation.local_metrics import LOCAL_METRICS, score_local_metrics
+
+def synthetic_rows(count: int, answer_words: int, context_words: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    text = lambda words: " ".join(rng.choices(vocabulary, k=words))
+    return pd.DataFrame([
+        {
+            "question": text(12),
+            "answer": text(answer_words),
+            "contexts": [text(context_words)],
+            "ground_truth": text(answer_words // 2),
+        }
+        for _ in range(count)
+    ])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--answer-words", type=int, default=80)
+    parser.add_argument("--context-words", type=int, default=300)
+    args = parser.parse_args()
+
+    rows = []
+    for count in args.questions:
+        data = synthetic_rows(count, args.answer_words, args.context_words)
+        start = time.perf_counter()
+        scores = score_local_metrics(data)
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "questions": count,
+            "metrics": len(LOCAL_METRICS),
+            "elapsed_s": round(elapsed, 3),
+            "questions_per_s": round(count / elapsed),
+            "nan_scores": int(scores.isna().sum().sum()),
+        })
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_output_extraction.py
+"""Time to extract a chat response from LangFlow run results of different sizes.
+
+Compares the previous extraction, which indexed into the first component
+output and then walked the answer object for its text and the whole result for
+retrieved documents, with ``LangFlowHandler._build_response``, which reads them
+along the flow's cached output spec. Payloads are built like the stub
+LangFlow's, with ``--documents`` retrieved documents of ``--document-words``
+words and ``--answer-words`` words per answer. Run results recorded from a real
+LangFlow can be added with ``--payload`` (JSON files as returned by
+``POST /api/v1/run/{flow_id}``).
+
+    python benchmarks/bench_output_extraction.py --answer-words 50 400 --documents 0 4 20
+    python benchmarks/bench_output_extraction.py --payload recorded_run.json
+"""
+import argparse
+import json
+import os
+import time
+
+from common import add_api_to_path, print_table
+from stub_langflow import make_run_result
+
+add_api_to_path()
+from langflow_handler import LangFlowHandler, extract_documents, extract_message_text
+
+def legacy_extract(result: dict, include_documents: bool) -> tuple:
+    """The extraction path as it was before output specs"""
+    output = result["outputs"][0]["outputs"][0]
+    if "outputs" in output:
+        response = output["outputs"]
+    elif "results" in output:
+        response = output["results"]
+    else:
+        response = next((value for value in output.values() if isinstance(value, str) and value), None) or str(output)
+    metadata = {"flow_id": "flow-0", "raw_output": result}
+    if include_documents:
+        metadata["documents"] = extract_documents(result)
+    legacy = {"response": response, "session_id": "session", "metadata": metadata}
+    return legacy["response"], extract_message_text(response), metadata.get("documents")
+
+def with_documents(result: dict, count: int, words: int) -> dict:
+    """A run result whose retriever returned ``count`` documents of ``words`` words"""
+    query = result["outputs"][0]["inputs"]["input_value"]
+    result = make_run_result("flow-0", query, result["outputs"][0]["outputs"][0]["outputs"]["message"]["message"], count)
+    for component in result["outputs"][0]["outputs"][1:]:
+        for key in ("results", "artifacts"):
+            for document in component[key]["search_results"]:
+                document["data"]["text"] += " filler" * words
+    return result
+
+def time_per_call(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answer-words", type=int, nargs="+", default=[50, 400])
+    parser.add_argument("--documents", type=int, nargs="+", default=[0, 4, 20])
+    parser.add_argument("--document-words", type=int, default=200)
+    parser.add_argument("--payload", nargs="*", default=[], help="Recorded LangFlow run results (JSON files)")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    payloads = []
+    for answer_words in args.answer_words:
+        answer = " ".join(f"word{i}" for i in range(answer_words))
+        for documents in args.documents:
+            result = with_documents(make_run_result("flow-0", "question", answer), documents, args.document_words)
+            payloads.append((f"stub {answer_words}w/{documents}d", result))
+    for path in args.payload:
+        with open(path) as f:
+            payloads.append((os.path.basename(path), json.load(f)))
+
+    handler = LangFlowHandler("http://127.0.0.1:1")
+    rows = []
+    for name, result in payloads:
+        for include_documents in (False, True):
+            spec_response = handler._build_response(result, name, "session", include_documents)
+            legacy_response, legacy_text, legacy_documents = legacy_extract(result, include_documents)
+            same = spec_response["text"] == legacy_text and spec_response["response"] == legacy_response
+            if include_documents:
+                same = same and spec_response["metadata"]["documents"] == legacy_documents
+            legacy = time_per_call(lambda: legacy_extract(result, include_documents), args.repeat)
+            spec = time_per_call(lambda: handler._build_response(result, name, "session", include_documents), args.repeat)
+            rows.append({
+                "payload": name,
+                "kb": round(len(json.dumps(result)) / 1024, 1),
+                "documents": include_documents,
+                "legacy_us": round(legacy * 1e6, 1),
+                "spec_us": round(spec * 1e6, 1),
+                "speedup": round(legacy / spec, 1),
+                "same_result": same,
+            })
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
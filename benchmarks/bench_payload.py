@@ -0,0 +1,118 @@
+# benchmarks/bench_payload.py
+"""/chat payload size and latency per response projection and compression.
+
+Serves a replica of the previous /chat endpoint, which round-tripped the
+LangFlow result through ``json.dumps(indent=2)``, returned the raw output and
+validated it through the response model. It also serves the current
+``api/app.py`` with gzip compression enabled. Each projection is requested with
+and without ``Accept-Encoding: gzip``. The response cache is bypassed so every
+request runs the stub flow. ``--answer-words`` controls the size of the stub
+LangFlow output.
+
+    python benchmarks/bench_payload.py --answer-words 400 --requests 200
+"""
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from common import add_api_to_path, percentile, print_table, serve_in_thread
+from stub_langflow import create_app as create_stub_app
+
+class LegacyQueryRequest(BaseModel):
+    query: str
+    flow_id: str
+    session_id: Optional[str] = None
+
+class LegacyQueryResponse(BaseModel):
+    response: Dict[Any, Any] = {}
+    session_id: str
+    metadata: Dict[Any, Any] = {}
+
+def create_legacy_app(langflow_url: str) -> FastAPI:
+    """The /chat response path as it was before projections"""
+    app = FastAPI()
+    client = httpx.AsyncClient(base_url=langflow_url)
+
+    @app.post("/chat", response_model=LegacyQueryResponse)
+    async def chat(request: LegacyQueryRequest):
+        response = await client.post(
+            f"/api/v1/run/{request.flow_id}",
+            json={"input_value": request.query, "output_type": "chat", "input_type": "chat"},
+        )
+        response.raise_for_status()
+        result = response.json()
+        output = json.loads(json.dumps(result, indent=2))["outputs"][0]["outputs"][0]
+        return {
+            "response": output["outputs"],
+            "session_id": "x",
+            "metadata": {"flow_id": request.flow_id, "raw_output": result},
+        }
+
+    return app
+
+def measure(client: httpx.Client, url: str, body: dict, encoding: str, requests: int) -> dict:
+    latencies = []
+    wire_bytes = 0
+    for i in range(requests):
+        start = time.perf_counter()
+        response = client.post(
+            f"{url}/chat",
+            json={**body, "query": f"question {i}"},
+            headers={"Accept-Encoding": encoding},
+        )
+        response.raise_for_status()
+        response.json()
+        latencies.append(time.perf_counter() - start)
+        wire_bytes += response.num_bytes_downloaded
+    return {
+        "bytes": wire_bytes // requests,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub LangFlow run latency in seconds")
+    parser.add_argument("--answer-words", type=int, default=400)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--port", type=int, default=18600, help="First of three consecutive ports to use")
+    args = parser.parse_args()
+
+    stub_url = f"http://127.0.0.1:{args.port}"
+    serve_in_thread(create_stub_app(args.latency, answer_words=args.answer_words), args.port)
+    serve_in_thread(create_legacy_app(stub_url), args.port + 1)
+    legacy_url = f"http://127.0.0.1:{args.port + 1}"
+
+    os.environ["LANGFLOW_API_URL"] = stub_url
+    os.environ["RESPONSE_COMPRESSION"] = "gzip"
+    add_api_to_path()
+    from app import app
+
+    serve_in_thread(app, args.port + 2)
+    api_url = f"http://127.0.0.1:{args.port + 2}"
+
+    rows = []
+    with httpx.Client(timeout=60) as client:
+        # Warm up connections on both sides
+        measure(client, legacy_url, {"flow_id": "flow-0"}, "identity", 5)
+        measure(client, api_url, {"flow_id": "flow-0", "use_cache": False}, "identity", 5)
+
+        rows.append({"endpoint": "previous /chat", "encoding": "identity",
+                     **measure(client, legacy_url, {"flow_id": "flow-0"}, "identity", args.requests)})
+        for projection in ("full", "sources", "minimal"):
+            for encoding in ("identity", "gzip"):
+                body = {"flow_id": "flow-0", "use_cache": False, "projection": projection}
+                rows.append({"endpoint": f"/chat projection={projection}", "encoding": encoding,
+                             **measure(client, api_url, body, encoding, args.requests)})
+
+    print(f"answer_words={args.answer_words} requests={args.requests}")
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
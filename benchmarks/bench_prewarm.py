@@ -0,0 +1,84 @@
+# benchmarks/bench_prewarm.py
+"""Latency of the first question to a flow with and without prewarming.
+
+Runs the API against a stub LangFlow whose first run of a flow takes
+``--cold-start`` extra seconds. For each of ``--flows`` flows the script
+selects the flow as the chat sidebar does, waits ``--think-time`` seconds as
+a user typing the first question would, then asks it and a follow-up
+question. With ``prewarm`` the selection sends ``POST /flows/{id}/prewarm``
+first; without it the first question runs the flow cold. The flow state the
+API reports and the ``langflow_run_duration_seconds`` histogram in /metrics
+tell cold runs, warm runs and warm-up runs apart.
+
+    python benchmarks/bench_prewarm.py --cold-start 2 --latency 0.2 --think-time 3
+"""
+import argparse
+import os
+import re
+import time
+
+import httpx
+
+from common import add_api_to_path, print_table, serve_in_thread
+from stub_langflow import create_app as create_stub_app
+
+def ask(client: httpx.Client, url: str, flow_id: str, query: str) -> dict:
+    start = time.perf_counter()
+    response = client.post(
+        f"{url}/chat",
+        json={"query": query, "flow_id": flow_id, "use_cache": False, "include_timings": True},
+    )
+    response.raise_for_status()
+    return {"ms": (time.perf_counter() - start) * 1000, "state": response.json()["metadata"].get("flow_state")}
+
+def run_counts(metrics_text: str) -> dict:
+    """Runs per flow state from the langflow_run_duration_seconds histogram"""
+    counts = {}
+    for state, count in re.findall(r'langflow_run_duration_seconds_count\{flow_id="[^"]*",state="(\w+)"\} (\S+)', metrics_text):
+        counts[state] = counts.get(state, 0) + int(float(count))
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cold-start", type=float, default=2.0, help="Extra seconds for the first run of a flow")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub LangFlow run latency in seconds")
+    parser.add_argument("--think-time", type=float, default=3.0, help="Seconds between selecting a flow and asking")
+    parser.add_argument("--flows", type=int, default=2, help="Flows per mode")
+    parser.add_argument("--port", type=int, default=18400, help="First of two consecutive ports to use")
+    args = parser.parse_args()
+
+    serve_in_thread(
+        create_stub_app(latency=args.latency, num_flows=2 * args.flows, cold_start=args.cold_start), args.port
+    )
+    os.environ["LANGFLOW_API_URL"] = f"http://127.0.0.1:{args.port}"
+    # Flows are only warmed up when selected, so both modes start cold
+    os.environ["FLOW_PREWARM_STARTUP"] = ""
+    add_api_to_path()
+    from app import app
+    serve_in_thread(app, args.port + 1)
+    url = f"http://127.0.0.1:{args.port + 1}"
+
+    rows = []
+    with httpx.Client(timeout=60) as client:
+        for index in range(2 * args.flows):
+            flow_id = f"flow-{index}"
+            prewarm = index % 2 == 1
+            if prewarm:
+                client.post(f"{url}/flows/{flow_id}/prewarm").raise_for_status()
+            time.sleep(args.think_time)
+            first = ask(client, url, flow_id, "First question")
+            follow_up = ask(client, url, flow_id, "Follow-up question")
+            rows.append({
+                "flow": flow_id,
+                "mode": "prewarm" if prewarm else "no prewarm",
+                "first_ms": round(first["ms"]),
+                "first_state": first["state"],
+                "follow_up_ms": round(follow_up["ms"]),
+                "follow_up_state": follow_up["state"],
+            })
+        counts = run_counts(client.get(f"{url}/metrics").text)
+    print_table(rows)
+    print(f"\nLangFlow runs by flow state: {counts}")
+
+if __name__ == "__main__":
+    main()
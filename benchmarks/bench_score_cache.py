@@ -0,0 +1,81 @@
+# benchmarks/bench_score_cache.py
+"""Judge calls saved by the metric score cache over nightly runs of a stable flow.
+
+Simulates ``--nights`` evaluation runs of ``--questions`` questions scored
+with the five RAGAS metrics. Each night the flow is redeployed, so its
+version (and with it every checkpoint) changes, and ``--changed`` of its
+answers differ from the night before. For each night the script reports the
+score cache's hit rate, the judge calls left, the judge time they would take
+at ``--judge-latency`` seconds per call, and the measured time spent hashing
+inputs and reading and writing the cache. No judge LLM is called; the cache
+is the real ScoreCache on a temporary SQLite file.
+
+    python benchmarks/bench_score_cache.py --questions 1000 --nights 5 --changed 0.1
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from common import add_root_to_path, print_table
+
+add_root_to_path()
+from evaluation.score_cache import ScoreCache, score_key
+
+METRICS = ["faithfulness", "answer_relevancy", "context_relevancy", "context_recall", "harmfulness"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=1000)
+    parser.add_argument("--nights", type=int, default=5)
+    parser.add_argument("--changed", type=float, default=0.1, help="Share of answers that change each night")
+    parser.add_argument("--judge-latency", type=float, default=1.5, help="Seconds per judge call")
+    parser.add_argument("--max-entries", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = [f"word{i}" for i in range(5000)]
+    items = [
+        {
+            "question": f"Question {i}",
+            "answer": " ".join(rng.choices(words, k=80)),
+            "contexts": [" ".join(rng.choices(words, k=150)) for _ in range(4)],
+            "ground_truth": f"Ground truth {i}",
+        }
+        for i in range(args.questions)
+    ]
+    judge_config = {"model": "judge", "temperature": 0}
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ScoreCache(os.path.join(directory, "scores.db"), max_entries=args.max_entries)
+        for night in range(1, args.nights + 1):
+            if night > 1:
+                for index in rng.sample(range(args.questions), int(args.questions * args.changed)):
+                    items[index]["answer"] = " ".join(rng.choices(words, k=80))
+            hits = misses = 0
+            start = time.perf_counter()
+            for metric in METRICS:
+                keys = [score_key(metric, "bench", judge_config, **item) for item in items]
+                cached = cache.get_many(keys)
+                missing = [key for key in keys if key not in cached]
+                hits += len(keys) - len(missing)
+                misses += len(missing)
+                # The judge's scores for the misses are stored as they arrive
+                cache.put_many(metric, {key: rng.random() for key in missing})
+            overhead = time.perf_counter() - start
+            rows.append({
+                "night": night,
+                "scores": hits + misses,
+                "hit_rate": f"{hits / (hits + misses):.0%}",
+                "judge_calls": misses,
+                "judge_min": round(misses * args.judge_latency / 60, 1),
+                "uncached_judge_min": round((hits + misses) * args.judge_latency / 60, 1),
+                "cache_ms": round(overhead * 1000),
+            })
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
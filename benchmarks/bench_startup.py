@@ -0,0 +1,143 @@
+# benchmarks/bench_startup.py
+"""Import time of each entry point and time until the API answers its first request.
+
+Every entry point is imported in a fresh ``python -X importtime`` process,
+from the directory and with the path it is normally started with. Reported
+are the import time of the entry point's package or module, excluding
+interpreter startup, and the packages it imported directly that took
+longest, including what they imported in turn. An entry point whose import
+fails, e.g. for a missing optional dependency, shows the error instead.
+
+The API is then started as ``python api/app.py`` against a stub LangFlow,
+and the time from starting the process until its first /chat answer is
+reported against ``--target-ms``.
+
+    python benchmarks/bench_startup.py --top 5 --target-ms 1000
+"""
+import argparse
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import ROOT_DIR, print_table
+
+ENTRY_POINTS = {
+    # name: (working directory, import statement)
+    "api": (os.path.join(ROOT_DIR, "api"), "import app"),
+    "chatbot": (os.path.join(ROOT_DIR, "chatbot"), "import app"),
+    "evaluation": (ROOT_DIR, "import evaluation"),
+    "dashboard": (ROOT_DIR, "import evaluation.metrics"),
+    "evaluator": (ROOT_DIR, "from evaluation import RagasEvaluator"),
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def measure_imports(directory: str, statement: str, top: int) -> dict:
+    """Import time of one statement in a fresh interpreter, and the slowest packages it imported"""
+    env = {**os.environ, "PYTHONPATH": directory}
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=directory, env=env, capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "failed"
+        return {"import_ms": None, "slowest": error}
+    # The statement's own top-level package, e.g. "evaluation" for "import evaluation.metrics"
+    target = statement.split()[1].split(".")[0]
+    total_us = 0
+    started = False
+    subtree = []
+    packages = []
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, depth, name = int(match[2]), (len(match[3]) + 1) // 2, match[4]
+        # Modules are listed after everything they imported; depth 1 is top level
+        if depth > 1:
+            subtree.append((depth, cumulative_us, name))
+            continue
+        # Interpreter startup (site, encodings) comes before the statement. Once the
+        # target is imported, modules it loads lazily are listed at the top level too
+        started = started or name == target or name.startswith(target + ".")
+        if started:
+            total_us += cumulative_us
+            if name == target or name.startswith(target + "."):
+                packages += [(us, child) for child_depth, us, child in subtree if child_depth == 2]
+            else:
+                packages.append((cumulative_us, name))
+        subtree = []
+    packages.sort(reverse=True)
+    slowest = ", ".join(f"{name} {us / 1000:.0f}" for us, name in packages[:top])
+    return {"import_ms": round(total_us / 1000), "slowest": slowest}
+
+def wait_for_first_answer(url: str, flow_id: str, start: float, deadline: float) -> float:
+    """Seconds from ``start`` until /chat first answers, polling every few milliseconds"""
+    with httpx.Client(timeout=5) as client:
+        while time.perf_counter() - start < deadline:
+            try:
+                response = client.post(f"{url}/chat", json={"query": "hello", "flow_id": flow_id, "use_cache": False})
+                if response.status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(0.005)
+    raise RuntimeError(f"The API did not answer within {deadline}s")
+
+def measure_api_first_answer(port: int) -> float:
+    stub = subprocess.Popen([
+        sys.executable, os.path.join(ROOT_DIR, "benchmarks", "stub_langflow.py"),
+        "--port", str(port), "--latency", "0",
+    ])
+    try:
+        wait_for_stub = time.perf_counter() + 10
+        while time.perf_counter() < wait_for_stub:
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/api/v1/flows/")
+                break
+            except httpx.TransportError:
+                time.sleep(0.05)
+        env = {
+            **os.environ,
+            "LANGFLOW_API_URL": f"http://127.0.0.1:{port}",
+            "API_HOST": "127.0.0.1",
+            "API_PORT": str(port + 1),
+            "DEBUG": "False",
+            "FLOW_PREWARM_ENABLED": "False",
+        }
+        start = time.perf_counter()
+        api = subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, "api", "app.py")], env=env)
+        try:
+            return wait_for_first_answer(f"http://127.0.0.1:{port + 1}", "flow-0", start, 30)
+        finally:
+            api.send_signal(signal.SIGTERM)
+            api.wait(timeout=30)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entry-points", nargs="+", choices=list(ENTRY_POINTS), default=list(ENTRY_POINTS))
+    parser.add_argument("--top", type=int, default=4, help="Slowest top-level packages to list")
+    parser.add_argument("--target-ms", type=float, default=1000, help="Target for the API's first answer")
+    parser.add_argument("--port", type=int, default=18600, help="First of two consecutive ports to use")
+    args = parser.parse_args()
+
+    rows = []
+    for name in args.entry_points:
+        directory, statement = ENTRY_POINTS[name]
+        rows.append({"entry_point": name, "statement": statement, **measure_imports(directory, statement, args.top)})
+    print_table(rows)
+
+    first_answer_ms = measure_api_first_answer(args.port) * 1000
+    verdict = "within" if first_answer_ms <= args.target_ms else "over"
+    print(f"\nAPI answered its first /chat request {first_answer_ms:.0f} ms after start ({verdict} the {args.target_ms:.0f} ms target)")
+
+if __name__ == "__main__":
+    main()
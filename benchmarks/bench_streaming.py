@@ -0,0 +1,93 @@
+# benchmarks/bench_streaming.py
+"""Time-to-first-byte and total latency for /chat vs. /chat/stream.
+
+A stub LangFlow generates ``--answer-words`` tokens, ``--token-delay`` seconds
+apart, after ``--latency`` seconds of retrieval time. For the non-streamed path
+the first useful byte only arrives once the whole answer has been generated;
+the old chat UI then added 10 ms per word of artificial typing on top, which
+is reported as a separate row.
+
+    python benchmarks/bench_streaming.py --latency 0.3 --token-delay 0.03 --answer-words 50
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+import httpx
+
+from common import add_api_to_path, percentile, print_table, serve_in_thread
+from stub_langflow import create_app as create_stub_app
+
+TYPING_DELAY = 0.01  # per-word sleep the chat UI used to fake streaming
+
+def measure_chat(client: httpx.Client, url: str):
+    start = time.perf_counter()
+    with client.stream("POST", f"{url}/chat", json={"query": "question", "flow_id": "flow-0", "use_cache": False}) as response:
+        response.raise_for_status()
+        first_byte = None
+        for _ in response.iter_bytes():
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+    return first_byte, time.perf_counter() - start
+
+def measure_stream(client: httpx.Client, url: str):
+    start = time.perf_counter()
+    first_token = None
+    with client.stream("POST", f"{url}/chat/stream", json={"query": "question", "flow_id": "flow-0", "use_cache": False}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["event"] == "token" and first_token is None:
+                first_token = time.perf_counter() - start
+    return first_token, time.perf_counter() - start
+
+def summarize(name: str, samples):
+    ttfb = [s[0] for s in samples]
+    total = [s[1] for s in samples]
+    return {
+        "path": name,
+        "ttfb_p50_ms": round(statistics.median(ttfb) * 1000, 1),
+        "ttfb_p95_ms": round(percentile(ttfb, 95) * 1000, 1),
+        "total_p50_ms": round(statistics.median(total) * 1000, 1),
+        "total_p95_ms": round(percentile(total, 95) * 1000, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub retrieval time before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.03, help="Stub generation time per token")
+    parser.add_argument("--answer-words", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--port", type=int, default=18100, help="First of two consecutive ports to use")
+    args = parser.parse_args()
+
+    stub_url = f"http://127.0.0.1:{args.port}"
+    serve_in_thread(create_stub_app(args.latency, token_delay=args.token_delay, answer_words=args.answer_words), args.port)
+
+    os.environ["LANGFLOW_API_URL"] = stub_url
+    add_api_to_path()
+    from app import app
+
+    serve_in_thread(app, args.port + 1)
+    api_url = f"http://127.0.0.1:{args.port + 1}"
+
+    with httpx.Client(timeout=300) as client:
+        chat = [measure_chat(client, api_url) for _ in range(args.runs)]
+        stream = [measure_stream(client, api_url) for _ in range(args.runs)]
+
+    typing = TYPING_DELAY * args.answer_words
+    typed = [(ttfb, total + typing) for ttfb, total in chat]
+
+    print(f"latency={args.latency}s token_delay={args.token_delay}s words={args.answer_words} runs={args.runs}")
+    print_table([
+        summarize("/chat", chat),
+        summarize("/chat + UI typing effect", typed),
+        summarize("/chat/stream", stream),
+    ])
+
+if __name__ == "__main__":
+    main()
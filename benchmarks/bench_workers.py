@@ -0,0 +1,118 @@
+# benchmarks/bench_workers.py
+"""/chat throughput as the number of API worker processes grows.
+
+Starts the stub LangFlow in its own process, then for each worker count runs
+``python api/app.py`` with ``API_WORKERS`` set and drives ``/chat`` with a
+fixed number of concurrent clients. The response cache is disabled so every
+request reaches the stub. The load generator is a single process; if it
+saturates a core, throughput flattens regardless of worker count.
+
+    python benchmarks/bench_workers.py --workers 1 2 4 --concurrency 64 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import ROOT_DIR, percentile, print_table
+
+def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+async def drive(url: str, concurrency: int, total: int) -> dict:
+    latencies = []
+    errors = 0
+    pids = set()
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                i = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    response = await client.post(f"{url}/chat", json={"query": f"q{i}", "flow_id": "flow-0"})
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    # Distinct PIDs answering /health on fresh connections show the load was spread over workers
+    async with httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_keepalive_connections=0)) as probe:
+        for _ in range(4 * concurrency):
+            pids.add((await probe.get(f"{url}/health")).json()["pid"])
+
+    return {
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "errors": errors,
+        "pids_seen": len(pids),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 4])
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LangFlow run latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=18500, help="First of two consecutive ports to use")
+    args = parser.parse_args()
+
+    stub = subprocess.Popen([
+        sys.executable, os.path.join(ROOT_DIR, "benchmarks", "stub_langflow.py"),
+        "--port", str(args.port), "--latency", str(args.latency),
+    ])
+    rows = []
+    try:
+        wait_until_up(f"http://127.0.0.1:{args.port}/api/v1/flows/")
+        api_url = f"http://127.0.0.1:{args.port + 1}"
+        for workers in sorted(set(args.workers)):
+            env = {
+                **os.environ,
+                "LANGFLOW_API_URL": f"http://127.0.0.1:{args.port}",
+                "API_HOST": "127.0.0.1",
+                "API_PORT": str(args.port + 1),
+                "API_WORKERS": str(workers),
+                "DEBUG": "False",
+                "RESPONSE_CACHE_ENABLED": "False",
+                "SESSION_BACKEND": "memory" if workers == 1 else "sqlite",
+                "SESSION_DB_PATH": os.path.join(ROOT_DIR, "data", "bench_sessions.db"),
+            }
+            api = subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, "api", "app.py")], env=env)
+            try:
+                wait_until_up(f"{api_url}/health")
+                rows.append({"workers": workers, **asyncio.run(drive(api_url, args.concurrency, args.requests))})
+            finally:
+                api.send_signal(signal.SIGTERM)
+                api.wait(timeout=60)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    print(f"stub latency={args.latency}s concurrency={args.concurrency} requests={args.requests}")
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/common.py
+import math
+import os
+import sys
+import threading
+import time
+from typing import List
+
+import uvicorn
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(ROOT_DIR, "api")
+CHATBOT_DIR = os.path.join(ROOT_DIR, "chatbot")
+
+def add_root_to_path():
+    """Make the evaluation package importable"""
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+def add_chatbot_to_path():
+    """Make the chatbot modules importable the same way chatbot/app.py imports them"""
+    if CHATBOT_DIR not in sys.path:
+        sys.path.insert(0, CHATBOT_DIR)
+
+def add_api_to_path():
+    """Make the API modules importable the same way api/app.py imports them"""
+    if API_DIR not in sys.path:
+        sys.path.insert(0, API_DIR)
+
+def serve_in_thread(app, port: int, host: str = "127.0.0.1") -> uvicorn.Server:
+    """Run an ASGI app with uvicorn in a daemon thread and wait until it accepts connections"""
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError(f"Server on port {port} did not start")
+        time.sleep(0.05)
+    return server
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def print_table(rows: List[dict]):
+    """Print a list of dicts as an aligned text table"""
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(widths[c]) for c in columns))
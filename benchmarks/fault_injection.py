@@ -0,0 +1,142 @@
+# benchmarks/fault_injection.py
+"""Fault-injection checks for the API's upstream resilience layer.
+
+Serves the API against the stub LangFlow with short timeouts and small limits,
+injects faults through the stub's ``/stub/faults`` endpoint and checks how
+``/chat`` reacts. The scenarios are:
+
+* a hanging flow: the API answers 504 after the read timeout
+* a failing flow: its circuit opens, later calls get a 503 without reaching
+  LangFlow, other flows are unaffected, and the circuit closes after a
+  successful probe
+* identical concurrent one-off questions: they share a single LangFlow run
+* a slow flow under a burst: calls beyond the concurrency limit and queue get
+  a 503 with Retry-After
+
+Exits non-zero if any check fails.
+
+    python benchmarks/fault_injection.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+from common import add_api_to_path, print_table, serve_in_thread
+from stub_langflow import create_app as create_stub_app
+
+READ_TIMEOUT = 1.0
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 1.0
+MAX_CONCURRENCY = 4
+MAX_QUEUE = 4
+
+async def chat(client: httpx.AsyncClient, flow_id: str, query: str = "question", use_session: bool = True) -> httpx.Response:
+    return await client.post("/chat", json={"query": query, "flow_id": flow_id, "use_session": use_session})
+
+async def stub_runs(stub: httpx.AsyncClient, flow_id: str) -> int:
+    return (await stub.get("/stub/stats")).json()["runs"].get(flow_id, 0)
+
+async def check_timeout(client, stub):
+    await stub.put("/stub/faults", json={"hang": True, "flows": ["hanging-flow"]})
+    start = time.perf_counter()
+    response = await chat(client, "hanging-flow")
+    elapsed = time.perf_counter() - start
+    await stub.put("/stub/faults", json={})
+    passed = response.status_code == 504 and elapsed < READ_TIMEOUT + 1
+    return passed, f"status={response.status_code} after {elapsed:.2f}s"
+
+async def check_circuit_breaker(client, stub):
+    await stub.put("/stub/faults", json={"error_rate": 1.0, "flows": ["failing-flow"]})
+    failures = [(await chat(client, "failing-flow")).status_code for _ in range(FAILURE_THRESHOLD)]
+    rejected = await chat(client, "failing-flow")
+    runs_while_open = await stub_runs(stub, "failing-flow")
+    other = await chat(client, "healthy-flow")
+
+    await stub.put("/stub/faults", json={})
+    await asyncio.sleep(RESET_TIMEOUT)
+    probe = await chat(client, "failing-flow")
+    after_probe = await chat(client, "failing-flow", "another question")
+
+    passed = (
+        failures == [500] * FAILURE_THRESHOLD
+        and rejected.status_code == 503 and "retry-after" in rejected.headers
+        and runs_while_open == FAILURE_THRESHOLD
+        and other.status_code == 200
+        and probe.status_code == 200 and after_probe.status_code == 200
+    )
+    detail = (
+        f"failures={failures} open={rejected.status_code} upstream_runs={runs_while_open} "
+        f"other_flow={other.status_code} probe={probe.status_code}"
+    )
+    return passed, detail
+
+async def check_coalescing(client, stub, callers: int = 20):
+    await stub.put("/stub/faults", json={"extra_latency": 0.5, "flows": ["popular-flow"]})
+    # Questions that open a session run on their own, so coalescing applies to one-off questions
+    responses = await asyncio.gather(*(
+        chat(client, "popular-flow", "Same question", use_session=False) for _ in range(callers)
+    ))
+    await stub.put("/stub/faults", json={})
+    runs = await stub_runs(stub, "popular-flow")
+    statuses = {r.status_code for r in responses}
+    coalesced = sum(1 for r in responses if r.status_code == 200 and r.json()["metadata"].get("coalesced"))
+    passed = statuses == {200} and runs == 1 and coalesced == callers - 1
+    return passed, f"callers={callers} upstream_runs={runs} coalesced={coalesced}"
+
+async def check_load_shedding(client, stub, burst: int = 16):
+    await stub.put("/stub/faults", json={"extra_latency": 0.5, "flows": ["slow-flow"]})
+    responses = await asyncio.gather(*(chat(client, "slow-flow", f"question {i}") for i in range(burst)))
+    await stub.put("/stub/faults", json={})
+    ok = sum(r.status_code == 200 for r in responses)
+    shed = [r for r in responses if r.status_code == 503]
+    passed = ok == MAX_CONCURRENCY + MAX_QUEUE and len(shed) == burst - ok and all("retry-after" in r.headers for r in shed)
+    return passed, f"burst={burst} ok={ok} shed={len(shed)}"
+
+async def run_checks(api_url: str, stub_url: str):
+    rows = []
+    async with httpx.AsyncClient(base_url=api_url, timeout=30) as client, \
+            httpx.AsyncClient(base_url=stub_url, timeout=30) as stub:
+        for name, check in (
+            ("read timeout", check_timeout),
+            ("circuit breaker", check_circuit_breaker),
+            ("request coalescing", check_coalescing),
+            ("load shedding", check_load_shedding),
+        ):
+            passed, detail = await check(client, stub)
+            rows.append({"check": name, "result": "PASS" if passed else "FAIL", "detail": detail})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=18800, help="First of two consecutive ports to use")
+    args = parser.parse_args()
+
+    stub_url = f"http://127.0.0.1:{args.port}"
+    # Listed by the stub, so the API labels their metrics by flow ID
+    flow_ids = ["hanging-flow", "failing-flow", "healthy-flow", "popular-flow", "slow-flow"]
+    serve_in_thread(create_stub_app(latency=0.0, flow_ids=flow_ids), args.port)
+
+    os.environ.update({
+        "LANGFLOW_API_URL": stub_url,
+        "LANGFLOW_TIMEOUT": str(READ_TIMEOUT),
+        "RESPONSE_CACHE_ENABLED": "False",
+        "CIRCUIT_BREAKER_FAILURES": str(FAILURE_THRESHOLD),
+        "CIRCUIT_BREAKER_RESET_TIMEOUT": str(RESET_TIMEOUT),
+        "ADMISSION_MAX_CONCURRENCY": str(MAX_CONCURRENCY),
+        "ADMISSION_MAX_QUEUE": str(MAX_QUEUE),
+        "ADMISSION_QUEUE_TIMEOUT": "30",
+    })
+    add_api_to_path()
+    from app import app
+
+    serve_in_thread(app, args.port + 1)
+    rows = asyncio.run(run_checks(f"http://127.0.0.1:{args.port + 1}", stub_url))
+    print_table(rows)
+    sys.exit(0 if all(row["result"] == "PASS" for row in rows) else 1)
+
+if __name__ == "__main__":
+    main()
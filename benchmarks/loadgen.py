@@ -0,0 +1,261 @@
+# benchmarks/loadgen.py
+"""Load generator for the chat API.
+
+Replays questions against ``/chat`` either at a fixed arrival rate
+(``--rate``, open loop) or with a fixed number of concurrent clients
+(``--concurrency``, closed loop), for ``--duration`` seconds or ``--requests``
+requests. It then reports throughput, latency percentiles and the error rate.
+Questions come from ``data/questions.json`` or from a log file given with
+``--log``. The log file can be JSON Lines with ``query`` (or ``question``) and
+an optional ``flow_id``, or plain text with one question per line.
+
+Without ``--url`` the stub LangFlow and the API are started in-process, and
+the stub's latency can follow a distribution (``--latency-dist``). In rate mode
+latency is measured from the moment a request was due, so a backed-up server
+is not hidden by requests starting late.
+
+``--output`` writes the results as JSON. ``--compare`` checks them against a
+previous results file and exits non-zero when throughput drops or p99 latency
+grows by more than ``--tolerance`` percent.
+
+    python benchmarks/loadgen.py --rate 50 --duration 30 --latency 0.3 --latency-dist lognormal --output results.json
+    python benchmarks/loadgen.py --url http://localhost:8000 --flow-id <flow> --concurrency 16 --compare results.json
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from common import ROOT_DIR, add_api_to_path, percentile, print_table, serve_in_thread
+from stub_langflow import LATENCY_DISTRIBUTIONS, create_app as create_stub_app
+
+def load_questions(questions_path: str, log_path: Optional[str]) -> List[Dict[str, Any]]:
+    """Queries to replay as ``{"query": ..., "flow_id": ...}`` dicts (flow_id optional)"""
+    if not log_path:
+        with open(questions_path, "r") as f:
+            return [{"query": item["question"]} for item in json.load(f)]
+
+    queries = []
+    with open(log_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                entry = line
+            if isinstance(entry, dict):
+                query = {"query": entry.get("query") or entry["question"]}
+                if entry.get("flow_id"):
+                    query["flow_id"] = entry["flow_id"]
+                queries.append(query)
+            else:
+                queries.append({"query": str(entry)})
+    return queries
+
+class LoadRun:
+    def __init__(self, client: httpx.AsyncClient, queries: List[Dict[str, Any]], flow_id: str, use_cache: bool):
+        self.client = client
+        self.queries = itertools.cycle(queries)
+        self.flow_id = flow_id
+        self.use_cache = use_cache
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+
+    async def send(self, started: float):
+        query = next(self.queries)
+        # One-off questions, as only those are answered from the response cache
+        payload = {
+            "query": query["query"],
+            "flow_id": query.get("flow_id", self.flow_id),
+            "use_cache": self.use_cache,
+            "use_session": False,
+        }
+        try:
+            response = await self.client.post("/chat", json=payload)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        self.latencies.append(time.perf_counter() - started)
+        self.statuses[status] += 1
+
+    async def fixed_rate(self, rate: float, deadline: float, max_requests: Optional[int]):
+        """Open loop: start a request every 1/rate seconds whether or not earlier ones finished"""
+        tasks = []
+        start = time.perf_counter()
+        for i in itertools.count():
+            due = start + i / rate
+            if due >= deadline or (max_requests and i >= max_requests):
+                break
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            tasks.append(asyncio.create_task(self.send(due)))
+        await asyncio.gather(*tasks)
+
+    async def fixed_concurrency(self, concurrency: int, deadline: float, max_requests: Optional[int]):
+        """Closed loop: each client sends its next request as soon as the previous one finished"""
+        sent = 0
+
+        async def client():
+            nonlocal sent
+            while time.perf_counter() < deadline and not (max_requests and sent >= max_requests):
+                sent += 1
+                await self.send(time.perf_counter())
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+
+def summarize(run: LoadRun, elapsed: float) -> Dict[str, Any]:
+    total = len(run.latencies)
+    errors = sum(count for status, count in run.statuses.items() if status != "200")
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(run.latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(run.latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(run.latencies, 99) * 1000, 2),
+        "max_ms": round(max(run.latencies, default=0.0) * 1000, 2),
+    }
+
+async def run_load(args, api_url: str, queries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    connections = args.concurrency or max(16, int(args.rate * 2))
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=api_url, timeout=args.timeout, limits=limits) as client:
+        if args.warmup:
+            warmup = LoadRun(client, queries, args.flow_id, args.use_cache)
+            await warmup.fixed_concurrency(min(connections, 8), time.perf_counter() + args.warmup, None)
+
+        run = LoadRun(client, queries, args.flow_id, args.use_cache)
+        start = time.perf_counter()
+        deadline = start + args.duration if args.duration else float("inf")
+        if args.rate:
+            await run.fixed_rate(args.rate, deadline, args.requests)
+        else:
+            await run.fixed_concurrency(args.concurrency, deadline, args.requests)
+        elapsed = time.perf_counter() - start
+    return {"summary": summarize(run, elapsed), "status_codes": dict(run.statuses)}
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> bool:
+    """Print current vs. baseline and return whether the current run regressed"""
+    rows = []
+    regressed = False
+    # Metric, and whether a higher value is better
+    for metric, higher_is_better in (
+        ("throughput_rps", True), ("p50_ms", False), ("p95_ms", False),
+        ("p99_ms", False), ("error_rate", False),
+    ):
+        old, new = baseline["summary"][metric], current["summary"][metric]
+        change = (new - old) / old * 100 if old else 0.0
+        worse = -change if higher_is_better else change
+        failed = metric in ("throughput_rps", "p99_ms") and worse > tolerance
+        if metric == "error_rate" and new > old:
+            failed = True
+        regressed |= failed
+        rows.append({
+            "metric": metric,
+            "baseline": old,
+            "current": new,
+            "change_%": round(change, 1),
+            "status": "REGRESSED" if failed else "ok",
+        })
+    print(f"baseline: commit {baseline.get('git_commit')} at {baseline.get('timestamp')}")
+    if baseline.get("config") != current.get("config"):
+        print("note: the baseline was run with a different configuration")
+    print_table(rows)
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rate", type=float, help="Requests started per second (open loop)")
+    mode.add_argument("--concurrency", type=int, help="Concurrent clients (closed loop, default 16)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run, 0 = until --requests")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of unrecorded load before measuring")
+    parser.add_argument("--questions", default=os.path.join(ROOT_DIR, "data", "questions.json"))
+    parser.add_argument("--log", help="Replay queries from this log file instead of --questions")
+    parser.add_argument("--flow-id", default="flow-0", help="Flow for queries that do not name their own")
+    parser.add_argument("--use-cache", action="store_true", help="Let the API answer repeated questions from its cache")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Client timeout per request")
+    parser.add_argument("--url", help="API to load; by default a stub-backed API is started in-process")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean stub LangFlow latency in seconds")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=18900, help="First of two consecutive ports for the in-process servers")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Results file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+    if not args.rate and not args.concurrency:
+        args.concurrency = 16
+    if not args.duration and not args.requests:
+        parser.error("--duration 0 needs --requests")
+
+    if not args.log and not os.path.exists(args.questions):
+        parser.error(f"{args.questions} does not exist; it is created by the first evaluation run, or pass --log")
+    queries = load_questions(args.questions, args.log)
+    if not queries:
+        parser.error("No questions to replay")
+
+    api_url = args.url
+    if not api_url:
+        serve_in_thread(create_stub_app(args.latency, latency_distribution=args.latency_dist,
+                                        latency_spread=args.latency_spread), args.port)
+        os.environ["LANGFLOW_API_URL"] = f"http://127.0.0.1:{args.port}"
+        add_api_to_path()
+        from app import app
+        serve_in_thread(app, args.port + 1)
+        api_url = f"http://127.0.0.1:{args.port + 1}"
+
+    results = asyncio.run(run_load(args, api_url, queries))
+    results.update({
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "config": {
+            "url": args.url or "in-process stub",
+            "mode": "rate" if args.rate else "concurrency",
+            "rate": args.rate,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "questions": len(queries),
+            "use_cache": args.use_cache,
+            **({} if args.url else {
+                "stub_latency": args.latency,
+                "stub_latency_dist": args.latency_dist,
+                "stub_latency_spread": args.latency_spread,
+            }),
+        },
+    })
+
+    print_table([results["summary"]])
+    print(f"status codes: {results['status_codes']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# benchmarks/stub_langflow.py
+"""Minimal stand-in for the LangFlow API used by the benchmarks.
+
+Emulates ``POST /api/v1/run/{flow_id}`` (including ``?stream=true``),
+``GET /api/v1/flows/`` and ``DELETE /api/v1/monitor/messages/session/{id}``.
+Runs answer after a configurable latency before the first token (fixed or
+drawn from a distribution) and a per-token generation delay, returning
+payloads shaped like LangFlow's.
+
+Faults can be injected while the stub runs: ``PUT /stub/faults`` with
+``{"error_rate": 0.5}`` makes half of the runs fail with a 500,
+``{"hang": true}`` makes runs never answer, and ``{"extra_latency": 2}`` slows
+them down. ``"flows": [...]`` limits the faults to some flows. ``GET /stub/stats``
+counts the runs each flow received and the sessions whose messages were deleted.
+
+``cold_start`` adds that many seconds to a flow's first run, and to its
+first run after ``cold_after`` seconds without runs, like LangFlow building
+the graph and loading models again.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from collections import Counter
+from typing import Callable, Sequence
+
+import uvicorn
+from fastapi import Body, FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+def make_documents(query: str, count: int) -> list:
+    """LangFlow Data objects as a vector store component returns them"""
+    return [
+        {
+            "text_key": "text",
+            "data": {"text": f"Stub document {i} about: {query}", "id": f"doc-{i}", "score": round(1 - i / 10, 2)},
+            "default_value": "",
+        }
+        for i in range(count)
+    ]
+
+def make_run_result(flow_id: str, query: str, answer: str = None, documents: int = 0) -> dict:
+    """Build a LangFlow-shaped run result for a chat flow, with a retriever output if ``documents``"""
+    answer = answer or f"Stub answer to: {query}"
+    retriever_outputs = [{
+        "results": {"search_results": make_documents(query, documents)},
+        "artifacts": {"search_results": make_documents(query, documents)},
+        "component_display_name": "Chroma DB",
+        "component_id": "Chroma-stub",
+    }] if documents else []
+    return {
+        "session_id": flow_id,
+        "outputs": [{
+            "inputs": {"input_value": query},
+            "outputs": [{
+                "results": {"message": {"text": answer, "sender": "Machine", "sender_name": "AI"}},
+                "artifacts": {"message": answer, "sender": "Machine", "sender_name": "AI"},
+                "outputs": {"message": {"message": answer, "type": "text"}},
+                "logs": {"message": []},
+                "messages": [{"message": answer, "sender": "Machine", "sender_name": "AI",
+                              "component_id": "ChatOutput-stub"}],
+                "component_display_name": "Chat Output",
+                "component_id": "ChatOutput-stub",
+                "used_frozen_result": False,
+            }, *retriever_outputs],
+        }],
+    }
+
+def make_flow(index: int) -> dict:
+    """Build a LangFlow-shaped flow record including a (fake) serialized graph"""
+    return {
+        "id": f"flow-{index}",
+        "name": f"Stub Flow {index}",
+        "description": f"Benchmark flow number {index}",
+        "updated_at": "2024-01-01T00:00:00",
+        "data": {"nodes": [{"id": f"node-{n}", "data": {"template": "x" * 200}} for n in range(20)], "edges": []},
+    }
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+def make_latency_sampler(latency: float, distribution: str = "fixed", spread: float = 0.5) -> Callable[[], float]:
+    """
+    Sampler of run latencies with mean ``latency`` seconds
+
+    ``uniform`` draws from ``latency * (1 ± spread)``, ``exponential`` has no
+    extra parameter, and ``lognormal`` uses ``spread`` as sigma, giving the
+    long tail typical of LLM calls.
+    """
+    if distribution not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"Unknown latency distribution: {distribution}")
+    if not latency or distribution == "fixed":
+        return lambda: latency
+    if distribution == "uniform":
+        return lambda: random.uniform(latency * (1 - spread), latency * (1 + spread))
+    if distribution == "exponential":
+        return lambda: random.expovariate(1 / latency)
+    # Shift mu so the mean of the lognormal stays at ``latency``
+    mu = math.log(latency) - spread ** 2 / 2
+    return lambda: random.lognormvariate(mu, spread)
+
+def create_app(
+    latency: float = 0.0,
+    num_flows: int = 3,
+    token_delay: float = 0.0,
+    answer_words: int = 20,
+    latency_distribution: str = "fixed",
+    latency_spread: float = 0.5,
+    documents: int = 0,
+    cold_start: float = 0.0,
+    cold_after: float = 300.0,
+    flow_ids: Sequence[str] = (),
+) -> FastAPI:
+    app = FastAPI(title="Stub LangFlow")
+    sample_latency = make_latency_sampler(latency, latency_distribution, latency_spread)
+    # ``flow_ids`` advertises flows with the given IDs next to flow-0, flow-1, ...
+    flows = [make_flow(i) for i in range(num_flows)]
+    flows += [dict(make_flow(num_flows + i), id=flow_id) for i, flow_id in enumerate(flow_ids)]
+    faults = {}
+    runs = Counter()
+    deleted_sessions = []
+    last_run = {}
+
+    def answer_tokens(query: str):
+        return [f"word{i} " for i in range(answer_words)] if answer_words else [f"Stub answer to: {query}"]
+
+    @app.get("/api/v1/flows/")
+    async def get_flows():
+        return flows
+
+    @app.put("/stub/faults")
+    async def set_faults(new_faults: dict = Body(...)):
+        faults.clear()
+        faults.update(new_faults)
+        return faults
+
+    @app.delete("/api/v1/monitor/messages/session/{session_id}", status_code=204)
+    async def delete_session_messages(session_id: str):
+        deleted_sessions.append(session_id)
+
+    @app.get("/stub/stats")
+    async def stats():
+        return {"runs": dict(runs), "deleted_sessions": len(deleted_sessions)}
+
+    async def inject_faults(flow_id: str):
+        if faults.get("flows") and flow_id not in faults["flows"]:
+            return
+        if faults.get("extra_latency"):
+            await asyncio.sleep(faults["extra_latency"])
+        if faults.get("hang"):
+            await asyncio.Event().wait()
+        if random.random() < faults.get("error_rate", 0.0):
+            raise HTTPException(status_code=500, detail="Injected fault")
+
+    @app.post("/api/v1/run/{flow_id}")
+    async def run_flow(flow_id: str, request: Request, stream: bool = False):
+        payload = await request.json()
+        query = payload.get("input_value", "")
+        runs[flow_id] += 1
+        tokens = answer_tokens(query)
+        delay = sample_latency()
+        now = time.monotonic()
+        if cold_start and now - last_run.get(flow_id, -math.inf) > cold_after:
+            delay += cold_start
+        last_run[flow_id] = now
+        if delay:
+            await asyncio.sleep(delay)
+        await inject_faults(flow_id)
+
+        if not stream:
+            if token_delay:
+                await asyncio.sleep(token_delay * len(tokens))
+            return make_run_result(flow_id, query, "".join(tokens), documents)
+
+        async def events():
+            for token in tokens:
+                if token_delay:
+                    await asyncio.sleep(token_delay)
+                yield json.dumps({"event": "token", "data": {"chunk": token}}) + "\n\n"
+            result = make_run_result(flow_id, query, "".join(tokens), documents)
+            yield json.dumps({"event": "end", "data": {"result": result}}) + "\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub LangFlow server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--latency", type=float, default=float(os.getenv("STUB_LATENCY", "0.1")),
+                        help="Seconds before a flow run produces its first token")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed",
+                        help="Distribution of the latency around its mean")
+    parser.add_argument("--latency-spread", type=float, default=0.5,
+                        help="Relative half-width (uniform) or sigma (lognormal) of the latency")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds to generate each answer token")
+    parser.add_argument("--answer-words", type=int, default=20, help="Number of tokens in each answer")
+    parser.add_argument("--flows", type=int, default=3, help="Number of flows to advertise")
+    parser.add_argument("--documents", type=int, default=0, help="Retrieved documents to return with each answer")
+    parser.add_argument("--cold-start", type=float, default=0.0, help="Extra seconds for the first run of a flow")
+    parser.add_argument("--cold-after", type=float, default=300.0, help="Seconds without runs after which a flow is cold again")
+    args = parser.parse_args()
+    app = create_app(
+        args.latency, args.flows, args.token_delay, args.answer_words, args.latency_dist, args.latency_spread,
+        documents=args.documents, cold_start=args.cold_start, cold_after=args.cold_after,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
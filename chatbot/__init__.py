@@ -1,2 +1,6 @@
-"""Streamlit chatbot application package."""
-from .app import main
\ No newline at end of file
+"""Streamlit chatbot application package.
+
+The entry point is ``chatbot/app.py``, run with ``streamlit run``. The package
+imports nothing itself, so ``chatbot.utils.api_client`` can be used without
+loading Streamlit.
+"""
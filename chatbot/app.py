@@ -11,6 +11,9 @@ def main():
     if "messages" not in st.session_state:
         st.session_state.messages = []
     
+    if "older_pages" not in st.session_state:
+        st.session_state.older_pages = []
+    
     if "session_id" not in st.session_state:
         st.session_state.session_id = None
         
@@ -21,7 +24,7 @@ def main():
         st.session_state.api_client = APIClient(api_url="http://localhost:8000")
     
     # Set up the sidebar
-    setup_sidebar()
+    render_timing = setup_sidebar()
     
     # Main chat interface
     st.title("LangFlow Chatbot")
@@ -36,6 +39,8 @@ def main():
     # Initialize the chat interface
     chat_interface = ChatInterface()
     chat_interface.display_chat_history()
+    if render_timing is not None:
+        render_timing.caption(f"Transcript rendered in {st.session_state.render_ms:.0f} ms")
     chat_interface.display_chat_input()
 
 if __name__ == "__main__":
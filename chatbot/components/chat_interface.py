@@ -1,17 +1,76 @@
 # chatbot/components/chat_interface.py
 import json
-import streamlit as st
 import time
+import streamlit as st
+
+@st.cache_data(show_spinner=False, max_entries=100)
+def _page_markdown(page: tuple) -> str:
+    """Markdown for a page of finalized (role, content) messages, shown as a single element"""
+    return "\n\n---\n\n".join(f"**{role.capitalize()}:** {content}" for role, content in page)
 
 class ChatInterface:
+    # The API keeps the full conversation; the page only holds its tail as
+    # chat bubbles, plus older pages the user asked for
+    VISIBLE_MESSAGES = 50
+    PAGE_SIZE = 50
+
     def __init__(self):
         pass
     
+    def _append_message(self, role: str, content: str, seq=None) -> dict:
+        message = {"role": role, "content": content, "seq": seq}
+        messages = st.session_state.messages
+        messages.append(message)
+        if len(messages) > self.VISIBLE_MESSAGES:
+            del messages[:len(messages) - self.VISIBLE_MESSAGES]
+            # Loaded pages would no longer join up with the tail; they are reloaded on demand
+            st.session_state.older_pages = []
+        return message
+
+    @staticmethod
+    def _oldest_seq():
+        """History position of the oldest message on the page, or None if unknown"""
+        if st.session_state.older_pages:
+            return st.session_state.older_pages[0][0]["seq"]
+        seqs = [message["seq"] for message in st.session_state.messages if message.get("seq") is not None]
+        return min(seqs) if seqs else None
+
+    def _load_older(self):
+        """Fetch the page of messages before the oldest one shown from the API"""
+        before = self._oldest_seq()
+        history = st.session_state.api_client.get_history(
+            st.session_state.session_id, limit=self.PAGE_SIZE, before=before
+        )
+        if history["messages"]:
+            st.session_state.older_pages.insert(0, history["messages"])
+        else:
+            # Older messages fell out of the API's history window
+            st.session_state.history_summary = history.get("summary") or "Older messages are no longer available."
+
     def display_chat_history(self):
-        """Display the chat history"""
+        """
+        Display the chat history
+
+        Only the last ``VISIBLE_MESSAGES`` messages are rendered as chat
+        bubbles, so a rerun costs the same however long the conversation is.
+        Older messages are loaded from the API a page at a time on request;
+        each loaded page is finalized and rendered as one cached markdown block.
+        """
+        start = time.perf_counter()
+        oldest = self._oldest_seq()
+        if st.session_state.get("history_summary"):
+            st.caption(st.session_state.history_summary)
+        elif st.session_state.session_id and oldest:
+            st.button("Load older messages", on_click=self._load_older)
+
+        for page in st.session_state.older_pages:
+            with st.expander(f"Messages {page[0]['seq'] + 1}–{page[-1]['seq'] + 1}", expanded=True):
+                st.markdown(_page_markdown(tuple((m["role"], m["content"]) for m in page)))
+
         for message in st.session_state.messages:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
+        st.session_state.render_ms = (time.perf_counter() - start) * 1000
     
     def display_chat_input(self):
         """Display the chat input field and handle user messages"""
@@ -21,7 +80,7 @@ class ChatInterface:
                 return
                 
             # Add user message to chat history
-            st.session_state.messages.append({"role": "user", "content": prompt})
+            user_message = self._append_message("user", prompt)
             
             # Display user message in chat message container
             with st.chat_message("user"):
@@ -33,31 +92,37 @@ class ChatInterface:
                 message_placeholder.markdown("Thinking...")
                 
                 try:
-                    # Call API to get response
-                    response = st.session_state.api_client.send_query(
+                    # Stream the response from the API and render chunks as they arrive
+                    full_response = ""
+                    history_seq = None
+                    for event in st.session_state.api_client.stream_query(
                         query=prompt,
                         flow_id=st.session_state.selected_flow["id"],
                         session_id=st.session_state.session_id
-                    )
-                    
-                    # Update session ID if it was created
-                    if response.get("session_id"):
-                        st.session_state.session_id = response["session_id"]
-                    
-                    # Display response with a typing effect
-                    full_response = response['response']['message']
-                    response_placeholder = ""
-                    
-                    # Simple typing effect
-                    for chunk in full_response['message'].split():
-                        response_placeholder += chunk + " "
-                        time.sleep(0.01)  # Adjust speed as needed
-                        message_placeholder.markdown(response_placeholder)
-                    
+                    ):
+                        if event["event"] == "token":
+                            full_response += event["chunk"]
+                            message_placeholder.markdown(full_response + "▌")
+                        elif event["event"] == "end":
+                            # Update session ID if it was created
+                            if event.get("session_id"):
+                                st.session_state.session_id = event["session_id"]
+                            history_seq = event.get("metadata", {}).get("history_seq")
+                            # Flows that don't stream tokens only send the final message,
+                            # whose text the API extracts with extract_message_text
+                            if not full_response:
+                                full_response = event.get("text") or ""
+                        elif event["event"] == "error":
+                            raise RuntimeError(event.get("detail", "Unknown streaming error"))
+
+                    message_placeholder.markdown(full_response)
+
                     # Add assistant response to chat history
-                    st.session_state.messages.append({"role": "assistant", "content": full_response})
-                    
+                    if history_seq is not None:
+                        user_message["seq"] = history_seq - 1
+                    self._append_message("assistant", full_response, seq=history_seq)
+
                 except Exception as e:
                     error_msg = f"Error: {str(e)}"
                     message_placeholder.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
\ No newline at end of file
+                    self._append_message("assistant", error_msg)
\ No newline at end of file
@@ -2,7 +2,13 @@
 import streamlit as st
 
 def setup_sidebar():
-    """Set up the sidebar with flow selection and other controls"""
+    """
+    Set up the sidebar with flow selection and other controls
+
+    Returns a placeholder for the transcript render time, which is only
+    known once the chat history below has been rendered, or None if the
+    sidebar could not list any flows.
+    """
     with st.sidebar:
         st.title("LangFlow Chatbot")
         
@@ -26,16 +32,30 @@ def setup_sidebar():
                     if flow["id"] == selected_flow_id:
                         st.session_state.selected_flow = flow
                         break
+                # Warm the flow up while the user types the first question
+                if st.session_state.get("prewarmed_flow_id") != selected_flow_id:
+                    st.session_state.prewarmed_flow_id = selected_flow_id
+                    try:
+                        st.session_state.api_client.prewarm_flow(selected_flow_id)
+                    except Exception:
+                        pass
             
             # Add option to clear chat history
             if st.button("Clear Chat History"):
+                if st.session_state.session_id:
+                    st.session_state.api_client.delete_session(st.session_state.session_id)
                 st.session_state.messages = []
+                st.session_state.older_pages = []
+                st.session_state.history_summary = None
                 st.session_state.session_id = None
                 st.success("Chat history cleared")
             
+            render_timing = st.empty()
+            
             # Add link to evaluation dashboard
             st.markdown("---")
             st.markdown("[View Evaluation Dashboard](/evaluation)")
+            return render_timing
             
         except Exception as e:
             st.error(f"Error connecting to API: {str(e)}")
@@ -1,20 +1,63 @@
 # chatbot/utils/api_client.py
+import json
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 
 class APIClient:
-    def __init__(self, api_url: str):
+    def __init__(self, api_url: str, pool_maxsize: int = 32, timeout: Tuple[float, float] = (5.0, 300.0)):
         self.api_url = api_url
+        # (connect, read) seconds; the read timeout bounds the wait for a
+        # flow's answer, or for the next result of a batch
+        self.timeout = timeout
         self.session = requests.Session()
+        # Allow concurrent callers (e.g. the evaluation collector) to keep their connections
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._flows_cache: Dict[str, Any] = {}
     
-    def get_flows(self) -> Dict[str, Any]:
-        """Get all available flows from the API"""
-        response = self.session.get(f"{self.api_url}/flows")
+    def get_flows(self, view: str = "summary") -> Dict[str, Any]:
+        """
+        Get the available flows from the API
+
+        Uses a conditional request, so an unchanged flow list costs a 304
+        instead of a new download.
+        """
+        headers = {}
+        cached = self._flows_cache.get(view)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        response = self.session.get(f"{self.api_url}/flows", params={"view": view}, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached:
+            return cached[1]
         response.raise_for_status()
-        return response.json()
+
+        flows = response.json()
+        if response.headers.get("ETag"):
+            self._flows_cache[view] = (response.headers["ETag"], flows)
+        return flows
     
-    def send_query(self, query: str, flow_id: str, session_id: Optional[str] = None) -> Dict[str, Any]:
-        """Send a query to the API and get a response"""
+    def send_query(
+        self,
+        query: str,
+        flow_id: str,
+        session_id: Optional[str] = None,
+        use_cache: bool = True,
+        projection: Optional[str] = None,
+        include_documents: bool = False,
+        use_session: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Send a query to the API and get a response
+
+        ``projection`` selects the metadata returned ("minimal", "sources" or
+        "full"); the API's configured default is used when omitted.
+        ``include_documents`` adds the documents the flow retrieved as
+        ``metadata["documents"]``. With ``use_session=False`` the API keeps
+        no session or LangFlow chat memory for the query, e.g. for evaluations.
+        """
         endpoint = f"{self.api_url}/chat"
         payload = {
             "query": query,
@@ -23,7 +66,97 @@ class APIClient:
         
         if session_id:
             payload["session_id"] = session_id
+        if not use_cache:
+            payload["use_cache"] = False
+        if projection:
+            payload["projection"] = projection
+        if include_documents:
+            payload["include_documents"] = True
+        if not use_session:
+            payload["use_session"] = False
         
-        response = self.session.post(endpoint, json=payload)
+        response = self.session.post(endpoint, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def prewarm_flow(self, flow_id: str) -> Dict[str, Any]:
+        """Ask the API to warm a flow up in the background; returns without waiting for it"""
+        response = self.session.post(f"{self.api_url}/flows/{flow_id}/prewarm", timeout=5)
+        response.raise_for_status()
+        return response.json()
+
+    def get_history(self, session_id: str, limit: int = 50, before: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get one page of a session's messages from the API, oldest first
+
+        Pass the returned ``next_before`` as ``before`` to page further back.
+        """
+        params = {"limit": limit}
+        if before is not None:
+            params["before"] = before
+        response = self.session.get(f"{self.api_url}/sessions/{session_id}/history", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def delete_session(self, session_id: str) -> bool:
+        """Delete a session and its history on the API"""
+        response = self.session.delete(f"{self.api_url}/sessions/{session_id}", timeout=self.timeout)
         response.raise_for_status()
-        return response.json()
\ No newline at end of file
+        return response.json().get("deleted", False)
+
+    def stream_query(self, query: str, flow_id: str, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Send a query to the streaming endpoint and yield events as they arrive"""
+        endpoint = f"{self.api_url}/chat/stream"
+        payload = {
+            "query": query,
+            "flow_id": flow_id
+        }
+
+        if session_id:
+            payload["session_id"] = session_id
+
+        with self.session.post(endpoint, json=payload, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def send_batch(
+        self,
+        queries: List[Union[str, Dict[str, Any]]],
+        flow_id: Optional[str] = None,
+        use_cache: bool = True,
+        projection: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        include_documents: bool = False,
+        use_session: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Send many queries in one request and yield results as they finish
+
+        ``queries`` are strings or ``{"query": ..., "flow_id": ...}`` dicts;
+        ``flow_id`` applies to those without one. Every result carries the
+        ``index`` of its query, and failed queries carry an ``error`` instead
+        of a response. ``use_session`` is as in ``send_query``.
+        """
+        endpoint = f"{self.api_url}/chat/batch"
+        payload = {"queries": queries}
+
+        if flow_id:
+            payload["flow_id"] = flow_id
+        if not use_cache:
+            payload["use_cache"] = False
+        if projection:
+            payload["projection"] = projection
+        if max_concurrency:
+            payload["max_concurrency"] = max_concurrency
+        if include_documents:
+            payload["include_documents"] = True
+        if not use_session:
+            payload["use_session"] = False
+
+        with self.session.post(endpoint, json=payload, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
@@ -1,3 +1,15 @@
 """Evaluation package for RAG system performance assessment."""
-from .ragas_evaluator import RagasEvaluator
-from .data_generator import EvaluationDataGenerator
\ No newline at end of file
+import importlib
+
+# Exported on first access, so that importing a light submodule such as
+# evaluation.dataset does not load pandas, ragas and its LLM stack
+_EXPORTS = {
+    "RagasEvaluator": ".ragas_evaluator",
+    "EvaluationDataGenerator": ".data_generator",
+}
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
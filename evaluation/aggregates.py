@@ -0,0 +1,190 @@
+# evaluation/aggregates.py
+import argparse
+import glob
+import os
+import re
+import threading
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Statistics kept per metric and run, as "<metric>_<statistic>" columns
+STATISTICS = ("mean", "median", "p10", "p90", "std")
+RUN_COLUMNS = ["run_id", "flow_id", "flow_version", "timestamp", "sample_size"]
+
+def compute_aggregates(scores: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """
+    Per-metric statistics of a run's per-question scores
+
+    ``scores`` has one column per metric and one row per question. Questions
+    without a score (NaN) are left out of that metric's statistics.
+    """
+    scores = scores.astype(float)
+    quantiles = scores.quantile([0.1, 0.5, 0.9])
+    stats = pd.DataFrame({
+        "mean": scores.mean(),
+        "median": quantiles.loc[0.5],
+        "p10": quantiles.loc[0.1],
+        "p90": quantiles.loc[0.9],
+        # The questions are the whole population of the run, not a sample of it
+        "std": scores.std(ddof=0),
+    })
+    return stats.to_dict(orient="index")
+
+def _file_key(flow_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", flow_id) or "_"
+
+class AggregateStore:
+    """
+    Precomputed evaluation statistics in Parquet files, read by the dashboard
+
+    ``runs/<flow>.parquet`` has one row per run of the flow and one column per
+    metric statistic (``faithfulness_mean``, ``faithfulness_p90``, ...), so
+    plotting a flow's history reads only the columns it needs from one small
+    file. ``scores/<flow>/<run_id>.parquet`` has the per-question scores of a
+    run, for plotting score distributions.
+    """
+
+    def __init__(self, directory: str = "data/evaluation_aggregates"):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "runs"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "scores"), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _runs_path(self, flow_id: str) -> str:
+        return os.path.join(self.directory, "runs", f"{_file_key(flow_id)}.parquet")
+
+    def _scores_path(self, flow_id: str, run_id: int) -> str:
+        return os.path.join(self.directory, "scores", _file_key(flow_id), f"{run_id}.parquet")
+
+    @staticmethod
+    def _write(df: pd.DataFrame, path: str):
+        # Readers never see a half-written file
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def is_empty(self) -> bool:
+        return not glob.glob(os.path.join(self.directory, "runs", "*.parquet"))
+
+    def staging_path(self, flow_id: str) -> str:
+        """A new file to write a run's per-question scores to before the run has an ID"""
+        directory = os.path.join(self.directory, "scores", _file_key(flow_id))
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"staging-{uuid.uuid4().hex}.parquet")
+
+    def add_run(
+        self,
+        run_id: int,
+        result: Dict[str, Any],
+        scores: Optional[pd.DataFrame] = None,
+        scores_file: Optional[str] = None,
+    ):
+        """
+        Store the aggregates of one evaluation run
+
+        ``result`` is a result dict as produced by RagasEvaluator.evaluate_flow,
+        with its ``aggregates``. ``scores`` optionally has the per-question
+        scores (a column per metric, plus question columns); alternatively
+        ``scores_file`` is a Parquet file with them, from staging_path, which
+        is moved into place.
+        """
+        flow_id = result.get("flow_id", "")
+        row = {
+            "run_id": run_id,
+            "flow_id": flow_id,
+            "flow_version": result.get("flow_version"),
+            "timestamp": pd.to_datetime(result.get("timestamp"), format="%Y%m%d_%H%M%S", errors="coerce"),
+            "sample_size": result.get("sample_size"),
+        }
+        for metric, stats in result.get("aggregates", {}).items():
+            for statistic in STATISTICS:
+                row[f"{metric}_{statistic}"] = stats.get(statistic)
+
+        with self._lock:
+            scores_path = self._scores_path(flow_id, run_id)
+            if scores is not None:
+                os.makedirs(os.path.dirname(scores_path), exist_ok=True)
+                self._write(scores.reset_index(drop=True), scores_path)
+            elif scores_file is not None:
+                os.replace(scores_file, scores_path)
+
+            # A flow's run file stays small (one row per run), so it is
+            # rewritten whole rather than appended to
+            runs_path = self._runs_path(flow_id)
+            runs = pd.DataFrame([row])
+            if os.path.exists(runs_path):
+                existing = pd.read_parquet(runs_path)
+                runs = pd.concat([existing[existing["run_id"] != run_id], runs], ignore_index=True)
+            self._write(runs.sort_values(["timestamp", "run_id"], ignore_index=True), runs_path)
+
+    def load_runs(self, flow_id: Optional[str] = None, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Run aggregates, oldest first, for one flow or all flows
+
+        Only the run columns and the requested statistic ``columns`` are read.
+        """
+        paths = [self._runs_path(flow_id)] if flow_id is not None else glob.glob(os.path.join(self.directory, "runs", "*.parquet"))
+        paths = [path for path in paths if os.path.exists(path)]
+        if columns is not None:
+            columns = list(dict.fromkeys([*RUN_COLUMNS, *columns]))
+        if not paths:
+            return pd.DataFrame(columns=columns or RUN_COLUMNS)
+
+        frames = []
+        for path in paths:
+            if columns is None:
+                df = pd.read_parquet(path)
+            else:
+                # Runs scored without some metric have no columns for it
+                available = set(pq.read_schema(path).names)
+                df = pd.read_parquet(path, columns=[c for c in columns if c in available]).reindex(columns=columns)
+            if flow_id is not None:
+                # Distinct flow IDs can share a file name
+                df = df[df["flow_id"] == flow_id]
+            frames.append(df)
+        return pd.concat(frames, ignore_index=True).sort_values(["timestamp", "run_id"], ignore_index=True)
+
+    def load_scores(self, flow_id: str, run_id: int, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """The per-question scores of one run; empty if they were not stored"""
+        path = self._scores_path(flow_id, run_id)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_parquet(path, columns=list(columns) if columns is not None else None)
+
+    def version(self, flow_id: Optional[str] = None) -> float:
+        """Changes whenever the flow's (or any flow's) run aggregates change; use as a cache key"""
+        paths = [self._runs_path(flow_id)] if flow_id is not None else glob.glob(os.path.join(self.directory, "runs", "*.parquet"))
+        return max((os.path.getmtime(path) for path in paths if os.path.exists(path)), default=0.0)
+
+    def backfill(self, results_store) -> int:
+        """Compute aggregates for stored runs that have none yet; returns how many were added"""
+        known = set(self.load_runs(columns=[])["run_id"].tolist())
+        added = 0
+        for summary in reversed(results_store.list_results()):
+            if summary["id"] in known:
+                continue
+            details = pd.DataFrame(results_store.get_details(summary["id"]))
+            metric_columns = [metric for metric in summary.get("metrics", {}) if metric in details.columns]
+            if details.empty or not metric_columns:
+                continue
+            result = {**summary, "aggregates": compute_aggregates(details[metric_columns])}
+            question_columns = [column for column in ("question",) if column in details.columns]
+            self.add_run(summary["id"], result, details[question_columns + metric_columns])
+            added += 1
+        return added
+
+def main():
+    from .results_store import ResultsStore
+
+    parser = argparse.ArgumentParser(description="Compute Parquet aggregates for stored evaluation runs that have none")
+    parser.add_argument("--db", default="data/evaluation_results.db")
+    parser.add_argument("--dir", default="data/evaluation_aggregates")
+    args = parser.parse_args()
+    added = AggregateStore(args.dir).backfill(ResultsStore(args.db))
+    print(f"Added aggregates for {added} runs to {args.dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# evaluation/batch_query.py
+"""Run a file of questions against a flow through the API's /chat/batch endpoint.
+
+    python -m evaluation.batch_query data/questions.json --flow-id <flow> --output answers.ndjson
+
+Accepts the evaluation question file format (a JSON list of objects with a
+``question`` key), JSON Lines with ``query``/``question`` and an optional
+``flow_id`` per line (for mixed-flow batches), or plain text with one question
+per line. Results are written as NDJSON in completion order, each with the
+``index`` of its question.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+from chatbot.utils.api_client import APIClient
+
+def load_queries(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r") as f:
+        content = f.read()
+    if path.endswith(".json"):
+        items = json.loads(content)
+    elif path.endswith(".jsonl"):
+        items = [json.loads(line) for line in content.splitlines() if line.strip()]
+    else:
+        items = [line.strip() for line in content.splitlines() if line.strip()]
+
+    queries = []
+    for item in items:
+        if isinstance(item, str):
+            queries.append({"query": item})
+            continue
+        query = {"query": item.get("query") or item["question"]}
+        if item.get("flow_id"):
+            query["flow_id"] = item["flow_id"]
+        queries.append(query)
+    return queries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("questions", help="Question file (.json, .jsonl or plain text)")
+    parser.add_argument("--flow-id", help="Flow for questions that do not name their own")
+    parser.add_argument("--api-url", default=os.getenv("API_URL", "http://localhost:8000"))
+    parser.add_argument("--output", help="NDJSON file for the results (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=None, help="LangFlow runs in flight at once")
+    parser.add_argument("--projection", choices=("minimal", "sources", "full"), default=None)
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the API response cache")
+    args = parser.parse_args()
+
+    queries = load_queries(args.questions)
+    client = APIClient(args.api_url)
+    out = open(args.output, "w") if args.output else sys.stdout
+    errors = 0
+    start = time.perf_counter()
+    try:
+        for result in client.send_batch(
+            queries,
+            flow_id=args.flow_id,
+            use_cache=not args.no_cache,
+            projection=args.projection,
+            max_concurrency=args.concurrency,
+        ):
+            if "error" in result:
+                errors += 1
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(queries)} queries, {errors} failed, {elapsed:.1f}s", file=sys.stderr)
+    sys.exit(1 if errors else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# evaluation/checkpoint.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+def question_hash(question: str, ground_truth: str = "") -> str:
+    """Stable key for an evaluation item; ground truth is included because context_recall depends on it"""
+    digest = hashlib.sha256()
+    digest.update(question.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update((ground_truth or "").encode("utf-8"))
+    return digest.hexdigest()
+
+class CheckpointStore:
+    """
+    Per-question evaluation checkpoints in a local SQLite file
+
+    Flow answers are stored by (flow_id, flow_version, question_hash) and metric
+    scores by (flow_id, flow_version, question_hash, metric), so an interrupted
+    run resumes where it stopped and questions that were already evaluated
+    against the same flow version are skipped.
+    """
+
+    def __init__(self, path: str = "data/evaluation_checkpoints.db"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS answers (
+                flow_id TEXT NOT NULL,
+                flow_version TEXT NOT NULL,
+                question_hash TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (flow_id, flow_version, question_hash)
+            );
+            CREATE TABLE IF NOT EXISTS scores (
+                flow_id TEXT NOT NULL,
+                flow_version TEXT NOT NULL,
+                question_hash TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                score REAL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (flow_id, flow_version, question_hash, metric)
+            );
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _chunks(items: List[str], size: int = 500) -> Iterable[List[str]]:
+        # SQLite limits the number of bound parameters per statement
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+
+    def get_answers(self, flow_id: str, flow_version: str, hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored API responses for the given questions, keyed by question hash"""
+        answers = {}
+        with self._lock:
+            for chunk in self._chunks(hashes):
+                rows = self._conn.execute(
+                    f"SELECT question_hash, response FROM answers WHERE flow_id = ? AND flow_version = ? "
+                    f"AND question_hash IN ({','.join('?' * len(chunk))})",
+                    (flow_id, flow_version, *chunk),
+                ).fetchall()
+                answers.update({h: json.loads(response) for h, response in rows})
+        return answers
+
+    def save_answer(self, flow_id: str, flow_version: str, qhash: str, response: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                (flow_id, flow_version, qhash, json.dumps(response, default=str), time.time()),
+            )
+            self._conn.commit()
+
+    def get_scores(self, flow_id: str, flow_version: str, hashes: List[str], metric: str) -> Dict[str, Optional[float]]:
+        """Stored scores of one metric for the given questions, keyed by question hash"""
+        scores = {}
+        with self._lock:
+            for chunk in self._chunks(hashes):
+                rows = self._conn.execute(
+                    f"SELECT question_hash, score FROM scores WHERE flow_id = ? AND flow_version = ? AND metric = ? "
+                    f"AND question_hash IN ({','.join('?' * len(chunk))})",
+                    (flow_id, flow_version, metric, *chunk),
+                ).fetchall()
+                scores.update(dict(rows))
+        return scores
+
+    def save_scores(self, flow_id: str, flow_version: str, metric: str, scores: Dict[str, Optional[float]]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?)",
+                [(flow_id, flow_version, qhash, metric, score, now) for qhash, score in scores.items()],
+            )
+            self._conn.commit()
+
+    def clear(self, flow_id: str, flow_version: Optional[str] = None):
+        """Forget the checkpoints of a flow (or one version of it) to force a full re-run"""
+        with self._lock:
+            for table in ("answers", "scores"):
+                if flow_version is None:
+                    self._conn.execute(f"DELETE FROM {table} WHERE flow_id = ?", (flow_id,))
+                else:
+                    self._conn.execute(
+                        f"DELETE FROM {table} WHERE flow_id = ? AND flow_version = ?", (flow_id, flow_version)
+                    )
+            self._conn.commit()
+
+class NullCheckpointStore:
+    """Checkpoints that keep nothing, for runs whose flow version is unknown"""
+
+    def get_answers(self, flow_id: str, flow_version: Optional[str], hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        return {}
+
+    def save_answer(self, flow_id: str, flow_version: Optional[str], qhash: str, response: Dict[str, Any]):
+        pass
+
+    def get_scores(self, flow_id: str, flow_version: Optional[str], hashes: List[str], metric: str) -> Dict[str, Optional[float]]:
+        return {}
+
+    def save_scores(self, flow_id: str, flow_version: Optional[str], metric: str, scores: Dict[str, Optional[float]]):
+        pass
@@ -0,0 +1,204 @@
+# evaluation/collector.py
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CollectedResponse:
+    index: int
+    question: str
+    response_data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least 1/rate seconds apart"""
+
+    def __init__(self, rate: float = 0.0):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next)
+            self._next = scheduled + self.interval
+        if scheduled > now:
+            time.sleep(scheduled - now)
+
+def is_retryable(error: Exception) -> bool:
+    """Retry connection problems, timeouts, 429s and 5xx responses, but not other client errors"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return True
+
+class ResponseCollector:
+    """
+    Send evaluation questions to a flow with bounded concurrency
+
+    Up to ``max_concurrency`` questions are in flight at once, starts are
+    spaced to at most ``rate_limit`` requests per second (0 = unlimited), and
+    retryable failures are retried with exponential backoff and jitter.
+    Results come back in the order of the input questions. ``collect_batch``
+    sends at most ``batch_size`` questions per request, the API's
+    ``BATCH_MAX_QUERIES`` by default.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        rate_limit: float = 0.0,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        batch_size: int = 1000,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limit = rate_limit
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.batch_size = max(1, batch_size)
+
+    def _send_with_retries(
+        self,
+        index: int,
+        question: str,
+        send: Callable[[str], Dict[str, Any]],
+        limiter: RateLimiter,
+    ) -> CollectedResponse:
+        result = CollectedResponse(index=index, question=question)
+        while True:
+            limiter.wait()
+            result.attempts += 1
+            try:
+                result.response_data = send(question)
+                return result
+            except Exception as e:
+                if result.attempts > self.max_retries or not is_retryable(e):
+                    result.error = str(e)
+                    return result
+                delay = min(self.max_backoff, self.backoff * 2 ** (result.attempts - 1))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def collect(
+        self,
+        questions: List[str],
+        send: Callable[[str], Dict[str, Any]],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        result_callback: Optional[Callable[[CollectedResponse], None]] = None,
+    ) -> List[CollectedResponse]:
+        """
+        Collect a response for every question
+
+        Args:
+            questions: Questions to send, in order
+            send: Function sending one question and returning the API response
+            progress_callback: Called as ``(completed, total)`` from the calling
+                thread after each question finishes, so it may update UI state
+            result_callback: Called from the calling thread with each result as
+                soon as it finishes, e.g. to checkpoint it
+        """
+        limiter = RateLimiter(self.rate_limit)
+        results: List[Optional[CollectedResponse]] = [None] * len(questions)
+        total = len(questions)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = [
+                executor.submit(self._send_with_retries, index, question, send, limiter)
+                for index, question in enumerate(questions)
+            ]
+            for completed, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                results[result.index] = result
+                if result_callback is not None:
+                    result_callback(result)
+                if progress_callback is not None:
+                    progress_callback(completed, total)
+
+        return results
+
+    def collect_batch(
+        self,
+        questions: List[str],
+        send_batch: Callable[[List[str]], Iterable[Dict[str, Any]]],
+        send: Callable[[str], Dict[str, Any]],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        result_callback: Optional[Callable[[CollectedResponse], None]] = None,
+    ) -> List[CollectedResponse]:
+        """
+        Collect responses through batch requests of up to ``batch_size`` questions
+
+        ``send_batch`` sends a list of questions at once and yields results
+        tagged with the ``index`` of their question in that list as they
+        finish, for example ``APIClient.send_batch``. Questions that fail in a
+        batch, or that a batch never returned because the request failed in a
+        retryable way, are retried one by one through ``collect`` with
+        ``send``. Other request errors, e.g. a rejected batch, are raised.
+        Callbacks behave as in ``collect``.
+        """
+        results: List[Optional[CollectedResponse]] = [None] * len(questions)
+        total = len(questions)
+        completed = 0
+
+        for offset in range(0, total, self.batch_size):
+            batch = questions[offset:offset + self.batch_size]
+            try:
+                for item in send_batch(batch):
+                    if "error" in item:
+                        continue
+                    index = offset + item["index"]
+                    result = CollectedResponse(
+                        index=index,
+                        question=questions[index],
+                        response_data={key: value for key, value in item.items() if key != "index"},
+                        attempts=1,
+                    )
+                    results[index] = result
+                    completed += 1
+                    if result_callback is not None:
+                        result_callback(result)
+                    if progress_callback is not None:
+                        progress_callback(completed, total)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                # Whatever the batch did not answer is retried below
+                logger.warning(
+                    "Batch of questions %d-%d failed, sending the unanswered ones one by one: %s",
+                    offset, offset + len(batch) - 1, e,
+                )
+
+        remaining = [index for index, result in enumerate(results) if result is None]
+        if not remaining:
+            return results
+
+        def retry_result(result: CollectedResponse):
+            result = replace(result, index=remaining[result.index])
+            results[result.index] = result
+            if result_callback is not None:
+                result_callback(result)
+
+        def retry_progress(retried: int, _total: int):
+            if progress_callback is not None:
+                progress_callback(completed + retried, total)
+
+        self.collect(
+            [questions[index] for index in remaining],
+            send,
+            progress_callback=retry_progress,
+            result_callback=retry_result,
+        )
+        return results
@@ -0,0 +1,118 @@
+# evaluation/comparison.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Resampled means are computed in chunks of this many resamples to bound memory
+_CHUNK_CELLS = 2_000_000
+# Default number of bootstrap processes, at most one per core
+_MAX_WORKERS = 8
+# Comparisons that resample fewer cells than this run in-process; starting a
+# pool would take longer than the bootstraps themselves
+_POOL_MIN_CELLS = 10_000_000
+
+def paired_scores(baseline: pd.DataFrame, candidate: pd.DataFrame, metrics: Iterable[str]) -> pd.DataFrame:
+    """
+    Per-question scores of two runs side by side, for the questions both answered
+
+    Rows are matched on ``question_hash`` when both runs have it and on the
+    question text otherwise. Columns are ``<metric>_baseline`` and
+    ``<metric>_candidate`` for each metric.
+    """
+    key = "question_hash" if "question_hash" in baseline and "question_hash" in candidate else "question"
+    metrics = [m for m in metrics if m in baseline and m in candidate]
+    # A question set can repeat a question; each is scored once per run
+    left = baseline[[key, *metrics]].drop_duplicates(key)
+    right = candidate[[key, *metrics]].drop_duplicates(key)
+    return left.merge(right, on=key, suffixes=("_baseline", "_candidate"))
+
+def bootstrap_mean_ci(
+    deltas: np.ndarray,
+    n_resamples: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> Tuple[float, float, float]:
+    """Mean of paired deltas and its percentile bootstrap confidence interval"""
+    deltas = np.asarray(deltas, dtype=float)
+    deltas = deltas[~np.isnan(deltas)]
+    if len(deltas) == 0:
+        return float("nan"), float("nan"), float("nan")
+    rng = np.random.default_rng(seed)
+    chunk = max(1, _CHUNK_CELLS // len(deltas))
+    means = np.empty(n_resamples)
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        indices = rng.integers(0, len(deltas), size=(size, len(deltas)))
+        means[start:start + size] = deltas[indices].mean(axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return float(deltas.mean()), float(low), float(high)
+
+def _bootstrap_job(job) -> Tuple[float, float, float]:
+    deltas, n_resamples, confidence, seed = job
+    return bootstrap_mean_ci(deltas, n_resamples, confidence, seed)
+
+def compare_scores(
+    baseline: pd.DataFrame,
+    candidates: Dict[str, pd.DataFrame],
+    metrics: List[str],
+    n_resamples: int = 2000,
+    confidence: float = 0.95,
+    max_workers: Optional[int] = None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Paired per-question metric deltas of candidate runs against a baseline run
+
+    ``baseline`` and each of ``candidates`` (keyed by flow ID) are per-question
+    score frames as stored for a run. Returns one row per candidate and
+    metric with the mean scores, the mean delta (candidate - baseline), its
+    bootstrap confidence interval and how many questions improved or got
+    worse. The bootstraps of larger comparisons are spread over a pool of
+    ``max_workers`` processes (``None``: one per core, at most 8); pass 1
+    to run them all in this process.
+    """
+    rows = []
+    jobs = []
+    for flow_id, candidate in candidates.items():
+        paired = paired_scores(baseline, candidate, metrics)
+        for metric in metrics:
+            if f"{metric}_baseline" not in paired:
+                continue
+            deltas = (paired[f"{metric}_candidate"] - paired[f"{metric}_baseline"]).to_numpy()
+            valid = deltas[~np.isnan(deltas)]
+            rows.append({
+                "flow_id": flow_id,
+                "metric": metric,
+                "questions": len(valid),
+                "baseline_mean": paired[f"{metric}_baseline"].mean(),
+                "candidate_mean": paired[f"{metric}_candidate"].mean(),
+                "improved": int((valid > 0).sum()),
+                "worse": int((valid < 0).sum()),
+            })
+            jobs.append((deltas, n_resamples, confidence, seed))
+
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, _MAX_WORKERS)
+    cells = sum(len(job[0]) for job in jobs) * n_resamples
+    if max_workers > 1 and len(jobs) > 1 and cells >= _POOL_MIN_CELLS:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+            intervals = list(pool.map(_bootstrap_job, jobs))
+    else:
+        intervals = [_bootstrap_job(job) for job in jobs]
+
+    for row, (delta, low, high) in zip(rows, intervals):
+        row.update({
+            "delta": delta,
+            "ci_low": low,
+            "ci_high": high,
+            # The interval excludes zero
+            "significant": bool(low > 0 or high < 0),
+        })
+    return pd.DataFrame(rows, columns=[
+        "flow_id", "metric", "questions", "baseline_mean", "candidate_mean",
+        "delta", "ci_low", "ci_high", "significant", "improved", "worse",
+    ])
@@ -3,6 +3,8 @@ import json
 import os
 from typing import List, Dict, Any
 
+from .dataset import EvaluationDataset
+
 class EvaluationDataGenerator:
     def __init__(self, data_file: str = "data/questions.json"):
         self.data_file = data_file
@@ -16,6 +18,8 @@ class EvaluationDataGenerator:
         """
         # Check if evaluation data already exists
         if os.path.exists(self.data_file):
+            if self.data_file.endswith((".jsonl", ".parquet")):
+                return list(EvaluationDataset(self.data_file))
             with open(self.data_file, "r") as f:
                 return json.load(f)
         
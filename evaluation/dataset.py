@@ -0,0 +1,195 @@
+# evaluation/dataset.py
+"""Stream evaluation questions from large JSON, JSON Lines or Parquet files.
+
+    python -m evaluation.dataset corpus.jsonl --sample-size 1000 --stratify-by category --output subset.jsonl
+    python -m evaluation.dataset corpus.parquet --shard 0/4 --flow-id <flow> --chunk-size 500
+
+Sampling and sharding are decided per question from a hash of the question
+and its ground truth, so they are deterministic for a given seed, need no
+coordination between workers, and a question keeps its place in a sample
+when questions are added to the corpus.
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import sys
+from collections import Counter
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .checkpoint import question_hash
+
+def _unit_hash(qhash: str, seed: int) -> float:
+    """Deterministic position of a question in [0, 1) for a given seed"""
+    digest = hashlib.blake2b(f"{seed}:{qhash}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+class EvaluationDataset:
+    """
+    A question set read lazily, optionally sampled, stratified and sharded
+
+    Items are dicts with at least ``question`` and ``ground_truth``; other
+    fields (such as a category to stratify by) are passed through, and each
+    item gets its ``question_hash``.
+
+    Args:
+        path: A .json (a list of items), .jsonl or .parquet file
+        sample_fraction: Keep this share of the questions, decided per question
+        sample_size: Keep this many questions (the ones with the lowest hash)
+        stratify_by: With sample_size, split it across the values of this field
+            in proportion to their frequency, at least one question each
+        shard: ``(index, count)`` to keep only this worker's share of the questions
+        seed: Changes which questions are sampled
+        batch_size: Rows read from a Parquet file at a time
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_fraction: Optional[float] = None,
+        sample_size: Optional[int] = None,
+        stratify_by: Optional[str] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        seed: int = 0,
+        batch_size: int = 10_000,
+    ):
+        if sample_fraction is not None and sample_size is not None:
+            raise ValueError("Pass either sample_fraction or sample_size, not both")
+        if shard is not None and not 0 <= shard[0] < shard[1]:
+            raise ValueError(f"Invalid shard {shard[0]}/{shard[1]}")
+        self.path = path
+        self.sample_fraction = sample_fraction
+        self.sample_size = sample_size
+        self.stratify_by = stratify_by
+        self.shard = shard
+        self.seed = seed
+        self.batch_size = batch_size
+
+    def _read(self) -> Iterator[Dict[str, Any]]:
+        """Every item in the file, in file order"""
+        if self.path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(self.path)
+            for batch in parquet_file.iter_batches(batch_size=self.batch_size):
+                yield from batch.to_pylist()
+        elif self.path.endswith(".jsonl"):
+            with open(self.path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            # A JSON list has to be parsed whole; use JSON Lines or Parquet for large sets
+            with open(self.path, "r") as f:
+                yield from json.load(f)
+
+    def _scan(self) -> Iterator[Tuple[float, Dict[str, Any]]]:
+        """Items in this shard with their sampling position"""
+        for item in self._read():
+            qhash = question_hash(item["question"], item.get("ground_truth", ""))
+            if self.shard is not None and int(qhash[:15], 16) % self.shard[1] != self.shard[0]:
+                continue
+            yield _unit_hash(qhash, self.seed), {**item, "question_hash": qhash}
+
+    def _stratum(self, item: Dict[str, Any]) -> Any:
+        return item.get(self.stratify_by)
+
+    def _allocation(self) -> Dict[Any, int]:
+        """Questions to sample per stratum, proportional to stratum size"""
+        sizes = Counter(self._stratum(item) for _, item in self._scan())
+        total = sum(sizes.values())
+        if self.sample_size >= total:
+            return dict(sizes)
+        allocation = {stratum: max(1, int(self.sample_size * size / total)) for stratum, size in sizes.items()}
+        # Hand out what rounding down left over to the largest strata
+        for stratum, _ in sizes.most_common(max(0, self.sample_size - sum(allocation.values()))):
+            allocation[stratum] += 1
+        return allocation
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self.sample_size is None:
+            for position, item in self._scan():
+                if self.sample_fraction is None or position < self.sample_fraction:
+                    yield item
+            return
+
+        # Keep the sample_size lowest positions (per stratum) in bounded heaps,
+        # then emit the kept questions in file order
+        allocation = self._allocation() if self.stratify_by else {None: self.sample_size}
+        heaps: Dict[Any, List[Tuple[float, int]]] = {stratum: [] for stratum in allocation}
+        for index, (position, item) in enumerate(self._scan()):
+            heap = heaps[self._stratum(item) if self.stratify_by else None]
+            limit = allocation[self._stratum(item) if self.stratify_by else None]
+            if len(heap) < limit:
+                heapq.heappush(heap, (-position, index))
+            elif heap and -heap[0][0] > position:
+                heapq.heapreplace(heap, (-position, index))
+        kept = {index for heap in heaps.values() for _, index in heap}
+        for index, (_, item) in enumerate(self._scan()):
+            if index in kept:
+                yield item
+
+    def chunks(self, size: int) -> Iterator[List[Dict[str, Any]]]:
+        """The items in lists of at most ``size``"""
+        items = iter(self)
+        while chunk := list(islice(items, size)):
+            yield chunk
+
+    def count(self) -> int:
+        """Number of items, counted with a pass over the file"""
+        return sum(1 for _ in self)
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    index, count = value.split("/")
+    return int(index), int(count)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Question file (.json, .jsonl or .parquet)")
+    parser.add_argument("--sample-fraction", type=float)
+    parser.add_argument("--sample-size", type=int)
+    parser.add_argument("--stratify-by", help="Field to stratify --sample-size by")
+    parser.add_argument("--shard", type=parse_shard, help="INDEX/COUNT, e.g. 0/4")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the selected questions to this JSONL file (default: stdout)")
+    parser.add_argument("--flow-id", help="Evaluate the selected questions against this flow instead")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Questions evaluated at a time")
+    parser.add_argument("--metric-tier", choices=("ragas", "local", "all"), default=None)
+    parser.add_argument("--api-url", default=os.getenv("API_URL", "http://localhost:8000"))
+    args = parser.parse_args()
+
+    dataset = EvaluationDataset(
+        args.path,
+        sample_fraction=args.sample_fraction,
+        sample_size=args.sample_size,
+        stratify_by=args.stratify_by,
+        shard=args.shard,
+        seed=args.seed,
+    )
+    if args.flow_id:
+        from chatbot.utils.api_client import APIClient
+        from .ragas_evaluator import RagasEvaluator
+
+        result = RagasEvaluator().evaluate_dataset(
+            args.flow_id,
+            APIClient(args.api_url),
+            dataset,
+            chunk_size=args.chunk_size,
+            metric_tier=args.metric_tier,
+            progress_callback=lambda done, total: print(f"Answered {done} of {total}", file=sys.stderr),
+        )
+        print(json.dumps({key: result[key] for key in ("id", "flow_id", "timestamp", "sample_size", "metrics")}, indent=2))
+        return
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for item in dataset:
+            out.write(json.dumps(item, default=str) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
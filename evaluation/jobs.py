@@ -0,0 +1,565 @@
+# evaluation/jobs.py
+"""Queue evaluation runs for the background worker and schedule them with cron expressions.
+
+    python -m evaluation.jobs submit <flow>
+    python -m evaluation.jobs submit <baseline flow> <candidate flow> --kind comparison
+    python -m evaluation.jobs submit <flow> --kind dataset --dataset corpus.parquet --sample-size 1000
+    python -m evaluation.jobs status [JOB_ID]
+    python -m evaluation.jobs cancel JOB_ID
+    python -m evaluation.jobs schedule <flow> --cron "0 2 * * *"
+    python -m evaluation.jobs schedules
+
+Jobs are run by ``python -m evaluation.worker``. The queue is a SQLite file,
+so the dashboard, this command and any number of workers on the host share it.
+"""
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+JOB_KINDS = ("flow", "dataset", "comparison")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@nightly": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# (lowest, highest) value of each cron field
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+class CronSchedule:
+    """
+    A five-field cron expression (minute hour day-of-month month day-of-week)
+
+    Fields take ``*``, numbers, ranges (``1-5``), steps (``*/15``, ``0-30/10``)
+    and comma-separated lists of these; day-of-week 0 and 7 are Sunday. As in
+    cron, when both day fields are restricted a day matching either one is
+    due. ``@hourly``, ``@daily``, ``@nightly``, ``@weekly`` and ``@monthly``
+    are accepted too. Times are local.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"A cron expression has five fields: {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> set:
+        values = set()
+        for part in field.split(","):
+            part, _, step = part.partition("/")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(value) for value in part.split("-", 1))
+            else:
+                start = end = int(part)
+                if step:
+                    end = high
+            if not low <= start <= end <= high:
+                raise ValueError(f"Cron field {field!r} is outside {low}-{high}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, moment: datetime.datetime) -> bool:
+        day = moment.day in self.days
+        # Python counts weekdays from Monday, cron from Sunday
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime.datetime) -> datetime.datetime:
+        """The first time after ``moment`` the schedule is due, to the minute"""
+        moment = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        # Skips a month, day or hour at a time, so a few hundred steps cover any schedule
+        limit = moment + datetime.timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + datetime.timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + datetime.timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression {self.expression!r} is never due")
+
+class JobQueue:
+    """
+    Evaluation jobs and their schedules in a local SQLite file
+
+    A job is one ``kind`` of run (an evaluation of a flow, of a dataset file
+    against a flow, or a comparison of flows) with its parameters. Workers
+    claim queued jobs in submission order and report progress, a result or an
+    error back. Claims are made in one transaction, so across all workers no
+    more than ``max_running`` jobs run at once, and never two jobs for the
+    same flow, whose checkpoints they would share.
+    """
+
+    def __init__(self, path: str = "data/evaluation_jobs.db"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                flow_ids TEXT NOT NULL,
+                params TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                result TEXT,
+                error TEXT,
+                schedule_id INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                heartbeat_at REAL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+            CREATE TABLE IF NOT EXISTS schedules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                flow_ids TEXT NOT NULL,
+                params TEXT NOT NULL DEFAULT '{}',
+                cron TEXT NOT NULL,
+                enabled INTEGER NOT NULL DEFAULT 1,
+                next_run_at REAL NOT NULL,
+                last_job_id INTEGER,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+
+    @staticmethod
+    def _validate(kind: str, flow_ids: List[str], params: Dict[str, Any]):
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if kind == "comparison" and len(set(flow_ids)) < 2:
+            raise ValueError("A comparison needs at least two flows")
+        if kind != "comparison" and len(flow_ids) != 1:
+            raise ValueError(f"A {kind} job evaluates exactly one flow")
+        if kind == "dataset" and not params.get("dataset", {}).get("path"):
+            raise ValueError("A dataset job needs params['dataset']['path']")
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["flow_ids"] = json.loads(job["flow_ids"])
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def _insert_job(self, kind: str, flow_ids: List[str], params: Dict[str, Any], schedule_id: Optional[int]) -> int:
+        cursor = self._conn.execute(
+            "INSERT INTO jobs (kind, flow_ids, params, status, schedule_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, json.dumps(flow_ids), json.dumps(params), QUEUED, schedule_id, time.time()),
+        )
+        return cursor.lastrowid
+
+    def submit(self, kind: str, flow_ids: List[str], params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Queue a job and return its ID
+
+        Args:
+            kind: "flow", "dataset" or "comparison"
+            flow_ids: The flow to evaluate, or the flows to compare, baseline first
+            params: ``metric_tier`` for every kind; for a dataset job the
+                ``dataset`` arguments of EvaluationDataset and ``chunk_size``
+        """
+        params = params or {}
+        self._validate(kind, flow_ids, params)
+        with self._lock:
+            return self._insert_job(kind, list(flow_ids), params, None)
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def list_jobs(
+        self, flow_id: Optional[str] = None, statuses: Optional[List[str]] = None, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Jobs, newest first, optionally only those involving a flow or in some statuses"""
+        query = "SELECT * FROM jobs WHERE 1 = 1"
+        params: List[Any] = []
+        if flow_id is not None:
+            query += " AND EXISTS (SELECT 1 FROM json_each(jobs.flow_ids) WHERE value = ?)"
+            params.append(flow_id)
+        if statuses:
+            query += f" AND status IN ({','.join('?' * len(statuses))})"
+            params += statuses
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a job; returns False if it had already finished
+
+        A queued job is cancelled at once. A running job is flagged, and its
+        worker stops it and marks it cancelled. Answers and scores it
+        checkpointed are kept, so a later run of the flow resumes from them.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None or row["status"] not in ACTIVE_STATUSES:
+                    self._conn.execute("COMMIT")
+                    return False
+                if row["status"] == QUEUED:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?", (CANCELLED, time.time(), job_id)
+                    )
+                else:
+                    self._conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def claim(self, worker: str, max_running: int) -> Optional[Dict[str, Any]]:
+        """
+        Mark the oldest queued job that may run now as running by ``worker``
+        and return it, or None if there is none or ``max_running`` jobs run
+        already
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                running = self._conn.execute("SELECT flow_ids FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+                job = None
+                if len(running) < max_running:
+                    busy_flows = {flow_id for row in running for flow_id in json.loads(row["flow_ids"])}
+                    for row in self._conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id", (QUEUED,)):
+                        if busy_flows.isdisjoint(json.loads(row["flow_ids"])):
+                            job = row
+                            break
+                if job is not None:
+                    now = time.time()
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, started_at = ?, heartbeat_at = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (RUNNING, worker, now, now, job["id"]),
+                    )
+                    job = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job["id"],)).fetchone()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._to_job(job) if job is not None else None
+
+    def release(self, job_ids: List[int]):
+        """Put running jobs back in the queue, e.g. when their worker shuts down, without counting the attempt"""
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET status = ?, worker = NULL, attempts = attempts - 1 "
+                f"WHERE status = ? AND id IN ({','.join('?' * len(job_ids))})",
+                (QUEUED, RUNNING, *job_ids),
+            )
+
+    def update_progress(self, job_id: int, completed: int, total: int, message: str = ""):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET completed = ?, total = ?, message = ?, heartbeat_at = ? WHERE id = ?",
+                (completed, total, message, time.time(), job_id),
+            )
+
+    def set_message(self, job_id: int, message: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET message = ?, heartbeat_at = ? WHERE id = ?", (message, time.time(), job_id)
+            )
+
+    def heartbeat(self, job_ids: List[int]):
+        """Record that the worker running these jobs is alive"""
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET heartbeat_at = ? WHERE id IN ({','.join('?' * len(job_ids))})",
+                (time.time(), *job_ids),
+            )
+
+    def cancel_requested(self, job_ids: List[int]) -> List[int]:
+        """The jobs among ``job_ids`` that should be stopped"""
+        if not job_ids:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM jobs WHERE cancel_requested = 1 AND id IN ({','.join('?' * len(job_ids))})",
+                job_ids,
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def finish(
+        self, job_id: int, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None
+    ) -> bool:
+        """
+        Record the outcome of a running job; returns False if it was no
+        longer running, e.g. because its process already recorded one
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error, time.time(), job_id, RUNNING),
+            )
+        return cursor.rowcount > 0
+
+    def requeue_stale(self, stale_after: float, max_attempts: int = 3) -> List[int]:
+        """
+        Requeue running jobs whose worker has not reported for ``stale_after``
+        seconds, e.g. because it was killed; jobs that already ran
+        ``max_attempts`` times fail instead. Returns the requeued jobs.
+        """
+        cutoff = time.time()
+        requeued = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, attempts, cancel_requested FROM jobs WHERE status = ? AND heartbeat_at < ?",
+                    (RUNNING, cutoff - stale_after),
+                ).fetchall()
+                for row in rows:
+                    if row["cancel_requested"]:
+                        self._conn.execute(
+                            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?", (CANCELLED, cutoff, row["id"])
+                        )
+                    elif row["attempts"] >= max_attempts:
+                        self._conn.execute(
+                            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                            (FAILED, f"The worker stopped responding {row['attempts']} times", cutoff, row["id"]),
+                        )
+                    else:
+                        self._conn.execute("UPDATE jobs SET status = ?, worker = NULL WHERE id = ?", (QUEUED, row["id"]))
+                        requeued.append(row["id"])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return requeued
+
+    def add_schedule(self, kind: str, flow_ids: List[str], cron: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """Submit a job with these arguments whenever the cron expression is due; returns the schedule ID"""
+        params = params or {}
+        self._validate(kind, flow_ids, params)
+        next_run = CronSchedule(cron).next_after(datetime.datetime.now())
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO schedules (kind, flow_ids, params, cron, next_run_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, json.dumps(list(flow_ids)), json.dumps(params), cron, next_run.timestamp(), time.time()),
+            )
+        return cursor.lastrowid
+
+    def list_schedules(self, flow_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM schedules"
+        params: List[Any] = []
+        if flow_id is not None:
+            query += " WHERE EXISTS (SELECT 1 FROM json_each(schedules.flow_ids) WHERE value = ?)"
+            params.append(flow_id)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        schedules = []
+        for row in rows:
+            schedule = dict(row)
+            schedule["flow_ids"] = json.loads(schedule["flow_ids"])
+            schedule["params"] = json.loads(schedule["params"])
+            schedule["enabled"] = bool(schedule["enabled"])
+            schedules.append(schedule)
+        return schedules
+
+    def set_schedule_enabled(self, schedule_id: int, enabled: bool) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE schedules SET enabled = ? WHERE id = ?", (int(enabled), schedule_id)
+            )
+        return cursor.rowcount > 0
+
+    def remove_schedule(self, schedule_id: int) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,))
+        return cursor.rowcount > 0
+
+    def enqueue_due(self, now: Optional[datetime.datetime] = None) -> List[int]:
+        """
+        Submit a job for every enabled schedule that is due, and return the job IDs
+
+        A schedule whose previous job is still queued or running is skipped
+        this time rather than piling up runs. Runs missed while no worker was
+        running are not made up; the schedule's next run is the first due
+        time after now.
+        """
+        now = now or datetime.datetime.now()
+        job_ids = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                due = self._conn.execute(
+                    "SELECT * FROM schedules WHERE enabled = 1 AND next_run_at <= ?", (now.timestamp(),)
+                ).fetchall()
+                for schedule in due:
+                    previous = None
+                    if schedule["last_job_id"] is not None:
+                        previous = self._conn.execute(
+                            "SELECT status FROM jobs WHERE id = ?", (schedule["last_job_id"],)
+                        ).fetchone()
+                    job_id = schedule["last_job_id"]
+                    if previous is None or previous["status"] not in ACTIVE_STATUSES:
+                        job_id = self._insert_job(
+                            schedule["kind"], json.loads(schedule["flow_ids"]), json.loads(schedule["params"]), schedule["id"]
+                        )
+                        job_ids.append(job_id)
+                    self._conn.execute(
+                        "UPDATE schedules SET next_run_at = ?, last_job_id = ? WHERE id = ?",
+                        (CronSchedule(schedule["cron"]).next_after(now).timestamp(), job_id, schedule["id"]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job_ids
+
+    def close(self):
+        self._conn.close()
+
+def job_params(args: argparse.Namespace) -> Dict[str, Any]:
+    """Job parameters from the submit and schedule command line options"""
+    params: Dict[str, Any] = {}
+    if args.metric_tier:
+        params["metric_tier"] = args.metric_tier
+    if args.dataset:
+        dataset = {"path": args.dataset, "seed": args.seed}
+        for key in ("sample_fraction", "sample_size", "stratify_by"):
+            if getattr(args, key) is not None:
+                dataset[key] = getattr(args, key)
+        if args.shard:
+            dataset["shard"] = args.shard
+        params["dataset"] = dataset
+        params["chunk_size"] = args.chunk_size
+    return params
+
+def format_job(job: Dict[str, Any]) -> str:
+    progress = f"{job['completed']}/{job['total']}" if job["total"] else "-"
+    line = f"{job['id']:>5}  {job['status']:<10} {job['kind']:<10} {progress:>11}  {','.join(job['flow_ids'])}"
+    if job["message"] and job["status"] == RUNNING:
+        line += f"  {job['message']}"
+    if job["error"]:
+        line += f"  {job['error']}"
+    if job["result"] and job["result"].get("run_ids"):
+        line += f"  runs {','.join(str(run_id) for run_id in job['result']['run_ids'])}"
+    return line
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="data/evaluation_jobs.db", help="Job queue file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("submit", "schedule"):
+        command = commands.add_parser(name)
+        command.add_argument("flow_ids", nargs="+", help="The flow to evaluate, or the flows to compare, baseline first")
+        command.add_argument("--kind", choices=JOB_KINDS, default=None, help="Defaults to dataset with --dataset, else flow")
+        command.add_argument("--metric-tier", choices=("ragas", "local", "all"), default=None)
+        command.add_argument("--dataset", help="Question file (.json, .jsonl or .parquet) for a dataset job")
+        command.add_argument("--sample-fraction", type=float)
+        command.add_argument("--sample-size", type=int)
+        command.add_argument("--stratify-by")
+        command.add_argument("--shard", help="INDEX/COUNT, e.g. 0/4")
+        command.add_argument("--seed", type=int, default=0)
+        command.add_argument("--chunk-size", type=int, default=500)
+        if name == "schedule":
+            command.add_argument("--cron", required=True, help='Five-field cron expression, e.g. "0 2 * * *", or @daily')
+    status = commands.add_parser("status")
+    status.add_argument("job_id", nargs="?", type=int)
+    status.add_argument("--flow-id")
+    status.add_argument("--limit", type=int, default=20)
+    cancel = commands.add_parser("cancel")
+    cancel.add_argument("job_id", type=int)
+    commands.add_parser("schedules")
+    unschedule = commands.add_parser("unschedule")
+    unschedule.add_argument("schedule_id", type=int)
+    args = parser.parse_args()
+
+    queue = JobQueue(args.db)
+    if args.command in ("submit", "schedule"):
+        kind = args.kind or ("dataset" if args.dataset else "flow")
+        if args.shard:
+            from .dataset import parse_shard
+            args.shard = list(parse_shard(args.shard))
+        params = job_params(args)
+        try:
+            if args.command == "submit":
+                print(f"Queued job {queue.submit(kind, args.flow_ids, params)}")
+            else:
+                schedule_id = queue.add_schedule(kind, args.flow_ids, args.cron, params)
+                next_run = CronSchedule(args.cron).next_after(datetime.datetime.now())
+                print(f"Added schedule {schedule_id}, next run at {next_run:%Y-%m-%d %H:%M}")
+        except ValueError as e:
+            sys.exit(str(e))
+    elif args.command == "status":
+        if args.job_id is not None:
+            job = queue.get(args.job_id)
+            if job is None:
+                sys.exit(f"No job {args.job_id}")
+            print(json.dumps(job, indent=2, default=str))
+        else:
+            for job in queue.list_jobs(args.flow_id, limit=args.limit):
+                print(format_job(job))
+    elif args.command == "cancel":
+        if not queue.cancel(args.job_id):
+            sys.exit(f"Job {args.job_id} is not queued or running")
+        print(f"Cancelling job {args.job_id}")
+    elif args.command == "schedules":
+        for schedule in queue.list_schedules():
+            next_run = datetime.datetime.fromtimestamp(schedule["next_run_at"])
+            state = "" if schedule["enabled"] else "  (disabled)"
+            print(
+                f"{schedule['id']:>5}  {schedule['cron']:<15} {schedule['kind']:<10} "
+                f"{','.join(schedule['flow_ids'])}  next {next_run:%Y-%m-%d %H:%M}{state}"
+            )
+    elif args.command == "unschedule":
+        if not queue.remove_schedule(args.schedule_id):
+            sys.exit(f"No schedule {args.schedule_id}")
+        print(f"Removed schedule {args.schedule_id}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# evaluation/local_metrics.py
+"""
+Evaluation metrics computed locally from the texts, without an LLM judge
+
+They are rough proxies for the RAGAS metrics, but score a whole question set
+in well under a second on a CPU, so they can run on every change:
+
+- ``rouge_1``, ``rouge_2``: unigram / bigram overlap F1 of answer and ground truth
+- ``bleu``: BLEU-4 of the answer against the ground truth, add-one smoothed
+- ``semantic_similarity``: cosine similarity of answer and ground truth
+- ``question_answer_similarity``: cosine similarity of question and answer
+- ``context_coverage``: share of the answer's content words found in the
+  retrieved context (a faithfulness proxy)
+- ``ground_truth_coverage``: share of the ground truth's content words found in
+  the retrieved context (a context recall proxy)
+
+Texts are tokenized once per batch and every token is hashed to a 32-bit
+key, from which n-gram keys are combined with numpy. Counts are kept as
+sorted ``row << 32 | hash`` arrays, so overlaps and dot products for all
+questions are computed with a few numpy set operations.
+Similarities use these hashed bag-of-words vectors unless an embedding
+model is configured (this requires ``sentence-transformers``).
+"""
+import re
+import zlib
+from functools import cached_property, lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+TOKEN_PATTERN = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can did do does for from had has have how i if in into is it its "
+    "me my no not of on or our she so than that the their them then there these they this to was we were "
+    "what when where which who why will with would you your".split()
+)
+
+class _Counts:
+    """Hashed n-gram counts of a batch of token lists"""
+
+    def __init__(self, keys: np.ndarray, counts: np.ndarray, rows: int):
+        self.keys = keys
+        self.counts = counts
+        self.totals = np.bincount(keys >> 32, weights=counts, minlength=rows)
+
+@lru_cache(maxsize=100_000)
+def _hash(term: str) -> int:
+    # crc32 rather than hash() so that scores do not change between processes
+    return zlib.crc32(term.encode("utf-8"))
+
+def _text(value: Any) -> str:
+    """Answers can be the flow's message object rather than plain text"""
+    if isinstance(value, dict):
+        value = value.get("message", value)
+        if isinstance(value, dict):
+            value = value.get("message") or value.get("text") or ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(_text(item) for item in value)
+    return "" if value is None else str(value)
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+def _count(ids: np.ndarray, rows: np.ndarray, size: int, n: int = 1, unique: bool = False) -> _Counts:
+    """
+    Count the n-grams of a batch given as flat token hashes and their row numbers
+
+    The hash of an n-gram is combined from the hashes of its tokens, so every
+    n-gram of the batch is hashed at once without building its text.
+    """
+    length = len(ids) - n + 1
+    if length > 0:
+        hashes = ids[:length].copy()
+        for k in range(1, n):
+            hashes = ((hashes * 1000003) ^ ids[k:length + k]) & 0xFFFFFFFF
+        # N-grams may not span two rows
+        same_row = rows[:length] == rows[n - 1:]
+        keys = (rows[:length][same_row] << 32) | hashes[same_row].astype(np.int64)
+    else:
+        keys = np.zeros(0, dtype=np.int64)
+    keys, counts = np.unique(keys, return_counts=True)
+    if unique:
+        counts = np.ones_like(counts)
+    return _Counts(keys, counts.astype(float), size)
+
+def _overlap(a: _Counts, b: _Counts, rows: int, weights: str = "min") -> np.ndarray:
+    """Per row, the clipped count overlap (``min``) or dot product (``dot``) of two count sets"""
+    common, ia, ib = np.intersect1d(a.keys, b.keys, assume_unique=True, return_indices=True)
+    values = np.minimum(a.counts[ia], b.counts[ib]) if weights == "min" else a.counts[ia] * b.counts[ib]
+    return np.bincount(common >> 32, weights=values, minlength=rows)
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+class TextBatch:
+    """Questions, answers, contexts and ground truths of a batch, tokenized on first use"""
+
+    def __init__(self, rows: pd.DataFrame, embedding_model: Optional[str] = None):
+        self.size = len(rows)
+        self.embedding_model = embedding_model
+        self.texts = {
+            "question": [_text(value) for value in rows["question"]],
+            "answer": [_text(value) for value in rows["answer"]],
+            "context": [_text(value) for value in rows["contexts"]] if "contexts" in rows else [""] * self.size,
+            "ground_truth": [_text(value) for value in rows["ground_truth"]],
+        }
+        self._flat_tokens: Dict[str, tuple] = {}
+        self._ngrams: Dict[tuple, _Counts] = {}
+        self._content_words: Dict[str, _Counts] = {}
+
+    @cached_property
+    def tokens(self) -> Dict[str, List[List[str]]]:
+        return {field: [tokenize(text) for text in texts] for field, texts in self.texts.items()}
+
+    def _flat(self, token_lists: List[List[str]]):
+        ids = np.fromiter((_hash(token) for tokens in token_lists for token in tokens), dtype=np.uint64)
+        rows = np.repeat(np.arange(self.size, dtype=np.int64), [len(tokens) for tokens in token_lists])
+        return ids, rows
+
+    def ngrams(self, field: str, n: int) -> _Counts:
+        if (field, n) not in self._ngrams:
+            if field not in self._flat_tokens:
+                self._flat_tokens[field] = self._flat(self.tokens[field])
+            self._ngrams[field, n] = _count(*self._flat_tokens[field], self.size, n)
+        return self._ngrams[field, n]
+
+    def content_words(self, field: str) -> _Counts:
+        if field not in self._content_words:
+            words = [[token for token in tokens if token not in STOPWORDS] for tokens in self.tokens[field]]
+            self._content_words[field] = _count(*self._flat(words), self.size, unique=True)
+        return self._content_words[field]
+
+    def similarity(self, field_a: str, field_b: str) -> np.ndarray:
+        if self.embedding_model:
+            return self._embedding_similarity(field_a, field_b)
+        # Hashed bag of unigrams and bigrams with log-scaled term frequencies
+        dot = np.zeros(self.size)
+        norm_a = np.zeros(self.size)
+        norm_b = np.zeros(self.size)
+        for n in (1, 2):
+            a, b = self.ngrams(field_a, n), self.ngrams(field_b, n)
+            a = _Counts(a.keys, 1 + np.log(a.counts), self.size)
+            b = _Counts(b.keys, 1 + np.log(b.counts), self.size)
+            dot += _overlap(a, b, self.size, weights="dot")
+            norm_a += np.bincount(a.keys >> 32, weights=a.counts ** 2, minlength=self.size)
+            norm_b += np.bincount(b.keys >> 32, weights=b.counts ** 2, minlength=self.size)
+        return _divide(dot, np.sqrt(norm_a * norm_b))
+
+    def _embedding_similarity(self, field_a: str, field_b: str) -> np.ndarray:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("Embedding similarity needs sentence-transformers: pip install sentence-transformers")
+        model = _load_embedding_model(self.embedding_model, SentenceTransformer)
+        a = model.encode(self.texts[field_a], batch_size=64, normalize_embeddings=True)
+        b = model.encode(self.texts[field_b], batch_size=64, normalize_embeddings=True)
+        return np.clip((a * b).sum(axis=1), 0.0, 1.0)
+
+@lru_cache(maxsize=2)
+def _load_embedding_model(name: str, model_class):
+    return model_class(name)
+
+def _rouge(batch: TextBatch, n: int) -> np.ndarray:
+    answer, ground_truth = batch.ngrams("answer", n), batch.ngrams("ground_truth", n)
+    overlap = _overlap(answer, ground_truth, batch.size)
+    precision = _divide(overlap, answer.totals)
+    recall = _divide(overlap, ground_truth.totals)
+    f1 = _divide(2 * precision * recall, precision + recall)
+    # No overlap at all is a score of 0, not undefined
+    return np.where((ground_truth.totals > 0) & np.isnan(f1), 0.0, f1)
+
+def _bleu(batch: TextBatch) -> np.ndarray:
+    log_precisions = np.zeros(batch.size)
+    for n in range(1, 5):
+        answer, ground_truth = batch.ngrams("answer", n), batch.ngrams("ground_truth", n)
+        overlap = _overlap(answer, ground_truth, batch.size)
+        # Add-one smoothing above unigrams keeps short answers from scoring 0
+        smoothing = 0 if n == 1 else 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_precisions += np.log((overlap + smoothing) / (answer.totals + smoothing))
+    answer_length = batch.ngrams("answer", 1).totals
+    reference_length = batch.ngrams("ground_truth", 1).totals
+    with np.errstate(divide="ignore", invalid="ignore"):
+        brevity = np.where(answer_length > reference_length, 1.0, np.exp(1 - reference_length / answer_length))
+        bleu = brevity * np.exp(log_precisions / 4)
+    return np.where(reference_length > 0, np.nan_to_num(bleu, nan=0.0), np.nan)
+
+def _coverage(batch: TextBatch, field: str) -> np.ndarray:
+    words, context = batch.content_words(field), batch.content_words("context")
+    return _divide(_overlap(words, context, batch.size), words.totals)
+
+class LocalMetric:
+    """A metric scored locally for a whole TextBatch at once; has a ``name`` like the RAGAS metrics"""
+
+    def __init__(self, name: str, score):
+        self.name = name
+        self._score = score
+
+    def score(self, batch: TextBatch) -> np.ndarray:
+        return self._score(batch)
+
+    def __repr__(self):
+        return f"LocalMetric({self.name!r})"
+
+rouge_1 = LocalMetric("rouge_1", lambda batch: _rouge(batch, 1))
+rouge_2 = LocalMetric("rouge_2", lambda batch: _rouge(batch, 2))
+bleu = LocalMetric("bleu", _bleu)
+semantic_similarity = LocalMetric("semantic_similarity", lambda batch: batch.similarity("answer", "ground_truth"))
+question_answer_similarity = LocalMetric("question_answer_similarity", lambda batch: batch.similarity("question", "answer"))
+context_coverage = LocalMetric("context_coverage", lambda batch: _coverage(batch, "answer"))
+ground_truth_coverage = LocalMetric("ground_truth_coverage", lambda batch: _coverage(batch, "ground_truth"))
+
+LOCAL_METRICS = [
+    rouge_1,
+    rouge_2,
+    bleu,
+    semantic_similarity,
+    question_answer_similarity,
+    context_coverage,
+    ground_truth_coverage,
+]
+
+def score_local_metrics(
+    rows: pd.DataFrame,
+    metrics: Optional[List[LocalMetric]] = None,
+    embedding_model: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Score evaluation rows (question, answer, contexts, ground_truth) with local metrics
+
+    Returns a DataFrame with a column per metric, in the order of ``rows``.
+    """
+    batch = TextBatch(rows, embedding_model=embedding_model)
+    metrics = LOCAL_METRICS if metrics is None else metrics
+    return pd.DataFrame({metric.name: metric.score(batch) for metric in metrics}, index=rows.index)
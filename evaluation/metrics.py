@@ -1,8 +1,7 @@
 # evaluation/metrics.py
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import datetime
 from typing import List, Dict, Any
 import sys
 import os
@@ -10,10 +9,124 @@ import os
 # Add the project root to sys.path to make imports work
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from evaluation.ragas_evaluator import RagasEvaluator
+from evaluation.jobs import ACTIVE_STATUSES, RUNNING, SUCCEEDED, CronSchedule, JobQueue
+from evaluation.ragas_evaluator import METRIC_TIERS, RagasEvaluator
 from chatbot.utils.api_client import APIClient
 
+LOWER_IS_BETTER = {"harmfulness"}
+TIER_LABELS = {"ragas": "RAGAS (LLM judge)", "local": "Local (fast, no LLM)", "all": "Both"}
+# Seconds between refreshes of the job panel
+JOB_POLL_INTERVAL = 2
+
+def metric_label(metric: str) -> str:
+    # Harmfulness is shown as its complement, safety
+    return "Safety" if metric == "harmfulness" else metric.replace("_", " ").title()
+
+def metric_value(metric: str, value: float) -> float:
+    return 1 - value if metric == "harmfulness" else value
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def load_history_series(_evaluator, flow_id: str, columns: tuple, version: float) -> pd.DataFrame:
+    """Precomputed run aggregates of a flow; ``version`` invalidates the cache when a run is added"""
+    return _evaluator.get_run_aggregates(flow_id, columns=list(columns))
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def load_question_scores(_evaluator, flow_id: str, run_id: int) -> pd.DataFrame:
+    return _evaluator.get_question_scores(flow_id, run_id)
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def display_jobs(job_queue: JobQueue, flow_id: str):
+    """
+    Progress of the flow's evaluation jobs, refreshed every few seconds
+    
+    Jobs run in the background worker (``python -m evaluation.worker``), so
+    the dashboard stays responsive and a refresh does not stop them. When a
+    job finishes the whole dashboard reruns to show its results.
+    """
+    jobs = job_queue.list_jobs(flow_id, limit=10)
+    active = [job for job in jobs if job["status"] in ACTIVE_STATUSES]
+    finished_ids = {job["id"] for job in jobs if job["status"] not in ACTIVE_STATUSES}
+    was_active = st.session_state.get("active_job_ids", set())
+    st.session_state.active_job_ids = {job["id"] for job in active}
+    if was_active & finished_ids:
+        st.rerun()
+    if not jobs:
+        return
+    
+    st.subheader("Evaluation Jobs")
+    for job in active:
+        label = f"Job {job['id']}: {job['kind']} of {', '.join(job['flow_ids'])}"
+        progress_column, cancel_column = st.columns([5, 1])
+        with progress_column:
+            if job["status"] == RUNNING and job["total"]:
+                st.progress(job["completed"] / job["total"], text=f"{label} ({job['message']}, {job['completed']} of {job['total']})")
+            else:
+                st.progress(0.0, text=f"{label} ({job['message'] or job['status']})")
+        with cancel_column:
+            if job["cancel_requested"]:
+                st.caption("Cancelling...")
+            elif st.button("Cancel", key=f"cancel_job_{job['id']}"):
+                job_queue.cancel(job["id"])
+    
+    recent = [job for job in jobs if job["status"] not in ACTIVE_STATUSES]
+    if recent:
+        with st.expander("Recent jobs"):
+            st.dataframe(pd.DataFrame([
+                {
+                    "job": job["id"],
+                    "kind": job["kind"],
+                    "status": job["status"],
+                    "finished": datetime.datetime.fromtimestamp(job["finished_at"]).strftime("%Y-%m-%d %H:%M") if job["finished_at"] else "",
+                    "scheduled": job["schedule_id"] is not None,
+                    "error": job["error"] or "",
+                }
+                for job in recent
+            ]), hide_index=True, use_container_width=True)
+
+def display_comparison(comparison: Dict[str, Any], flow_names: Dict[str, str]):
+    """Paired metric deltas of candidate flows against the baseline, with confidence intervals"""
+    import plotly.express as px
+    
+    baseline = comparison["baseline"]
+    st.header(f"Flow Comparison (baseline: {flow_names.get(baseline, baseline)})")
+    
+    comparison_df = pd.DataFrame(comparison["comparison"])
+    if comparison_df.empty:
+        st.info("The flows have no questions in common to compare.")
+        return
+    comparison_df["flow"] = comparison_df["flow_id"].map(lambda flow_id: flow_names.get(flow_id, flow_id))
+    # Lower harmfulness is better, so its improvements are negative deltas
+    sign = comparison_df["metric"].map(lambda metric: -1 if metric in LOWER_IS_BETTER else 1)
+    comparison_df["verdict"] = "no significant change"
+    comparison_df.loc[comparison_df["significant"] & (comparison_df["delta"] * sign > 0), "verdict"] = "better"
+    comparison_df.loc[comparison_df["significant"] & (comparison_df["delta"] * sign < 0), "verdict"] = "worse"
+    
+    fig = px.scatter(
+        comparison_df,
+        x="delta",
+        y="metric",
+        color="flow",
+        error_x=comparison_df["ci_high"] - comparison_df["delta"],
+        error_x_minus=comparison_df["delta"] - comparison_df["ci_low"],
+        title="Mean Per-Question Delta vs. Baseline (95% bootstrap CI)"
+    )
+    fig.add_vline(x=0, line_dash="dash", line_color="gray")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.dataframe(
+        comparison_df[[
+            "flow", "metric", "questions", "baseline_mean", "candidate_mean",
+            "delta", "ci_low", "ci_high", "verdict", "improved", "worse"
+        ]],
+        hide_index=True,
+        use_container_width=True
+    )
+
 def run_metrics_dashboard():
+    # Plotly takes a few hundred milliseconds to import; only the dashboard draws charts
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     st.set_page_config(page_title="RAG Evaluation Dashboard", layout="wide")
     
     st.title("RAG Evaluation Dashboard")
@@ -22,8 +135,13 @@ def run_metrics_dashboard():
     if "api_client" not in st.session_state:
         st.session_state.api_client = APIClient(api_url=st.secrets.get("API_URL", "http://localhost:8000"))
     
-    # Initialize evaluator
-    evaluator = RagasEvaluator()
+    # Initialize evaluator once per session; it holds the result store connections
+    if "evaluator" not in st.session_state:
+        st.session_state.evaluator = RagasEvaluator()
+    evaluator = st.session_state.evaluator
+    if "job_queue" not in st.session_state:
+        st.session_state.job_queue = JobQueue()
+    job_queue = st.session_state.job_queue
     
     # Sidebar for controls
     with st.sidebar:
@@ -45,12 +163,66 @@ def run_metrics_dashboard():
             
             selected_flow_id = selected_flow_name.split("(ID: ")[1].split(")")[0]
             
-            # Button to run evaluation
+            metric_tier = st.radio(
+                "Metrics:",
+                list(METRIC_TIERS),
+                format_func=TIER_LABELS.get,
+                help="Local metrics (lexical overlap, BLEU, similarity, context coverage) run in seconds without an LLM."
+            )
+            
+            # Evaluations run in the background worker; the job panel shows their progress
             if st.button("Run Evaluation"):
-                with st.spinner("Running evaluation..."):
-                    results = evaluator.evaluate_flow(selected_flow_id, st.session_state.api_client)
-                st.success("Evaluation complete!")
+                job_id = job_queue.submit("flow", [selected_flow_id], {"metric_tier": metric_tier})
+                st.success(f"Queued evaluation job {job_id}")
+            
+            with st.expander("Scheduled evaluations"):
+                for schedule in job_queue.list_schedules(selected_flow_id):
+                    next_run = datetime.datetime.fromtimestamp(schedule["next_run_at"])
+                    schedule_column, remove_column = st.columns([3, 1])
+                    schedule_column.caption(
+                        f"`{schedule['cron']}` ({schedule['kind']}, {schedule['params'].get('metric_tier') or 'default'} metrics), "
+                        f"next {next_run:%Y-%m-%d %H:%M}"
+                    )
+                    if remove_column.button("Remove", key=f"remove_schedule_{schedule['id']}"):
+                        job_queue.remove_schedule(schedule["id"])
+                        st.rerun()
+                cron = st.text_input("Cron expression", value="0 2 * * *", help="minute hour day month weekday, or @daily")
+                if st.button("Add schedule"):
+                    try:
+                        CronSchedule(cron)
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        job_queue.add_schedule("flow", [selected_flow_id], cron, {"metric_tier": metric_tier})
+                        st.rerun()
                 
+            # A/B comparison of several flows on the same questions
+            st.markdown("---")
+            compare_flow_names = st.multiselect(
+                "Compare flows (the first is the baseline):",
+                flow_names,
+                default=[selected_flow_name]
+            )
+            compare_flow_ids = [name.split("(ID: ")[1].split(")")[0] for name in compare_flow_names]
+            if len(compare_flow_ids) >= 2:
+                if st.button("Run Comparison"):
+                    st.session_state.comparison_job = job_queue.submit(
+                        "comparison", compare_flow_ids, {"metric_tier": metric_tier}
+                    )
+                    st.success(f"Queued comparison job {st.session_state.comparison_job}")
+                
+                if st.button("Compare Latest Runs"):
+                    latest_runs = [evaluator.get_historical_results(flow_id, limit=1) for flow_id in compare_flow_ids]
+                    if not all(latest_runs):
+                        st.warning("Every flow needs an evaluation run to compare.")
+                    else:
+                        st.session_state.comparison = {
+                            "baseline": compare_flow_ids[0],
+                            "comparison": evaluator.compare_results(
+                                latest_runs[0][0], [runs[0] for runs in latest_runs[1:]]
+                            ).to_dict(orient="records"),
+                        }
+            
             # Toggle for historical view
             show_historical = st.checkbox("Show Historical Data", value=True)
             
@@ -60,46 +232,55 @@ def run_metrics_dashboard():
             return
     
     # Main content area
-    # Get results for the selected flow
-    results = evaluator.get_historical_results(selected_flow_id if "selected_flow_id" in locals() else None)
+    display_jobs(job_queue, selected_flow_id)
     
-    if not results:
+    # A queued comparison is shown once its job has finished
+    if st.session_state.get("comparison_job"):
+        comparison_job = job_queue.get(st.session_state.comparison_job)
+        if comparison_job is None or comparison_job["status"] not in ACTIVE_STATUSES:
+            del st.session_state.comparison_job
+            if comparison_job is not None and comparison_job["status"] == SUCCEEDED:
+                st.session_state.comparison = comparison_job["result"]
+    
+    if st.session_state.get("comparison"):
+        display_comparison(st.session_state.comparison, dict(flow_options))
+    
+    # Get the latest result for the selected flow
+    flow_filter = selected_flow_id if "selected_flow_id" in locals() else None
+    latest_results = evaluator.get_historical_results(flow_filter, limit=1)
+    
+    if not latest_results:
         st.info("No evaluation results found. Run an evaluation using the sidebar controls.")
         return
     
     # Display the latest result
-    latest_result = results[0]
+    latest_result = latest_results[0]
+    total_results = evaluator.count_historical_results(flow_filter)
     
     st.header(f"Latest Evaluation: {latest_result.get('timestamp', 'Unknown date')}")
     
-    # Create metrics display
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    with col1:
-        st.metric("Faithfulness", f"{latest_result['metrics']['faithfulness']:.2f}")
-    
-    with col2:
-        st.metric("Answer Relevancy", f"{latest_result['metrics']['answer_relevancy']:.2f}")
-    
-    with col3:
-        st.metric("Context Relevancy", f"{latest_result['metrics']['context_relevancy']:.2f}")
-    
-    with col4:
-        st.metric("Context Recall", f"{latest_result['metrics']['context_recall']:.2f}")
-    
-    with col5:
-        st.metric("Safety Score", f"{1 - latest_result['metrics']['harmfulness']:.2f}")
+    # Create metrics display, five per row
+    # Context metrics are not scored when the flow retrieved no documents
+    latest_metrics = {metric: value for metric, value in latest_result["metrics"].items() if not pd.isna(value)}
+    metric_names = list(latest_metrics)
+    unscored = [metric_label(metric) for metric in latest_result["metrics"] if metric not in latest_metrics]
+    if unscored:
+        st.caption(f"Not scored, as the flow returned no retrieved documents: {', '.join(unscored)}")
+    score_cache = latest_result.get("score_cache") or {}
+    if score_cache.get("hit_rate") is not None:
+        st.caption(
+            f"Judge scores reused from the score cache: {score_cache['hits']} of "
+            f"{score_cache['hits'] + score_cache['misses']} ({score_cache['hit_rate']:.0%})"
+        )
+    for row_start in range(0, len(metric_names), 5):
+        for column, metric in zip(st.columns(5), metric_names[row_start:row_start + 5]):
+            with column:
+                st.metric(metric_label(metric), f"{metric_value(metric, latest_metrics[metric]):.2f}")
     
     # Display radar chart of metrics
     metrics_df = pd.DataFrame({
-        "Metric": ["Faithfulness", "Answer Relevancy", "Context Relevancy", "Context Recall", "Safety"],
-        "Value": [
-            latest_result['metrics']['faithfulness'],
-            latest_result['metrics']['answer_relevancy'],
-            latest_result['metrics']['context_relevancy'],
-            latest_result['metrics']['context_recall'],
-            1 - latest_result['metrics']['harmfulness']
-        ]
+        "Metric": [metric_label(metric) for metric in metric_names],
+        "Value": [metric_value(metric, latest_metrics[metric]) for metric in metric_names]
     })
     
     fig = px.line_polar(
@@ -115,32 +296,55 @@ def run_metrics_dashboard():
     st.plotly_chart(fig, use_container_width=True)
     
     # Historical data (if available and selected)
-    if show_historical and len(results) > 1:
+    if show_historical and total_results > 1:
         st.header("Historical Performance")
         
-        # Prepare historical data
-        historical_data = []
-        for result in results:
-            historical_data.append({
-                "timestamp": result.get("timestamp", "Unknown"),
-                "faithfulness": result['metrics']['faithfulness'],
-                "answer_relevancy": result['metrics']['answer_relevancy'],
-                "context_relevancy": result['metrics']['context_relevancy'],
-                "context_recall": result['metrics']['context_recall'],
-                "safety": 1 - result['metrics']['harmfulness']
-            })
-        
-        hist_df = pd.DataFrame(historical_data)
+        # One row per run with precomputed statistics; only the columns plotted are read
+        band_metric = st.selectbox(
+            "Show the spread of",
+            metric_names,
+            format_func=lambda metric: metric.replace("_", " ").title()
+        )
+        columns = tuple(f"{metric}_mean" for metric in metric_names) + tuple(
+            f"{band_metric}_{statistic}" for statistic in ("median", "p10", "p90")
+        )
+        hist_df = load_history_series(evaluator, flow_filter, columns, evaluator.aggregates.version(flow_filter))
         
         # Line chart for historical metrics
         fig = go.Figure()
         
-        for metric in ["faithfulness", "answer_relevancy", "context_relevancy", "context_recall", "safety"]:
+        # p10-p90 band of per-question scores for the selected metric
+        fig.add_trace(go.Scatter(
+            x=hist_df["timestamp"],
+            y=hist_df[f"{band_metric}_p90"],
+            mode="lines",
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo="skip"
+        ))
+        fig.add_trace(go.Scatter(
+            x=hist_df["timestamp"],
+            y=hist_df[f"{band_metric}_p10"],
+            mode="lines",
+            line=dict(width=0),
+            fill="tonexty",
+            fillcolor="rgba(99, 110, 250, 0.15)",
+            name=f"{band_metric.replace('_', ' ').title()} p10-p90"
+        ))
+        fig.add_trace(go.Scatter(
+            x=hist_df["timestamp"],
+            y=hist_df[f"{band_metric}_median"],
+            mode="lines",
+            line=dict(dash="dot"),
+            name=f"{band_metric.replace('_', ' ').title()} Median"
+        ))
+        
+        for metric in metric_names:
             fig.add_trace(go.Scatter(
                 x=hist_df["timestamp"],
-                y=hist_df[metric],
+                y=metric_value(metric, hist_df[f"{metric}_mean"]),
                 mode='lines+markers',
-                name=metric.replace("_", " ").title()
+                name=metric_label(metric)
             ))
         
         fig.update_layout(
@@ -152,10 +356,27 @@ def run_metrics_dashboard():
         )
         
         st.plotly_chart(fig, use_container_width=True)
+        
+        # Per-question score distributions of the latest run
+        question_scores = load_question_scores(evaluator, latest_result["flow_id"], latest_result["id"])
+        metric_columns = [metric for metric in metric_names if metric in question_scores]
+        if metric_columns:
+            fig = px.box(
+                question_scores[metric_columns].melt(var_name="Metric", value_name="Score"),
+                x="Metric",
+                y="Score",
+                points="outliers",
+                title="Per-Question Scores of the Latest Evaluation"
+            )
+            fig.update_layout(yaxis=dict(range=[0, 1]))
+            st.plotly_chart(fig, use_container_width=True)
     
     # Display evaluation details
     with st.expander("View Raw Evaluation Data"):
         st.json(latest_result)
+        # Per-question details can be large, so they are only loaded on request
+        if st.checkbox("Load detailed results"):
+            st.json(evaluator.get_result_details(latest_result["id"], latest_result["flow_id"]))
 
 if __name__ == "__main__":
     run_metrics_dashboard()
\ No newline at end of file
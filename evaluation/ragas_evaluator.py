@@ -1,127 +1,642 @@
 # evaluation/ragas_evaluator.py
 import json
+import importlib
+import importlib.metadata
 import pandas as pd
 import datetime
+import logging
 import os
-from typing import Dict, List, Any
-from ragas.metrics import (
-    faithfulness,
-    answer_relevancy,
-    context_relevancy,
-    context_recall
-)
-from ragas.metrics.critique import harmfulness
-from ragas import evaluate
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional
 from .data_generator import EvaluationDataGenerator
+from .dataset import EvaluationDataset
+from .collector import ResponseCollector
+from .checkpoint import CheckpointStore, NullCheckpointStore, question_hash
+from .score_cache import ScoreCache, score_key
+from .results_store import ResultsStore
+from .aggregates import AggregateStore, compute_aggregates
+from .comparison import compare_scores
+from .local_metrics import LOCAL_METRICS, LocalMetric, TextBatch
+
+logger = logging.getLogger(__name__)
+
+class RagasMetric:
+    """
+    A RAGAS metric, imported when it is first scored
+    
+    Importing ragas loads its LLM stack, which the dashboard and local-only
+    runs never need.
+    """
+    
+    def __init__(self, name: str, module: str = "ragas.metrics"):
+        self.name = name
+        self.module = module
+    
+    def load(self):
+        return getattr(importlib.import_module(self.module), self.name)
+    
+    @property
+    def version(self) -> str:
+        """The installed ragas release, as a new release may judge differently"""
+        try:
+            return importlib.metadata.version("ragas")
+        except importlib.metadata.PackageNotFoundError:
+            return "unknown"
+    
+    def __repr__(self):
+        return f"RagasMetric({self.name!r})"
+
+METRICS = [
+    RagasMetric("faithfulness"),
+    RagasMetric("answer_relevancy"),
+    RagasMetric("context_relevancy"),
+    RagasMetric("context_recall"),
+    RagasMetric("harmfulness", "ragas.metrics.critique")
+]
+
+# Metrics that judge the retrieved context; questions whose flow retrieved
+# nothing are left unscored (NaN) for these
+CONTEXT_METRICS = frozenset({
+    "faithfulness",
+    "context_relevancy",
+    "context_recall",
+    "context_coverage",
+    "ground_truth_coverage",
+})
+
+# Metric sets an evaluation run can use: the RAGAS metrics, which call an LLM
+# judge, the local metrics, which are computed on the CPU in seconds, or both
+METRIC_TIERS = {
+    "ragas": METRICS,
+    "local": LOCAL_METRICS,
+    "all": METRICS + LOCAL_METRICS,
+}
 
 class RagasEvaluator:
-    def __init__(self, results_dir: str = "data/evaluation_results"):
+    def __init__(
+        self,
+        results_dir: str = "data/evaluation_results",
+        max_concurrency: int = 8,
+        rate_limit: float = 0.0,
+        max_retries: int = 3,
+        checkpoint_path: str = "data/evaluation_checkpoints.db",
+        score_batch_size: int = 50,
+        results_db_path: str = "data/evaluation_results.db",
+        export_json: bool = False,
+        use_batch: bool = True,
+        aggregates_dir: str = "data/evaluation_aggregates",
+        metric_tier: str = "ragas",
+        embedding_model: Optional[str] = None,
+        score_cache_path: Optional[str] = "data/evaluation_score_cache.db",
+        score_cache_size: int = 500_000,
+        judge_config: Optional[Dict[str, Any]] = None,
+        max_flow_concurrency: int = 4,
+    ):
         self.results_dir = results_dir
+        self.export_json = export_json
+        # The batch endpoint paces requests on the server, so a client-side
+        # rate limit means sending questions one by one instead
+        self.use_batch = use_batch and not rate_limit
         os.makedirs(self.results_dir, exist_ok=True)
+        self.results_store = ResultsStore(results_db_path)
+        # One-time migration of result files written before the store existed
+        if self.results_store.count_results() == 0:
+            self.results_store.import_json_dir(self.results_dir)
+        self.aggregates = AggregateStore(aggregates_dir)
+        # Runs stored before aggregates were kept get them computed once
+        if self.aggregates.is_empty():
+            self.aggregates.backfill(self.results_store)
+        self.collector = ResponseCollector(
+            max_concurrency=max_concurrency,
+            rate_limit=rate_limit,
+            max_retries=max_retries,
+        )
+        self.checkpoints = CheckpointStore(checkpoint_path)
+        # RAGAS scores by content, reused across flows and flow versions; None disables it
+        self.score_cache = ScoreCache(score_cache_path, score_cache_size) if score_cache_path else None
+        # Identifies the judge LLM and its settings in score cache keys, e.g.
+        # {"model": "gpt-4o", "temperature": 0}; change it with the judge
+        self.judge_config = judge_config or {}
+        self.score_batch_size = score_batch_size
+        # Flows evaluate_flows runs at once; each has up to max_concurrency questions in flight
+        self.max_flow_concurrency = max(1, max_flow_concurrency)
+        if metric_tier not in METRIC_TIERS:
+            raise ValueError(f"Unknown metric tier: {metric_tier}")
+        self.metric_tier = metric_tier
+        # Local sentence-transformers model for the local similarity metrics;
+        # hashed bag-of-words vectors are used without one
+        self.embedding_model = embedding_model
+    
+    @staticmethod
+    def get_flow_versions(flow_ids: List[str], api_client) -> Dict[str, Optional[str]]:
+        """
+        Use each flow's last update time as its version so edits invalidate checkpoints
+        
+        A flow without an update time gets None, and its runs reuse no
+        checkpoints or cached scores. Raises if the flow list cannot be
+        fetched or does not contain one of the flows.
+        """
+        try:
+            flows = {flow.get("id"): flow for flow in api_client.get_flows().get("flows", [])}
+        except Exception as e:
+            raise RuntimeError(f"Could not fetch the flow list to version the checkpoints: {e}") from e
+        missing = [flow_id for flow_id in flow_ids if flow_id not in flows]
+        if missing:
+            raise ValueError(f"Flows not listed by the API: {', '.join(missing)}")
+        return {
+            flow_id: str(flows[flow_id]["updated_at"]) if flows[flow_id].get("updated_at") else None
+            for flow_id in flow_ids
+        }
+    
+    @classmethod
+    def get_flow_version(cls, flow_id: str, api_client) -> Optional[str]:
+        """The version of one flow; see get_flow_versions"""
+        return cls.get_flow_versions([flow_id], api_client)[flow_id]
+    
+    @staticmethod
+    def _extract_contexts(response_data: Dict[str, Any]) -> List[str]:
+        """Retrieved contexts of an answer, one per document, or an empty list if there were none"""
+        metadata = response_data.get("metadata", {})
+        # The API extracts the retrieved documents from the LangFlow output
+        # when asked to; checkpointed answers from before that carry a
+        # context or sources field, if anything
+        if metadata.get("documents"):
+            return [document["text"] for document in metadata["documents"] if document["text"]]
+        source = metadata if "context" in metadata or "sources" in metadata else metadata.get("raw_output", {})
+        context = ""
+        if "context" in source:
+            context = source["context"]
+        elif "sources" in source:
+            context = " ".join(source["sources"])
+        return [context] if context else []
+    
+    def _evaluate_items(
+        self,
+        flow_id: str,
+        flow_version: Optional[str],
+        api_client,
+        items: List[Dict[str, Any]],
+        metrics: List[Any],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ):
+        """
+        Answer and score a list of questions, reusing checkpointed answers and scores
+        
+        Returns the per-question DataFrame (in the order of ``items``), how
+        many answers and scores came from checkpoints, and the hits and misses
+        of the score cache. Without a flow version nothing is reused or stored.
+        """
+        if flow_version is None:
+            logger.warning("Flow %s has no version; evaluating without checkpoints or cached scores", flow_id)
+            checkpoints, score_cache = NullCheckpointStore(), None
+        else:
+            checkpoints, score_cache = self.checkpoints, self.score_cache
+        hashes = [item.get("question_hash") or question_hash(item["question"], item["ground_truth"]) for item in items]
+        unique_hashes = list(dict.fromkeys(hashes))
+        items_by_hash = dict(zip(hashes, items))
+        
+        # Only ask the flow questions that have no checkpointed answer
+        answers = checkpoints.get_answers(flow_id, flow_version, unique_hashes)
+        answers_reused = len(answers)
+        pending = [h for h in unique_hashes if h not in answers]
+        
+        def save_answer(collected_response):
+            if collected_response.error is None:
+                qhash = pending[collected_response.index]
+                answers[qhash] = collected_response.response_data
+                checkpoints.save_answer(flow_id, flow_version, qhash, collected_response.response_data)
+        
+        def report_progress(completed, total):
+            if progress_callback is not None:
+                progress_callback(answers_reused + completed, len(unique_hashes))
+        
+        # Send the questions to the flow concurrently; results keep the question order.
+        # The API response cache is bypassed so the flow itself is measured, and
+        # each question is asked on its own, without a session or chat memory.
+        questions = [items_by_hash[h]["question"] for h in pending]
+        send = lambda question: api_client.send_query(
+            query=question,
+            flow_id=flow_id,
+            use_cache=False,
+            projection="sources",
+            include_documents=True,
+            use_session=False,
+        )
+        if self.use_batch:
+            collected = self.collector.collect_batch(
+                questions,
+                lambda batch: api_client.send_batch(
+                    batch,
+                    flow_id=flow_id,
+                    use_cache=False,
+                    projection="sources",
+                    include_documents=True,
+                    max_concurrency=self.collector.max_concurrency,
+                    use_session=False,
+                ),
+                send,
+                progress_callback=report_progress,
+                result_callback=save_answer,
+            )
+        else:
+            collected = self.collector.collect(
+                questions,
+                send,
+                progress_callback=report_progress,
+                result_callback=save_answer,
+            )
+        failed = [c for c in collected if c.error is not None]
+        if failed:
+            message = f"{len(failed)} of {len(collected)} questions failed, first error: {failed[0].error}."
+            if flow_version is not None:
+                message += " Answered questions were checkpointed; run the evaluation again to resume."
+            raise RuntimeError(message)
+        
+        rows_by_hash = {}
+        for qhash in unique_hashes:
+            item = items_by_hash[qhash]
+            response_data = answers[qhash]
+            rows_by_hash[qhash] = {
+                "question": item["question"],
+                # Answers checkpointed before the API returned the message text have only the answer object
+                "answer": response_data["text"] if "text" in response_data else response_data["response"],
+                "contexts": self._extract_contexts(response_data),
+                "ground_truth": item["ground_truth"]
+            }
+        
+        # Score each metric only for questions without a checkpointed score,
+        # saving scores batch by batch so a failure loses at most one batch
+        scores = {}
+        scores_reused = 0
+        cache_stats = {"hits": 0, "misses": 0}
+        local_batch = None
+        for metric in metrics:
+            metric_scores = checkpoints.get_scores(flow_id, flow_version, unique_hashes, metric.name)
+            scores_reused += len(metric_scores)
+            missing = [h for h in unique_hashes if h not in metric_scores]
+            if metric.name in CONTEXT_METRICS:
+                # Without retrieved context these metrics are meaningless, so
+                # those questions are not scored rather than judged
+                no_context = {h: None for h in missing if not rows_by_hash[h]["contexts"]}
+                if no_context:
+                    checkpoints.save_scores(flow_id, flow_version, metric.name, no_context)
+                    metric_scores.update(no_context)
+                    missing = [h for h in missing if h not in no_context]
+            if isinstance(metric, LocalMetric):
+                # Local metrics score all questions in one vectorized pass,
+                # over texts tokenized once for every local metric
+                if missing:
+                    if local_batch is None:
+                        local_batch = TextBatch(
+                            pd.DataFrame([rows_by_hash[h] for h in unique_hashes]),
+                            embedding_model=self.embedding_model
+                        )
+                    all_scores = dict(zip(unique_hashes, metric.score(local_batch).tolist()))
+                    batch_scores = {h: all_scores[h] for h in missing}
+                    checkpoints.save_scores(flow_id, flow_version, metric.name, batch_scores)
+                    metric_scores.update(batch_scores)
+                scores[metric.name] = metric_scores
+                continue
+            # The judge is only asked about inputs it has not scored before,
+            # whichever flow or flow version they came from
+            keys = {}
+            if missing and score_cache is not None:
+                version = metric.version
+                keys = {h: score_key(metric.name, version, self.judge_config, **rows_by_hash[h]) for h in missing}
+                cached = score_cache.get_many(list(dict.fromkeys(keys.values())))
+                cache_scores = {h: cached[keys[h]] for h in missing if keys[h] in cached}
+                cache_stats["hits"] += len(cache_scores)
+                cache_stats["misses"] += len(missing) - len(cache_scores)
+                if cache_scores:
+                    checkpoints.save_scores(flow_id, flow_version, metric.name, cache_scores)
+                    metric_scores.update(cache_scores)
+                    missing = [h for h in missing if h not in cache_scores]
+            if missing:
+                from ragas import evaluate
+                ragas_metric = metric.load()
+            for start in range(0, len(missing), self.score_batch_size):
+                batch = missing[start:start + self.score_batch_size]
+                result = evaluate(
+                    pd.DataFrame([rows_by_hash[h] for h in batch]),
+                    metrics=[ragas_metric]
+                )
+                batch_scores = dict(zip(batch, result.to_pandas()[ragas_metric.name].tolist()))
+                # Failed judgements (NaN) count as missing in this run and are
+                # retried next time, so they are neither checkpointed nor cached;
+                # a stored NULL would read back as already scored
+                judged = {h: score for h, score in batch_scores.items() if pd.notna(score)}
+                checkpoints.save_scores(flow_id, flow_version, metric.name, judged)
+                if keys:
+                    score_cache.put_many(metric.name, {keys[h]: score for h, score in judged.items()})
+                metric_scores.update(batch_scores)
+            scores[metric.name] = metric_scores
+        
+        # Create evaluation dataframe
+        eval_df = pd.DataFrame([rows_by_hash[h] for h in hashes])
+        eval_df.insert(0, "question_hash", hashes)
+        for metric in metrics:
+            eval_df[metric.name] = [scores[metric.name][h] for h in hashes]
+        eval_df = eval_df.astype({metric.name: float for metric in metrics})
+        return eval_df, answers_reused, scores_reused, cache_stats
     
-    def evaluate_flow(self, flow_id: str, api_client):
+    @staticmethod
+    def _cache_summary(cache_stats: Dict[str, int]) -> Dict[str, Any]:
+        """Score cache hits and misses of a run, with the share of lookups that hit"""
+        lookups = cache_stats["hits"] + cache_stats["misses"]
+        return {**cache_stats, "hit_rate": cache_stats["hits"] / lookups if lookups else None}
+    
+    def _store_result(self, result_dict: Dict[str, Any], question_scores: Optional[pd.DataFrame] = None, scores_file: Optional[str] = None) -> Dict[str, Any]:
+        result_file = f"evaluation_{result_dict['flow_id']}_{result_dict['timestamp']}.json"
+        if self.export_json:
+            with open(os.path.join(self.results_dir, result_file), "w") as f:
+                json.dump(result_dict, f, indent=2)
+        result_dict["id"] = self.results_store.add_result(
+            result_dict, source_file=result_file if self.export_json else None
+        )
+        self.aggregates.add_run(result_dict["id"], result_dict, question_scores, scores_file=scores_file)
+        return result_dict
+    
+    def evaluate_flow(
+        self,
+        flow_id: str,
+        api_client,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        flow_version: Optional[str] = None,
+        eval_data: Optional[List[Dict[str, Any]]] = None,
+        metric_tier: Optional[str] = None,
+    ):
         """
-        Evaluate a specific LangFlow flow using RAGAS metrics
+        Evaluate a specific LangFlow flow using RAGAS metrics, local metrics or both
+        
+        Answers and per-metric scores are checkpointed per question, so a failed
+        run resumes where it stopped and only questions that are new (or whose
+        flow changed) are sent to the flow and scored. RAGAS scores are also
+        cached by their inputs, so answers and contexts the judge has seen
+        before, from any flow or flow version, are not judged again.
         
         Args:
             flow_id: The ID of the flow to evaluate
             api_client: API client instance to communicate with the flow
+            progress_callback: Called as (answered, total) while questions are sent to the flow
+            flow_version: Version of the flow the checkpoints belong to; defaults to its updated_at,
+                see get_flow_versions
+            eval_data: Questions and ground truths to use; defaults to the evaluation data file
+            metric_tier: "ragas", "local" or "all"; defaults to the evaluator's metric_tier
         """
+        metric_tier = metric_tier or self.metric_tier
+        metrics = METRIC_TIERS[metric_tier]
+        metric_names = [metric.name for metric in metrics]
+        
         # Generate evaluation data
-        data_generator = EvaluationDataGenerator()
-        eval_data = data_generator.generate_evaluation_data()
-        
-        # Process each question and collect responses
-        questions = []
-        contexts = []
-        responses = []
-        ground_truths = []
-        
-        for item in eval_data:
-            question = item["question"]
-            ground_truth = item["ground_truth"]
-            
-            # Get response from the flow
-            response_data = api_client.send_query(
-                query=question,
-                flow_id=flow_id
-            )
-            
-            response = response_data["response"]
-            
-            # Extract context if available in metadata
-            context = ""
-            if "metadata" in response_data and "raw_output" in response_data["metadata"]:
-                raw_output = response_data["metadata"]["raw_output"]
-                if "context" in raw_output:
-                    context = raw_output["context"]
-                elif "sources" in raw_output:
-                    context = " ".join(raw_output["sources"])
-            
-            questions.append(question)
-            responses.append(response)
-            contexts.append(context)
-            ground_truths.append(ground_truth)
+        if eval_data is None:
+            data_generator = EvaluationDataGenerator()
+            eval_data = data_generator.generate_evaluation_data()
         
-        # Create evaluation dataframe
-        eval_df = pd.DataFrame({
-            "question": questions,
-            "answer": responses,
-            "contexts": [[ctx] for ctx in contexts],
-            "ground_truth": ground_truths
-        })
-        
-        # Run RAGAS evaluation
-        result = evaluate(
-            eval_df,
-            metrics=[
-                faithfulness,
-                answer_relevancy,
-                context_relevancy,
-                context_recall,
-                harmfulness
-            ]
+        if flow_version is None:
+            flow_version = self.get_flow_version(flow_id, api_client)
+        eval_df, answers_reused, scores_reused, cache_stats = self._evaluate_items(
+            flow_id, flow_version, api_client, eval_data, metrics, progress_callback
         )
         
-        # Save results
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        result_file = f"{self.results_dir}/evaluation_{flow_id}_{timestamp}.json"
-        
         # Convert result to a serializable format
         result_dict = {
             "flow_id": flow_id,
-            "timestamp": timestamp,
-            "metrics": {
-                "faithfulness": result["faithfulness"].mean(),
-                "answer_relevancy": result["answer_relevancy"].mean(),
-                "context_relevancy": result["context_relevancy"].mean(),
-                "context_recall": result["context_recall"].mean(),
-                "harmfulness": result["harmfulness"].mean()
+            "flow_version": flow_version,
+            "timestamp": datetime.datetime.now().strftime("%Y%m%d_%H%M%S"),
+            "metrics": {name: eval_df[name].mean() for name in metric_names},
+            "metric_tier": metric_tier,
+            "aggregates": compute_aggregates(eval_df[metric_names]),
+            "detailed_results": eval_df.to_dict(),
+            "sample_size": len(eval_data),
+            "checkpoints": {
+                "answers_reused": answers_reused,
+                "scores_reused": scores_reused
+            },
+            "score_cache": self._cache_summary(cache_stats)
+        }
+        
+        return self._store_result(result_dict, eval_df[["question_hash", "question", *metric_names]])
+    
+    def evaluate_dataset(
+        self,
+        flow_id: str,
+        api_client,
+        dataset: EvaluationDataset,
+        chunk_size: int = 500,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+        flow_version: Optional[str] = None,
+        metric_tier: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a flow on a question set too large to hold in memory
+        
+        The dataset is streamed and evaluated ``chunk_size`` questions at a
+        time, with the same checkpoints as evaluate_flow. After each chunk its
+        per-question scores are appended to a Parquet file and its texts and
+        answers are dropped; the run's statistics are computed from the score
+        columns of that file at the end. Per-question results are kept only in
+        that file, not in the results database (see get_result_details).
+        
+        Args:
+            flow_id: The ID of the flow to evaluate
+            api_client: API client instance to communicate with the flow
+            dataset: The (sampled, sharded) questions to evaluate
+            chunk_size: Questions answered and scored at a time
+            progress_callback: Called as (answered, total) after each chunk; total needs an extra pass over the dataset
+            flow_version: Version of the flow the checkpoints belong to; defaults to its updated_at,
+                see get_flow_versions
+            metric_tier: "ragas", "local" or "all"; defaults to the evaluator's metric_tier
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        metric_tier = metric_tier or self.metric_tier
+        metrics = METRIC_TIERS[metric_tier]
+        metric_names = [metric.name for metric in metrics]
+        if flow_version is None:
+            flow_version = self.get_flow_version(flow_id, api_client)
+        total = dataset.count() if progress_callback is not None else None
+        
+        scores_file = self.aggregates.staging_path(flow_id)
+        writer = None
+        answered = answers_reused = scores_reused = 0
+        cache_stats = {"hits": 0, "misses": 0}
+        try:
+            for chunk in dataset.chunks(chunk_size):
+                eval_df, chunk_answers_reused, chunk_scores_reused, chunk_cache_stats = self._evaluate_items(
+                    flow_id, flow_version, api_client, chunk, metrics
+                )
+                table = pa.Table.from_pandas(eval_df[["question_hash", "question", *metric_names]], preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(scores_file, table.schema)
+                writer.write_table(table)
+                answered += len(chunk)
+                answers_reused += chunk_answers_reused
+                scores_reused += chunk_scores_reused
+                for key, count in chunk_cache_stats.items():
+                    cache_stats[key] += count
+                if progress_callback is not None:
+                    progress_callback(answered, total)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            raise ValueError(f"No questions to evaluate in {dataset.path}")
+        
+        scores = pd.read_parquet(scores_file, columns=metric_names)
+        result_dict = {
+            "flow_id": flow_id,
+            "flow_version": flow_version,
+            "timestamp": datetime.datetime.now().strftime("%Y%m%d_%H%M%S"),
+            "metrics": {name: scores[name].mean() for name in metric_names},
+            "metric_tier": metric_tier,
+            "aggregates": compute_aggregates(scores),
+            "detailed_results": {},
+            "sample_size": answered,
+            "dataset": {
+                "path": dataset.path,
+                "sample_fraction": dataset.sample_fraction,
+                "sample_size": dataset.sample_size,
+                "stratify_by": dataset.stratify_by,
+                "shard": f"{dataset.shard[0]}/{dataset.shard[1]}" if dataset.shard else None,
+                "seed": dataset.seed,
             },
-            "detailed_results": result.to_dict(),
-            "sample_size": len(eval_data)
+            "checkpoints": {
+                "answers_reused": answers_reused,
+                "scores_reused": scores_reused
+            },
+            "score_cache": self._cache_summary(cache_stats)
         }
+        del scores
+        return self._store_result(result_dict, scores_file=scores_file)
+    
+    def evaluate_flows(
+        self,
+        flow_ids: List[str],
+        api_client,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        n_resamples: int = 2000,
+        confidence: float = 0.95,
+        max_workers: Optional[int] = None,
+        metric_tier: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Evaluate several flows on the same questions and compare them to the first
         
-        with open(result_file, "w") as f:
-            json.dump(result_dict, f, indent=2)
+        The question set is loaded once and up to ``max_flow_concurrency``
+        flows are evaluated concurrently, each with its own checkpoints, so answers and scores
+        already stored for a flow version are reused. Every candidate is then
+        compared with the baseline (the first flow) question by question; see
+        compare_results.
         
-        return result_dict
+        Args:
+            flow_ids: The flows to evaluate, baseline first
+            api_client: API client instance to communicate with the flows
+            progress_callback: Called as (flow_id, answered, total) while questions are sent to a flow
+            n_resamples: Bootstrap resamples per confidence interval
+            confidence: Confidence level of the intervals
+            max_workers: Processes for the bootstraps; None uses one per core (at most 8), 1 runs them in this process
+            metric_tier: "ragas", "local" or "all"; defaults to the evaluator's metric_tier
+        
+        Returns:
+            The result dict of each flow under "results" and the comparison rows under "comparison"
+        """
+        flow_ids = list(dict.fromkeys(flow_ids))
+        if not flow_ids:
+            raise ValueError("No flows to evaluate")
+        eval_data = EvaluationDataGenerator().generate_evaluation_data()
+        versions = self.get_flow_versions(flow_ids, api_client)
+        
+        def run(flow_id):
+            return self.evaluate_flow(
+                flow_id,
+                api_client,
+                progress_callback=(lambda done, total: progress_callback(flow_id, done, total)) if progress_callback else None,
+                flow_version=versions[flow_id],
+                eval_data=eval_data,
+                metric_tier=metric_tier,
+            )
+        
+        # Flows spend their time waiting on LangFlow and the judge LLM, so threads suffice here
+        with ThreadPoolExecutor(max_workers=min(len(flow_ids), self.max_flow_concurrency)) as pool:
+            results = dict(zip(flow_ids, pool.map(run, flow_ids)))
+        
+        comparison = self.compare_results(
+            results[flow_ids[0]],
+            [results[flow_id] for flow_id in flow_ids[1:]],
+            n_resamples=n_resamples,
+            confidence=confidence,
+            max_workers=max_workers,
+        )
+        return {
+            "baseline": flow_ids[0],
+            "results": results,
+            "comparison": comparison.to_dict(orient="records"),
+        }
+    
+    def compare_results(
+        self,
+        baseline: Dict[str, Any],
+        candidates: List[Dict[str, Any]],
+        n_resamples: int = 2000,
+        confidence: float = 0.95,
+        max_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Paired per-question metric deltas of stored runs against a baseline run
+        
+        Only questions answered in both runs are compared. Each delta
+        (candidate - baseline) comes with a bootstrap confidence interval;
+        for harmfulness a negative delta is the improvement.
+        """
+        metric_names = [metric.name for metric in METRIC_TIERS["all"]]
+        
+        def question_scores(result):
+            scores = self.get_question_scores(result["flow_id"], result["id"])
+            return scores if not scores.empty else pd.DataFrame(result.get("detailed_results") or self.get_result_details(result["id"]))
+        
+        return compare_scores(
+            question_scores(baseline),
+            {candidate["flow_id"]: question_scores(candidate) for candidate in candidates},
+            metric_names,
+            n_resamples=n_resamples,
+            confidence=confidence,
+            max_workers=max_workers,
+        )
     
-    def get_historical_results(self, flow_id: str = None) -> List[Dict[str, Any]]:
-        """Get historical evaluation results, optionally filtered by flow ID"""
-        results = []
+    def get_historical_results(self, flow_id: str = None, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get historical evaluation results, newest first, optionally filtered by flow ID
         
-        for filename in os.listdir(self.results_dir):
-            if filename.endswith(".json") and filename.startswith("evaluation_"):
-                file_path = os.path.join(self.results_dir, filename)
-                
-                with open(file_path, "r") as f:
-                    result = json.load(f)
-                
-                if flow_id is None or result.get("flow_id") == flow_id:
-                    results.append(result)
+        Only run summaries are returned; use get_result_details for the
+        per-question results of a run.
+        """
+        return self.results_store.list_results(flow_id, limit=limit, offset=offset)
+    
+    def count_historical_results(self, flow_id: str = None) -> int:
+        return self.results_store.count_results(flow_id)
+    
+    def get_result_details(self, run_id: int, flow_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load the detailed per-question results of one run
         
-        # Sort by timestamp
-        results.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+        Runs of evaluate_dataset keep them only as per-question scores in
+        Parquet; pass the run's flow_id to load those instead.
+        """
+        details = self.results_store.get_details(run_id)
+        if not details and flow_id is not None:
+            details = self.get_question_scores(flow_id, run_id).to_dict()
+        return details
+    
+    def get_run_aggregates(self, flow_id: str = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Precomputed per-run statistics, oldest first, optionally filtered by flow ID
         
-        return results
\ No newline at end of file
+        Columns are named "<metric>_<statistic>" (e.g. "faithfulness_p90");
+        only the requested ones are read.
+        """
+        return self.aggregates.load_runs(flow_id, columns=columns)
+    
+    def get_question_scores(self, flow_id: str, run_id: int) -> pd.DataFrame:
+        """Per-question scores of one run"""
+        return self.aggregates.load_scores(flow_id, run_id)
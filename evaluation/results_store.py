@@ -0,0 +1,141 @@
+# evaluation/results_store.py
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+# Result fields stored in the summary row; everything else (the large
+# detailed_results dump) lives in run_details and is loaded on demand
+SUMMARY_KEYS = ("flow_id", "flow_version", "timestamp", "metrics", "sample_size")
+
+class ResultsStore:
+    """
+    Indexed store of evaluation runs in a local SQLite file
+
+    Each run has a small summary row indexed by (flow_id, timestamp), so listing
+    the history of a flow never reads the per-question details.
+    """
+
+    def __init__(self, path: str = "data/evaluation_results.db"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                flow_id TEXT NOT NULL,
+                flow_version TEXT,
+                timestamp TEXT NOT NULL,
+                metrics TEXT NOT NULL,
+                sample_size INTEGER,
+                extra TEXT NOT NULL DEFAULT '{}',
+                source_file TEXT UNIQUE
+            );
+            CREATE INDEX IF NOT EXISTS runs_flow_timestamp ON runs (flow_id, timestamp);
+            CREATE INDEX IF NOT EXISTS runs_timestamp ON runs (timestamp);
+            CREATE TABLE IF NOT EXISTS run_details (
+                run_id INTEGER PRIMARY KEY REFERENCES runs (id) ON DELETE CASCADE,
+                detailed_results TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def add_result(self, result: Dict[str, Any], source_file: Optional[str] = None) -> int:
+        """Store an evaluation result dict as produced by RagasEvaluator.evaluate_flow"""
+        extra = {k: v for k, v in result.items() if k not in SUMMARY_KEYS and k != "detailed_results"}
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (flow_id, flow_version, timestamp, metrics, sample_size, extra, source_file) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result.get("flow_id", ""),
+                    result.get("flow_version"),
+                    result.get("timestamp", ""),
+                    json.dumps(result.get("metrics", {})),
+                    result.get("sample_size"),
+                    json.dumps(extra, default=str),
+                    source_file,
+                ),
+            )
+            run_id = cursor.lastrowid
+            self._conn.execute(
+                "INSERT INTO run_details (run_id, detailed_results) VALUES (?, ?)",
+                (run_id, json.dumps(result.get("detailed_results", {}), default=str)),
+            )
+            self._conn.commit()
+        return run_id
+
+    @staticmethod
+    def _to_summary(row) -> Dict[str, Any]:
+        run_id, flow_id, flow_version, timestamp, metrics, sample_size, extra = row
+        summary = {
+            "id": run_id,
+            "flow_id": flow_id,
+            "timestamp": timestamp,
+            "metrics": json.loads(metrics),
+            "sample_size": sample_size,
+            **json.loads(extra),
+        }
+        if flow_version is not None:
+            summary["flow_version"] = flow_version
+        return summary
+
+    def list_results(self, flow_id: Optional[str] = None, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Run summaries, newest first, optionally filtered by flow and paginated"""
+        query = "SELECT id, flow_id, flow_version, timestamp, metrics, sample_size, extra FROM runs"
+        params: List[Any] = []
+        if flow_id is not None:
+            query += " WHERE flow_id = ?"
+            params.append(flow_id)
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+        params += [limit if limit is not None else -1, offset]
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_summary(row) for row in rows]
+
+    def count_results(self, flow_id: Optional[str] = None) -> int:
+        with self._lock:
+            if flow_id is None:
+                return self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM runs WHERE flow_id = ?", (flow_id,)).fetchone()[0]
+
+    def get_details(self, run_id: int) -> Dict[str, Any]:
+        """The per-question detailed results of one run"""
+        with self._lock:
+            row = self._conn.execute("SELECT detailed_results FROM run_details WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def import_json_dir(self, results_dir: str) -> int:
+        """Import evaluation_*.json files written by earlier versions; already imported files are skipped"""
+        if not os.path.isdir(results_dir):
+            return 0
+        with self._lock:
+            imported_files = {row[0] for row in self._conn.execute("SELECT source_file FROM runs WHERE source_file IS NOT NULL")}
+        imported = 0
+        for filename in sorted(os.listdir(results_dir)):
+            if not (filename.endswith(".json") and filename.startswith("evaluation_")):
+                continue
+            if filename in imported_files:
+                continue
+            with open(os.path.join(results_dir, filename), "r") as f:
+                result = json.load(f)
+            self.add_result(result, source_file=filename)
+            imported += 1
+        return imported
+
+def main():
+    parser = argparse.ArgumentParser(description="Import evaluation result JSON files into the results store")
+    parser.add_argument("results_dir", nargs="?", default="data/evaluation_results")
+    parser.add_argument("--db", default="data/evaluation_results.db")
+    args = parser.parse_args()
+    imported = ResultsStore(args.db).import_json_dir(args.results_dir)
+    print(f"Imported {imported} result files into {args.db}")
+
+if __name__ == "__main__":
+    main()
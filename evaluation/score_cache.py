@@ -0,0 +1,116 @@
+# evaluation/score_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+def score_key(
+    metric: str,
+    metric_version: str,
+    judge_config: Dict[str, Any],
+    question: str,
+    answer: str,
+    contexts: List[str],
+    ground_truth: str,
+) -> str:
+    """
+    Content address of one metric score
+
+    The same inputs scored by the same metric version and judge give the same
+    key, whichever flow, flow version or run they came from.
+    """
+    payload = json.dumps(
+        [metric, metric_version, judge_config, question, answer, contexts, ground_truth or ""],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ScoreCache:
+    """
+    Metric scores by content address (see score_key) in a local SQLite file
+
+    Checkpoints only carry scores over within one flow version. This cache
+    reuses a score wherever the same question, answer, contexts and ground
+    truth come back, e.g. after a flow was edited in a way that left most of
+    its answers unchanged. It holds at most ``max_entries`` scores; the least
+    recently used are evicted first.
+    """
+
+    def __init__(self, path: str = "data/evaluation_score_cache.db", max_entries: int = 500_000):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS scores (
+                key TEXT PRIMARY KEY,
+                metric TEXT NOT NULL,
+                score REAL,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS scores_used_at ON scores (used_at);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _chunks(items: List[str], size: int = 500):
+        # SQLite limits the number of bound parameters per statement
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+
+    def get_many(self, keys: List[str]) -> Dict[str, Optional[float]]:
+        """Cached scores of the given keys, marking them as recently used"""
+        scores = {}
+        now = time.time()
+        with self._lock:
+            for chunk in self._chunks(keys):
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, score FROM scores WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                scores.update(rows)
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE scores SET used_at = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        (now, *(key for key, _ in rows)),
+                    )
+            self._conn.commit()
+        return scores
+
+    def put_many(self, metric: str, scores: Dict[str, Optional[float]]):
+        """Store scores by key, then evict the least recently used beyond max_entries"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+                [(key, metric, score, now, now) for key, score in scores.items()],
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY used_at LIMIT ?)", (excess,)
+                )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def clear(self, metric: Optional[str] = None):
+        """Forget all cached scores, or those of one metric"""
+        with self._lock:
+            if metric is None:
+                self._conn.execute("DELETE FROM scores")
+            else:
+                self._conn.execute("DELETE FROM scores WHERE metric = ?", (metric,))
+            self._conn.commit()
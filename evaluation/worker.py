@@ -0,0 +1,230 @@
+# evaluation/worker.py
+"""Run queued and scheduled evaluation jobs in the background.
+
+    python -m evaluation.worker --concurrency 2 --max-running 4
+
+The worker claims jobs from the queue (see ``evaluation.jobs``) and runs each
+in its own process. It reports their progress to the queue, stops jobs that
+are cancelled or run longer than ``--job-timeout``, and submits jobs for
+schedules that are due. Several workers may share a queue; ``--max-running``
+limits the jobs running at once across all of them.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Dict, Optional
+
+# Add the project root to sys.path to make imports work
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation.jobs import CANCELLED, FAILED, SUCCEEDED, JobQueue
+
+logger = logging.getLogger(__name__)
+
+def run_job(queue_path: str, job: Dict[str, Any], api_url: str, evaluator_options: Dict[str, Any]):
+    """Run one job to completion and record its outcome; the target of a job process"""
+    from chatbot.utils.api_client import APIClient
+    from evaluation.dataset import EvaluationDataset
+    from evaluation.ragas_evaluator import RagasEvaluator
+
+    # Ctrl-C reaches the whole process group; the worker decides what happens to its jobs
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    queue = JobQueue(queue_path)
+    job_id = job["id"]
+    params = job["params"]
+    metric_tier = params.get("metric_tier")
+
+    def report_progress(completed: int, total: int):
+        message = "Answering questions" if completed < total else "Scoring answers"
+        queue.update_progress(job_id, completed, total, message)
+
+    try:
+        queue.set_message(job_id, "Starting")
+        evaluator = RagasEvaluator(**evaluator_options)
+        api_client = APIClient(api_url)
+        if job["kind"] == "flow":
+            result = evaluator.evaluate_flow(
+                job["flow_ids"][0], api_client, progress_callback=report_progress, metric_tier=metric_tier
+            )
+            outcome = {"run_ids": [result["id"]], "metrics": result["metrics"]}
+        elif job["kind"] == "dataset":
+            dataset_args = dict(params["dataset"])
+            if dataset_args.get("shard"):
+                dataset_args["shard"] = tuple(dataset_args["shard"])
+            result = evaluator.evaluate_dataset(
+                job["flow_ids"][0],
+                api_client,
+                EvaluationDataset(**dataset_args),
+                chunk_size=params.get("chunk_size", 500),
+                progress_callback=report_progress,
+                metric_tier=metric_tier,
+            )
+            outcome = {"run_ids": [result["id"]], "metrics": result["metrics"], "sample_size": result["sample_size"]}
+        else:
+            # The flows answer the same questions, so a comparison's progress counts them once per flow
+            answered = {}
+
+            def report_flow_progress(flow_id: str, completed: int, total: int):
+                answered[flow_id] = completed
+                report_progress(sum(answered.values()), total * len(job["flow_ids"]))
+
+            comparison = evaluator.evaluate_flows(
+                job["flow_ids"], api_client, progress_callback=report_flow_progress, metric_tier=metric_tier
+            )
+            outcome = {
+                "baseline": comparison["baseline"],
+                "comparison": comparison["comparison"],
+                "run_ids": [comparison["results"][flow_id]["id"] for flow_id in job["flow_ids"]],
+            }
+        queue.finish(job_id, SUCCEEDED, result=outcome)
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        queue.finish(job_id, FAILED, error=str(e))
+    finally:
+        queue.close()
+
+class EvaluationWorker:
+    """
+    Claims jobs from a JobQueue and runs up to ``concurrency`` of them at
+    once, each in a separate process
+
+    A job's process is terminated when the job is cancelled or runs longer
+    than ``job_timeout`` seconds. Answers and scores it checkpointed are kept,
+    so the next run of the flow resumes from them. Jobs of a worker that
+    stopped reporting for ``stale_after`` seconds are requeued by the others.
+    """
+
+    def __init__(
+        self,
+        queue_path: str = "data/evaluation_jobs.db",
+        api_url: str = "http://localhost:8000",
+        concurrency: int = 1,
+        max_running: int = 2,
+        poll_interval: float = 2.0,
+        stale_after: float = 120.0,
+        job_timeout: Optional[float] = None,
+        evaluator_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.queue_path = queue_path
+        self.queue = JobQueue(queue_path)
+        self.api_url = api_url
+        self.concurrency = concurrency
+        self.max_running = max_running
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.job_timeout = job_timeout
+        self.evaluator_options = evaluator_options or {}
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        # Job ID -> (process, monotonic start time)
+        self._running: Dict[int, tuple] = {}
+        self._stopping = False
+        # Spawned rather than forked, so a job process starts without the worker's SQLite connection
+        self._context = multiprocessing.get_context("spawn")
+
+    def _stop_process(self, job_id: int) -> multiprocessing.Process:
+        process, _ = self._running.pop(job_id)
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=30)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        return process
+
+    def _reap(self):
+        """Record the outcome of job processes that exited, and stop cancelled and timed out jobs"""
+        for job_id, (process, _) in list(self._running.items()):
+            if process.is_alive():
+                continue
+            self._stop_process(job_id)
+            # Only a job still running has to be finished here: a process that
+            # crashed could not record its own failure
+            self.queue.finish(job_id, FAILED, error=f"The job process exited with code {process.exitcode}")
+            logger.info("Job %s finished", job_id)
+        # A job that finished while it was being stopped keeps its outcome
+        for job_id in self.queue.cancel_requested(list(self._running)):
+            self._stop_process(job_id)
+            if self.queue.finish(job_id, CANCELLED):
+                logger.info("Job %s cancelled", job_id)
+        if self.job_timeout:
+            now = time.monotonic()
+            for job_id, (_, started) in list(self._running.items()):
+                if now - started > self.job_timeout:
+                    self._stop_process(job_id)
+                    if self.queue.finish(job_id, FAILED, error=f"Timed out after {self.job_timeout:.0f}s"):
+                        logger.warning("Job %s timed out", job_id)
+
+    def _start_jobs(self):
+        while len(self._running) < self.concurrency:
+            job = self.queue.claim(self.name, self.max_running)
+            if job is None:
+                return
+            process = self._context.Process(
+                target=run_job,
+                args=(self.queue_path, job, self.api_url, self.evaluator_options),
+                name=f"evaluation-job-{job['id']}",
+            )
+            process.start()
+            self._running[job["id"]] = (process, time.monotonic())
+            logger.info("Started job %s (%s of %s)", job["id"], job["kind"], ", ".join(job["flow_ids"]))
+
+    def run_once(self):
+        """One pass of the worker loop"""
+        for job_id in self.queue.enqueue_due():
+            logger.info("Scheduled job %s queued", job_id)
+        for job_id in self.queue.requeue_stale(self.stale_after):
+            logger.warning("Requeued job %s, whose worker stopped responding", job_id)
+        self._reap()
+        self.queue.heartbeat(list(self._running))
+        if not self._stopping:
+            self._start_jobs()
+
+    def stop(self, *_):
+        """Stop claiming jobs; running ones are stopped and requeued"""
+        self._stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info("Worker %s running up to %d jobs", self.name, self.concurrency)
+        while not self._stopping:
+            self.run_once()
+            time.sleep(self.poll_interval)
+        job_ids = list(self._running)
+        for job_id in job_ids:
+            self._stop_process(job_id)
+        # Another worker, or this one after a restart, resumes them from their checkpoints
+        self.queue.release(job_ids)
+        self.queue.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="data/evaluation_jobs.db", help="Job queue file")
+    parser.add_argument("--api-url", default=os.getenv("API_URL", "http://localhost:8000"))
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs this worker runs at once")
+    parser.add_argument("--max-running", type=int, default=2, help="Jobs running at once across all workers")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between queue checks")
+    parser.add_argument("--stale-after", type=float, default=120.0, help="Requeue jobs of workers silent this long")
+    parser.add_argument("--job-timeout", type=float, default=None, help="Stop jobs running longer than this many seconds")
+    parser.add_argument("--questions-in-flight", type=int, default=8, help="Questions a job sends to its flow at once")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    EvaluationWorker(
+        queue_path=args.db,
+        api_url=args.api_url,
+        concurrency=args.concurrency,
+        max_running=args.max_running,
+        poll_interval=args.poll_interval,
+        stale_after=args.stale_after,
+        job_timeout=args.job_timeout,
+        evaluator_options={"max_concurrency": args.questions_in_flight},
+    ).run()
+
+if __name__ == "__main__":
+    main()